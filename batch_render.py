@@ -0,0 +1,103 @@
+"""Headless batch renderer for CrHashtag images.
+
+Usage:
+    python batch_render.py render jobs.jsonl --out OUTPUT/
+    python batch_render.py render hashtags.txt --template style.json --out OUTPUT/
+    python batch_render.py render jobs.jsonl --format webp-lossy --quality 85
+
+Each input line (or list entry for .json files) is a paragraph spec as
+described in paragraph_spec.py. A .txt file is streamed three non-empty lines
+per paragraph, like Import Text File, with --template supplying the style. Nothing here imports tkinter, pyautogui or
+pynput, so it runs on servers without a display.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from paragraph_spec import load_specs, merge_specs
+from text_import import iter_text_paragraphs
+from parallel_export import iter_export, default_workers
+from font_cache import font_cache
+from render_cache import RenderCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from image_writer import ENCODER_PROFILES, OUTPUT_FORMATS, DEFAULT_PROFILE, DEFAULT_FORMAT, DEFAULT_WEBP_QUALITY
+
+def render_jobs(jobs_path, out_dir, font_dir="FONT MAP", template=None, workers=1,
+                encoder_profile=DEFAULT_PROFILE, output_format=DEFAULT_FORMAT,
+                webp_quality=DEFAULT_WEBP_QUALITY, render_cache=None):
+    """Render every spec in jobs_path into out_dir; returns (rendered, failed, cache hits)"""
+    base_dir = os.path.dirname(os.path.abspath(jobs_path))
+    if jobs_path.lower().endswith('.txt'):
+        # The template's style wins over the text-import defaults
+        specs = iter_text_paragraphs(jobs_path)
+        if template:
+            specs = (merge_specs(paragraph, template) for paragraph in specs)
+    else:
+        specs = load_specs(jobs_path)
+        if template:
+            specs = (merge_specs(template, spec) for spec in specs)
+
+    rendered = failed = cache_hits = 0
+    for index, output_path, error, cached in iter_export(specs, out_dir, workers, font_dir, base_dir,
+                                                          encoder_profile=encoder_profile,
+                                                          output_format=output_format,
+                                                          webp_quality=webp_quality,
+                                                          render_cache=render_cache):
+        if error:
+            print(f"Error rendering job {index + 1}: {error}", file=sys.stderr)
+            failed += 1
+        else:
+            rendered += 1
+            cache_hits += cached
+    return rendered, failed, cache_hits
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render CrHashtag images without the Tk UI")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    render = subparsers.add_parser("render", help="render paragraph specs from a .json/.jsonl file")
+    render.add_argument("jobs", help="paragraph specs (.jsonl, one per line, or .json) or a .txt hashtag file")
+    render.add_argument("--out", default="OUTPUT", help="output directory (default: OUTPUT)")
+    render.add_argument("--font-dir", default="FONT MAP", help="directory font names are resolved against")
+    render.add_argument("--template", help="JSON spec whose values are used as defaults for every job")
+    render.add_argument("--workers", type=int, default=default_workers(),
+                        help="number of worker processes (default: CPU count, 1 renders in-process)")
+    render.add_argument("--profile", choices=list(ENCODER_PROFILES), default=DEFAULT_PROFILE,
+                        help=f"encoder profile, speed vs. file size (default: {DEFAULT_PROFILE})")
+    render.add_argument("--format", choices=list(OUTPUT_FORMATS), default=DEFAULT_FORMAT,
+                        help=f"output format (default: {DEFAULT_FORMAT})")
+    render.add_argument("--quality", type=int, default=DEFAULT_WEBP_QUALITY,
+                        help=f"webp-lossy quality, 1-100 (default: {DEFAULT_WEBP_QUALITY})")
+    render.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"render cache directory (default: {DEFAULT_CACHE_DIR})")
+    render.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="render cache size limit in MB (default: %(default)s)")
+    render.add_argument("--no-cache", action="store_true", help="always render, don't use the render cache")
+
+    args = parser.parse_args(argv)
+
+    template = None
+    if args.template:
+        with open(args.template, 'r', encoding='utf-8') as f:
+            template = json.load(f)
+
+    render_cache = None
+    if not args.no_cache:
+        render_cache = RenderCache(args.cache_dir, args.cache_size * 1024 * 1024)
+
+    start = time.perf_counter()
+    rendered, failed, cache_hits = render_jobs(args.jobs, args.out, args.font_dir, template, args.workers,
+                                               args.profile, args.format, args.quality, render_cache)
+    elapsed = time.perf_counter() - start
+
+    print(f"Rendered {rendered} image(s) into {args.out} in {elapsed:.1f}s"
+          + (f", {failed} failed" if failed else ""))
+    if render_cache is not None:
+        print(f"Render cache: {cache_hits} hits, {rendered - cache_hits} misses")
+    if args.workers <= 1:
+        stats = font_cache.stats()
+        print(f"Font cache: {stats['hits']} hits, {stats['misses']} misses")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Benchmark the text effect engine against the old per-offset draw.text loops.
+
+Usage: python bench_effects.py [font.ttf] [--size 150] [--repeat 5]
+
+For each stroke/outline width the script times the legacy loops (the
+create_*_effect helpers in utils.py), a cold text_effects.draw_text_with_effects
+call and a recolor of an already cached TextLayer, and reports the largest alpha difference, the largest difference on any
+channel and the mean per-channel difference between the two.
+"""
+import argparse
+import glob
+import os
+import time
+from PIL import Image, ImageChops, ImageDraw, ImageStat
+from font_cache import get_font
+from text_effects import draw_text_with_effects, effect_colors, text_layer_cache
+from utils import create_shadow_effect, create_stroke_effect, create_outline_effect
+
+SAMPLE_TEXT = "#CrHashtag Ägy 2024"
+CANVAS_SIZE = (1200, 400)
+
+def find_font():
+    """Pick a font from FONT MAP, falling back to DejaVu"""
+    candidates = sorted(glob.glob(os.path.join("FONT MAP", "*.ttf")))
+    candidates.append("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    raise SystemExit("No font found; pass a .ttf path")
+
+def render_legacy(font, effects, color="#1e90ff"):
+    """The pre-engine implementation: one draw.text per offset"""
+    img = Image.new("RGBA", CANVAS_SIZE, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    colors = effect_colors(color)
+    x, y = 40, 60
+    if effects.get('shadow'):
+        create_shadow_effect(draw, x, y, SAMPLE_TEXT, font, colors['shadow_color'], effects['shadow_offset'])
+    if effects.get('stroke'):
+        create_stroke_effect(draw, x, y, SAMPLE_TEXT, font, colors['stroke_color'], effects['stroke_width'])
+    if effects.get('outline'):
+        create_outline_effect(draw, x, y, SAMPLE_TEXT, font, colors['outline_color'], effects['outline_width'])
+    draw.text((x, y), SAMPLE_TEXT, fill=color, font=font)
+    return img
+
+def render_engine(font, effects, color="#1e90ff", cold=True):
+    if cold:
+        text_layer_cache.clear()
+    img = Image.new("RGBA", CANVAS_SIZE, (0, 0, 0, 0))
+    draw_text_with_effects(img, 40, 60, SAMPLE_TEXT, font, color, effects)
+    return img
+
+def time_it(func, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def compare(a, b):
+    """Return (max alpha, max any channel, mean) absolute per-channel difference"""
+    diff = ImageChops.difference(a, b)
+    extrema = diff.getextrema()
+    max_alpha = extrema[3][1]
+    max_diff = max(high for _, high in extrema)
+    mean_diff = sum(ImageStat.Stat(diff).mean) / 4
+    return max_alpha, max_diff, mean_diff
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("font", nargs="?", default=None)
+    parser.add_argument("--size", type=int, default=150)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    font = get_font(args.font or find_font(), args.size)
+    print(f"{'effect':<10}{'width':>6}{'legacy ms':>12}{'engine ms':>12}{'recolor ms':>12}{'speedup':>9}"
+          f"{'max A diff':>12}{'max diff':>10}{'mean diff':>11}")
+    for kind in ("stroke", "outline"):
+        for width in (1, 2, 3, 5, 8):
+            effects = {
+                'shadow': True, 'shadow_offset': 3,
+                kind: True, f'{kind}_width': width,
+            }
+            legacy_time, legacy_img = time_it(lambda: render_legacy(font, effects), args.repeat)
+            engine_time, engine_img = time_it(lambda: render_engine(font, effects), args.repeat)
+            recolor_time, _ = time_it(lambda: render_engine(font, effects, "#ff4500", cold=False), args.repeat)
+            max_alpha, max_diff, mean_diff = compare(legacy_img, engine_img)
+            print(f"{kind:<10}{width:>6}{legacy_time * 1000:>12.1f}{engine_time * 1000:>12.1f}{recolor_time * 1000:>12.1f}"
+                  f"{legacy_time / engine_time:>8.1f}x{max_alpha:>12}{max_diff:>10}{mean_diff:>11.4f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark the output formats and encoder profiles on representative paragraphs.
+
+Usage: python bench_encoders.py [font.ttf] [--repeat 3] [--quality 90]
+
+Each sample paragraph is rendered once with ImageGenerator.render_image and
+then encoded in every image_writer.OUTPUT_FORMATS format with every
+ENCODER_PROFILES profile. The script reports encode time, file size and
+whether the file decodes back to exactly the rendered pixels (webp-lossy
+usually does not, unless the image is very simple).
+"""
+import argparse
+import io
+import os
+from PIL import Image, ImageChops
+from bench_effects import find_font, time_it
+from image_generator import ImageGenerator
+from image_writer import ENCODER_PROFILES, OUTPUT_FORMATS, DEFAULT_WEBP_QUALITY, save_image
+from paragraph_spec import paragraph_from_spec
+
+def sample_icon(size=300):
+    """A gradient disc standing in for a real icon (lots of colors, soft alpha edge)"""
+    icon = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    gradient = Image.linear_gradient("L").resize((size, size))
+    mask = Image.radial_gradient("L").resize((size, size)).point(lambda v: 255 if v < 120 else max(0, 255 - (v - 120) * 8))
+    icon.paste(Image.merge("RGB", (gradient, gradient.rotate(90), Image.new("L", (size, size), 180))), (0, 0), mask)
+    buffer = io.BytesIO()
+    icon.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def sample_specs(font_path):
+    """Paragraph specs covering plain text, effects and icons"""
+    font = os.path.basename(font_path)
+    text = {'text_lines': ["#CrHashtag", "#summer", "#2024"], 'fonts': [font],
+            'font_sizes': {'text0': 150, 'text1': 160, 'text2': 140}}
+    return [
+        ("plain text", {**text, 'colors': ["#000000"] * 3}),
+        ("colored + stroke", {**text, 'colors': ["#00a69c", "#fc1a84", "#fc1a84"],
+                              'effects': {'shadow': True, 'stroke': True, 'stroke_width': 3}}),
+        ("text + icons", {**text, 'colors': ["#00a69c", "#fc1a84", "#fc1a84"],
+                          'icons': {'big_icon': sample_icon(300), 'small_icon': sample_icon(150)},
+                          'icon_sizes': {'big_icon': [300, 300], 'small_icon': [150, 150]}}),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("font", nargs="?", default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quality", type=int, default=DEFAULT_WEBP_QUALITY, help="webp-lossy quality")
+    args = parser.parse_args()
+
+    font_path = os.path.abspath(args.font or find_font())
+    generator = ImageGenerator(font_dir=os.path.dirname(font_path))
+
+    print(f"{'sample':<18}{'colors':>8}{'format':>12}{'profile':>10}{'encode ms':>11}{'bytes':>10}{'exact':>7}")
+    for name, spec in sample_specs(font_path):
+        img = generator.render_image([paragraph_from_spec(spec)])
+        colors = img.getcolors(256)
+        color_count = len(colors) if colors else ">256"
+        for output_format in OUTPUT_FORMATS:
+            for profile in ENCODER_PROFILES:
+                def encode():
+                    buffer = io.BytesIO()
+                    save_image(img, buffer, profile, output_format, args.quality)
+                    return buffer.getvalue()
+                encode_time, data = time_it(encode, args.repeat)
+                decoded = Image.open(io.BytesIO(data)).convert("RGBA")
+                # getbbox() would only look at alpha, so check every channel
+                exact = max(high for _, high in ImageChops.difference(decoded, img).getextrema()) == 0
+                print(f"{name:<18}{color_count:>8}{output_format:>12}{profile:>10}{encode_time * 1000:>11.1f}"
+                      f"{len(data):>10}{'yes' if exact else 'no':>7}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark preview canvas refreshes: delete("all") + recreate vs. the retained PreviewScene.
+
+Usage: python bench_preview.py [--repeat 200]
+
+Needs a display (Tk). Each refresh shows three text lines and two icons on a
+1200x1200 canvas with a 50px grid, like UIManager.update_preview. Times
+include root.update_idletasks() so the redraw itself is counted.
+"""
+import argparse
+import sys
+import time
+import tkinter as tk
+from PIL import Image, ImageTk
+from preview_scene import PreviewScene, ELEMENTS
+from utils import DraggableItem
+
+POSITIONS = {
+    'text0': (150, 150),
+    'text1': (150, 250),
+    'text2': (150, 350),
+    'small_icon': (600, 600),
+    'big_icon': (100, 600),
+}
+
+def make_images():
+    sizes = {'text0': (700, 200), 'text1': (600, 220), 'text2': (650, 190),
+             'small_icon': (150, 150), 'big_icon': (300, 300)}
+    return {name: ImageTk.PhotoImage(Image.new("RGBA", size, (30, 144, 255, 160)))
+            for name, size in sizes.items()}
+
+def refresh_legacy(canvas, images):
+    """The old update_preview: delete everything and rebuild items and bindings"""
+    canvas.delete("all")
+    width, height = canvas.winfo_width(), canvas.winfo_height()
+    for x in range(0, width, 50):
+        canvas.create_line(x, 0, x, height, fill="#dddddd")
+    for y in range(0, height, 50):
+        canvas.create_line(0, y, width, y, fill="#dddddd")
+    canvas.create_rectangle(2, 2, 798, 798, outline="#cccccc", width=2)
+    for name in ELEMENTS:
+        x, y = POSITIONS[name]
+        item_id = canvas.create_image(x, y, image=images[name], anchor='nw', tags=name)
+        item = DraggableItem(canvas, item_id, name, lambda t, x, y: None)
+        canvas.tag_bind(name, "<ButtonPress-1>", lambda event, item=item: item.on_drag_start(event))
+        canvas.tag_bind(name, "<B1-Motion>", lambda event, item=item: item.on_drag_motion(event))
+        canvas.tag_bind(name, "<ButtonRelease-1>", lambda event, item=item: item.on_drag_end(event))
+
+def refresh_scene(scene, images, positions=POSITIONS):
+    scene.update_grid()
+    for name in ELEMENTS:
+        x, y = positions[name]
+        scene.show(name, images[name], x, y)
+
+def time_refreshes(root, refresh, repeat):
+    root.update_idletasks()
+    start = time.perf_counter()
+    for i in range(repeat):
+        refresh(i)
+        root.update_idletasks()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Tk is not available ({e}); run this benchmark on a machine with a display.")
+        return 1
+
+    canvas = tk.Canvas(root, width=1200, height=1200, bg="white")
+    canvas.pack()
+    root.update()
+    images = make_images()
+    other_images = make_images()
+
+    legacy = time_refreshes(root, lambda i: refresh_legacy(canvas, images), args.repeat)
+    legacy_items = len(canvas.find_all())
+
+    scene = PreviewScene(canvas, lambda t, x, y: None)
+    refresh_scene(scene, images)
+    unchanged = time_refreshes(root, lambda i: refresh_scene(scene, images), args.repeat)
+
+    def one_changed(i):
+        # One text line alternates between two renders, the rest stays put
+        changed = dict(images, text1=other_images['text1'] if i % 2 else images['text1'])
+        refresh_scene(scene, changed)
+    one_line = time_refreshes(root, one_changed, args.repeat)
+
+    def moved(i):
+        positions = dict(POSITIONS, big_icon=(100 + i % 50, 600))
+        refresh_scene(scene, images, positions)
+    one_move = time_refreshes(root, moved, args.repeat)
+
+    print(f"canvas items per refresh (legacy): {legacy_items}")
+    print(f"{'refresh':<28}{'ms':>10}{'speedup':>10}")
+    for name, seconds in (
+        ("legacy delete + recreate", legacy),
+        ("scene, nothing changed", unchanged),
+        ("scene, one line changed", one_line),
+        ("scene, one icon moved", one_move),
+    ):
+        print(f"{name:<28}{seconds * 1000:>10.3f}{legacy / seconds:>9.1f}x")
+    root.destroy()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
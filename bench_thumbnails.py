@@ -0,0 +1,102 @@
+"""Benchmark icon thumbnail decoding: full decode + LANCZOS vs. draft/reduce.
+
+Usage: python bench_thumbnails.py [--count 20] [--repeat 3]
+
+Builds a synthetic icon corpus in a temporary directory (large RGBA and
+palette PNGs, RGB JPEG photos) and times, per source file:
+
+  before  the old search result path: Image.open + resize((50, 50)) for the
+          result cell, and a second Image.open + thumbnail((200, 200)) for
+          the hover preview
+  after   ThumbnailStore._render: one decode (JPEG draft) making both
+          thumbnails with thumbnail_resize (reduce, then LANCZOS)
+  swatch  ColorManager color swatch (100x100): resize vs. swatch_image
+
+The diff column is the mean absolute per-channel difference (0-255) of the
+50px result thumbnails, to show the reduced decode looks the same. Palette
+sources are the exception by design: Pillow resized mode P images with
+NEAREST in the old path, the new one converts them and filters properly,
+so they differ by several levels (about 10 on this corpus).
+"""
+import argparse
+import os
+import tempfile
+from PIL import Image, ImageChops, ImageStat
+from bench_effects import time_it
+from color_manager import swatch_image
+from thumbnail_store import ThumbnailStore
+
+CORPUS = (
+    # name, size, mode, format
+    ("png rgba 1024", (1024, 1024), "RGBA", "PNG"),
+    ("png rgba 2048", (2048, 2048), "RGBA", "PNG"),
+    ("png palette 1024", (1024, 1024), "P", "PNG"),
+    ("jpeg 3000x2000", (3000, 2000), "RGB", "JPEG"),
+)
+
+def sample_image(size, mode, seed):
+    """Gradients with a soft alpha disc: smooth like real icons, but not trivially compressible"""
+    width, height = size
+    gradient = Image.linear_gradient("L").resize(size)
+    radial = Image.radial_gradient("L").resize(size)
+    noise = Image.effect_noise(size, 40 + seed % 20)
+    img = Image.merge("RGB", (gradient, radial, noise))
+    if mode == "RGBA":
+        img.putalpha(radial.point(lambda v: 255 if v < 110 else max(0, 255 - (v - 110) * 6)))
+    elif mode == "P":
+        img = img.quantize(64)
+    return img
+
+def build_corpus(directory, count):
+    """Write count files of every CORPUS kind; returns {name: [paths]}"""
+    corpus = {}
+    for name, size, mode, file_format in CORPUS:
+        img = sample_image(size, mode, len(corpus))
+        extension = ".jpg" if file_format == "JPEG" else ".png"
+        paths = []
+        for i in range(count):
+            path = os.path.join(directory, f"{name.replace(' ', '_')}_{i}{extension}")
+            options = {"quality": 90} if file_format == "JPEG" else {"compress_level": 1}
+            img.save(path, format=file_format, **options)
+            paths.append(path)
+        corpus[name] = paths
+    return corpus
+
+def before(path):
+    result = Image.open(path).resize((50, 50), Image.LANCZOS)
+    hover = Image.open(path)
+    hover.thumbnail((200, 200), Image.LANCZOS)
+    return result
+
+def after(path):
+    thumbnails, _ = ThumbnailStore._render(path, (0, 0))
+    return thumbnails['result']
+
+def swatch_before(path):
+    return Image.open(path).resize((100, 100), Image.LANCZOS)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20, help="files per corpus kind")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = build_corpus(directory, args.count)
+        print(f"{'source':<18}{'before ms':>11}{'after ms':>10}{'speedup':>9}"
+              f"{'swatch before':>15}{'swatch after':>14}{'diff':>7}")
+        for name, paths in corpus.items():
+            before_time, _ = time_it(lambda: [before(path) for path in paths], args.repeat)
+            after_time, _ = time_it(lambda: [after(path) for path in paths], args.repeat)
+            swatch_before_time, _ = time_it(lambda: [swatch_before(path) for path in paths], args.repeat)
+            swatch_after_time, _ = time_it(lambda: [swatch_image(path) for path in paths], args.repeat)
+
+            diff = ImageChops.difference(before(paths[0]).convert("RGBA"), after(paths[0]))
+            mean_diff = sum(ImageStat.Stat(diff).mean) / 4
+            per_file = 1000 / len(paths)
+            print(f"{name:<18}{before_time * per_file:>11.1f}{after_time * per_file:>10.1f}"
+                  f"{before_time / after_time:>8.1f}x{swatch_before_time * per_file:>15.1f}"
+                  f"{swatch_after_time * per_file:>14.1f}{mean_diff:>7.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,26 @@
 import os
 import tkinter as tk
 from tkinter import Frame, Label, Checkbutton, IntVar, PhotoImage, ttk
-from utils import parse_color_from_filename
+from utils import parse_color_from_filename, open_for_thumbnail, thumbnail_resize
+from thumbnail_loader import ThumbnailLoader
 from PIL import Image, ImageTk
 
+SWATCH_SIZE = (100, 100)
+
+def swatch_image(file_path):
+    """Load a color map image as a swatch thumbnail (runs on a loader thread)"""
+    with open_for_thumbnail(file_path, SWATCH_SIZE) as img:
+        return thumbnail_resize(img, SWATCH_SIZE, keep_aspect=False)
+
 class ColorManager:
+    POLL_MS = 15
+
     def __init__(self):
         self.color_vars = []
         self.colors = []
         self.color_images = []  # Store references to avoid garbage collection
+        self.loader = ThumbnailLoader()  # decodes swatches off the Tk thread
+        self.display_generation = 0  # bumped by display_colors, stops older swatch polling
         self.selected_color_count = 0
         self.max_colors = 2  # Maximum color images that can be selected
         
@@ -63,6 +75,14 @@ class ColorManager:
                           justify=tk.LEFT)
         explanation.grid(row=1, column=0, columnspan=3, sticky="w", pady=5)
         
+        # Swatches show a placeholder until the loader has decoded them, in grid order
+        self.loader.cancel()
+        self.display_generation += 1
+        generation = self.display_generation
+        placeholder = ImageTk.PhotoImage(Image.new("RGBA", SWATCH_SIZE, (221, 221, 221, 255)))
+        self.color_images.append(placeholder)
+        image_labels = {}  # file path -> swatch Label
+
         # Display each color option
         for i, file_path in enumerate(self.colors):
             row = (i // 7) + 2  # Start from row 2 (after explanation)
@@ -72,19 +92,15 @@ class ColorManager:
                 # Get the filename without path
                 filename = os.path.basename(file_path)
                 
-                # Load and resize the image
-                img = Image.open(file_path)
-                img = img.resize((100, 100), Image.LANCZOS)
-                photo_img = ImageTk.PhotoImage(img)
-                self.color_images.append(photo_img)  # Keep reference
-                
                 # Create frame for each color
                 color_frame = Frame(scrollable_frame)
                 color_frame.grid(row=row, column=col, padx=10, pady=10)
                 
-                # Display image
-                img_label = Label(color_frame, image=photo_img)
+                # Display image (filled in when loaded)
+                img_label = Label(color_frame, image=placeholder)
                 img_label.pack()
+                image_labels[file_path] = img_label
+                self.loader.request(file_path, swatch_image, file_path)
                 
                 # Extract colors from filename
                 colors = parse_color_from_filename(filename)
@@ -110,6 +126,24 @@ class ColorManager:
                 
             except Exception as e:
                 print(f"Error loading color image {file_path}: {e}")
+
+        def fill_swatches():
+            if generation != self.display_generation:
+                # A later display_colors owns the loader (and maybe destroyed these labels)
+                return
+            for file_path, image, error in self.loader.poll():
+                img_label = image_labels[file_path]
+                if error is not None:
+                    print(f"Error loading color image {file_path}: {error}")
+                    img_label.configure(image="", text="Error")
+                    continue
+                photo_img = ImageTk.PhotoImage(image)
+                self.color_images.append(photo_img)  # Keep reference
+                img_label.configure(image=photo_img)
+            if self.loader.busy():
+                canvas.after(self.POLL_MS, fill_swatches)
+
+        canvas.after(self.POLL_MS, fill_swatches)
     
     def on_color_selected(self, var, file_path):
         """Handle color selection and enforce limit"""
@@ -0,0 +1,91 @@
+import io
+import os
+import threading
+from PIL import ImageFont
+from utils import LRUCache
+
+class FontCache:
+    """Process-wide font registry shared by the preview and export paths.
+
+    Each font file is read from disk once and kept as raw bytes; sized
+    FreeTypeFont objects are handed out from a bounded LRU keyed by
+    (path, size, layout engine). FreeType faces are not safe to use from
+    several threads at once, so every thread (the Tk thread, the preview
+    renderer, in-process export) gets its own faces built from the shared
+    bytes.
+    """
+    def __init__(self, max_faces=64):
+        self.max_faces = max_faces
+        self._font_data = {}  # normalized path -> raw font file bytes
+        self._data_lock = threading.Lock()
+        self._local = threading.local()
+        self._thread_faces = []  # every thread's face LRU, for clear() and stats()
+
+    def _faces(self):
+        """Return the calling thread's face LRU"""
+        faces = getattr(self._local, 'faces', None)
+        if faces is None:
+            faces = LRUCache(max_entries=self.max_faces)
+            self._local.faces = faces
+            with self._data_lock:
+                self._thread_faces.append(faces)
+        return faces
+
+    def _read_font_data(self, path):
+        """Return the raw bytes of a font file, reading it only once"""
+        with self._data_lock:
+            data = self._font_data.get(path)
+            if data is None:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                self._font_data[path] = data
+            return data
+
+    def get_font(self, font_path, size, layout_engine=None):
+        """Return a FreeTypeFont for font_path at the given size.
+
+        Raises the same errors as ImageFont.truetype (OSError for missing or
+        unreadable files) so callers can keep their existing fallbacks.
+        """
+        path = os.path.abspath(font_path)
+        key = (path, int(size), layout_engine)
+        faces = self._faces()
+        font = faces.get(key)
+        if font is None:
+            data = self._read_font_data(path)
+            font = ImageFont.truetype(io.BytesIO(data), int(size), layout_engine=layout_engine)
+            # Stable identity for caches layered on top (e.g. text_effects)
+            font.cache_key = key
+            faces.put(key, font)
+        return font
+
+    def clear(self):
+        """Forget all parsed faces and cached font files"""
+        with self._data_lock:
+            self._font_data.clear()
+            thread_faces = list(self._thread_faces)
+        for faces in thread_faces:
+            faces.clear()
+
+    def stats(self):
+        """Return hit/miss counters for the face caches of all threads"""
+        with self._data_lock:
+            thread_faces = list(self._thread_faces)
+            font_files = len(self._font_data)
+        stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'entries': 0, 'weight': 0}
+        for faces in thread_faces:
+            for name, value in faces.stats().items():
+                if name in stats:
+                    stats[name] += value
+        total = stats['hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] / total) if total else 0.0
+        stats['threads'] = len(thread_faces)
+        stats['font_files'] = font_files
+        return stats
+
+# Shared instance used by ImageGenerator, UIManager and FontLoader
+font_cache = FontCache()
+
+def get_font(font_path, size, layout_engine=None):
+    """Shortcut for font_cache.get_font()"""
+    return font_cache.get_font(font_path, size, layout_engine)
@@ -0,0 +1,332 @@
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+
+# Persistent catalog of the fonts in FONT MAP.
+#
+# For every face of every .ttf/.otf/.ttc file the catalog keeps the family
+# and style names, units per em, ascent/descent and a bitmap of the code
+# points its cmap maps to a glyph, so questions like "does this font have
+# Vietnamese diacritics?" don't need the face to be loaded. The sfnt tables
+# (name, head, hhea, cmap) are read directly with struct, which is much
+# cheaper than opening the face with FreeType. Entries live in a SQLite
+# database, stamped with the file's mtime and size; refresh() only parses
+# files that are new or changed and drops the ones that are gone.
+
+DEFAULT_DB_PATH = os.path.join("CACHE", "fonts.sqlite3")
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc')
+
+class FontFormatError(ValueError):
+    """Raised for files that are not valid sfnt fonts"""
+
+class Coverage:
+    """Set of code points a face has glyphs for, stored as a bitmap"""
+    def __init__(self, bitmap=b""):
+        self.bitmap = bytes(bitmap)
+
+    @classmethod
+    def from_ranges(cls, ranges):
+        """Build from inclusive (first, last) code point ranges"""
+        top = max((last for _, last in ranges), default=-1)
+        bitmap = bytearray((top >> 3) + 1 if top >= 0 else 0)
+        for first, last in ranges:
+            codepoint = first
+            # Bit by bit up to a byte boundary, whole bytes in between
+            while codepoint <= last and codepoint & 7:
+                bitmap[codepoint >> 3] |= 1 << (codepoint & 7)
+                codepoint += 1
+            full_bytes = (last + 1 - codepoint) >> 3
+            if full_bytes > 0:
+                bitmap[codepoint >> 3:(codepoint >> 3) + full_bytes] = b"\xff" * full_bytes
+                codepoint += full_bytes << 3
+            while codepoint <= last:
+                bitmap[codepoint >> 3] |= 1 << (codepoint & 7)
+                codepoint += 1
+        return cls(bitmap)
+
+    @classmethod
+    def from_blob(cls, blob):
+        return cls(zlib.decompress(blob))
+
+    def to_blob(self):
+        return zlib.compress(self.bitmap, 9)
+
+    def __contains__(self, codepoint):
+        index = codepoint >> 3
+        return 0 <= index < len(self.bitmap) and bool(self.bitmap[index] & (1 << (codepoint & 7)))
+
+    def __len__(self):
+        return sum(bin(byte).count("1") for byte in self.bitmap)
+
+    def missing(self, text):
+        """Return the distinct characters of text (other than control characters) not covered"""
+        missing = []
+        for char in text:
+            if ord(char) >= 0x20 and ord(char) not in self and char not in missing:
+                missing.append(char)
+        return "".join(missing)
+
+class FontInfo:
+    """Catalog entry for one face of a font file"""
+    def __init__(self, path, index, family, style, units_per_em, ascent, descent, coverage):
+        self.path = path
+        self.index = index  # face index inside a .ttc collection, 0 otherwise
+        self.family = family
+        self.style = style
+        self.units_per_em = units_per_em
+        self.ascent = ascent
+        self.descent = descent
+        self.coverage = coverage
+
+    @property
+    def name(self):
+        return f"{self.family} {self.style}".strip()
+
+    def covers(self, text):
+        """True if every (non-control) character of text has a glyph in this face"""
+        return not self.coverage.missing(text)
+
+    def __repr__(self):
+        return f"FontInfo({self.path!r}, {self.index}, {self.name!r})"
+
+# --- sfnt parsing ---------------------------------------------------------
+
+def _read(f, offset, length):
+    f.seek(offset)
+    data = f.read(length)
+    if len(data) != length:
+        raise FontFormatError("unexpected end of file")
+    return data
+
+def _face_offsets(f):
+    """Return the offsets of the table directories in a font file or collection"""
+    tag = _read(f, 0, 4)
+    if tag == b"ttcf":
+        num_fonts, = struct.unpack(">I", _read(f, 8, 4))
+        return list(struct.unpack(f">{num_fonts}I", _read(f, 12, 4 * num_fonts)))
+    if tag in (b"\x00\x01\x00\x00", b"OTTO", b"true"):
+        return [0]
+    raise FontFormatError(f"not an sfnt font (tag {tag!r})")
+
+def _table_directory(f, offset):
+    """Return {tag: (offset, length)} for the face whose directory starts at offset"""
+    num_tables, = struct.unpack(">H", _read(f, offset + 4, 2))
+    tables = {}
+    entries = _read(f, offset + 12, 16 * num_tables)
+    for i in range(num_tables):
+        tag, _, table_offset, length = struct.unpack(">4sIII", entries[16 * i:16 * i + 16])
+        tables[tag.decode("latin-1")] = (table_offset, length)
+    return tables
+
+def _table(f, tables, tag):
+    if tag not in tables:
+        raise FontFormatError(f"missing {tag} table")
+    return _read(f, *tables[tag])
+
+def _parse_names(data):
+    """Return (family, style) from a name table, preferring typographic and English names"""
+    _, count, string_offset = struct.unpack(">HHH", data[:6])
+    names = {}  # name id -> (rank, text); lower rank wins
+    for i in range(count):
+        platform, encoding, language, name_id, length, offset = struct.unpack(">6H", data[6 + 12 * i:18 + 12 * i])
+        if name_id not in (1, 2, 16, 17):
+            continue
+        raw = data[string_offset + offset:string_offset + offset + length]
+        if platform == 3 and encoding in (0, 1, 10):
+            rank, text = (0 if language == 0x409 else 1), raw.decode("utf-16-be", "replace")
+        elif platform == 0:
+            rank, text = 2, raw.decode("utf-16-be", "replace")
+        elif platform == 1 and encoding == 0:
+            rank, text = (3 if language == 0 else 4), raw.decode("mac-roman", "replace")
+        else:
+            continue
+        if name_id not in names or rank < names[name_id][0]:
+            names[name_id] = (rank, text)
+    family = names.get(16, names.get(1, (0, "")))[1]
+    style = names.get(17, names.get(2, (0, "")))[1]
+    return family, style
+
+def _cmap_ranges(data):
+    """Return inclusive (first, last) ranges of code points mapped to a glyph"""
+    _, num_subtables = struct.unpack(">HH", data[:4])
+    subtables = {}
+    for i in range(num_subtables):
+        platform, encoding, offset = struct.unpack(">HHI", data[4 + 8 * i:12 + 8 * i])
+        subtables[(platform, encoding)] = offset
+    # Full-repertoire Unicode tables first, then BMP ones, then symbol fonts
+    for key in ((3, 10), (0, 6), (0, 4), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0), (3, 0)):
+        if key not in subtables:
+            continue
+        offset = subtables[key]
+        subtable_format, = struct.unpack(">H", data[offset:offset + 2])
+        if subtable_format == 4:
+            return _cmap_format4(data, offset)
+        if subtable_format in (12, 13):
+            return _cmap_format12(data, offset)
+    return []
+
+def _cmap_format4(data, offset):
+    seg_count = struct.unpack(">H", data[offset + 6:offset + 8])[0] // 2
+    ends_at = offset + 14
+    starts_at = ends_at + 2 * seg_count + 2
+    deltas_at = starts_at + 2 * seg_count
+    range_offsets_at = deltas_at + 2 * seg_count
+    ends = struct.unpack(f">{seg_count}H", data[ends_at:ends_at + 2 * seg_count])
+    starts = struct.unpack(f">{seg_count}H", data[starts_at:starts_at + 2 * seg_count])
+    deltas = struct.unpack(f">{seg_count}h", data[deltas_at:deltas_at + 2 * seg_count])
+    range_offsets = struct.unpack(f">{seg_count}H", data[range_offsets_at:range_offsets_at + 2 * seg_count])
+
+    ranges = []
+    for i in range(seg_count):
+        start, end, delta, range_offset = starts[i], ends[i], deltas[i], range_offsets[i]
+        if start == 0xFFFF:
+            continue
+        if range_offset == 0:
+            # Glyph is (codepoint + delta) mod 65536; only the code point that wraps to 0 is missing
+            hole = (-delta) & 0xFFFF
+            if start <= hole <= end:
+                if start < hole:
+                    ranges.append((start, hole - 1))
+                if hole < end:
+                    ranges.append((hole + 1, end))
+            else:
+                ranges.append((start, end))
+            continue
+        glyphs_at = range_offsets_at + 2 * i + range_offset
+        glyphs = data[glyphs_at:glyphs_at + 2 * (end - start + 1)]
+        first = None
+        for j in range(len(glyphs) // 2):
+            # Non-zero entries get the delta added too, and may wrap to glyph 0 as well
+            glyph = (glyphs[2 * j] << 8) | glyphs[2 * j + 1]
+            mapped = glyph != 0 and (glyph + delta) & 0xFFFF != 0
+            if mapped and first is None:
+                first = start + j
+            elif not mapped and first is not None:
+                ranges.append((first, start + j - 1))
+                first = None
+        if first is not None:
+            ranges.append((first, start + len(glyphs) // 2 - 1))
+    return ranges
+
+def _cmap_format12(data, offset):
+    num_groups, = struct.unpack(">I", data[offset + 12:offset + 16])
+    groups = struct.unpack(f">{3 * num_groups}I", data[offset + 16:offset + 16 + 12 * num_groups])
+    return [(groups[3 * i], groups[3 * i + 1]) for i in range(num_groups)]
+
+def read_font_info(path):
+    """Parse every face of a font file; returns a list of FontInfo.
+
+    Raises OSError if the file can't be read and FontFormatError if it isn't
+    an sfnt font.
+    """
+    faces = []
+    with open(path, "rb") as f:
+        for index, offset in enumerate(_face_offsets(f)):
+            try:
+                tables = _table_directory(f, offset)
+                family, style = _parse_names(_table(f, tables, "name"))
+                units_per_em, = struct.unpack(">H", _table(f, tables, "head")[18:20])
+                ascent, descent = struct.unpack(">hh", _table(f, tables, "hhea")[4:8])
+                coverage = Coverage.from_ranges(_cmap_ranges(_table(f, tables, "cmap")))
+            except struct.error as e:
+                raise FontFormatError(f"truncated table: {e}")
+            faces.append(FontInfo(path, index, family, style, units_per_em, ascent, descent, coverage))
+    return faces
+
+# --- catalog --------------------------------------------------------------
+
+class FontCatalog:
+    """SQLite-backed FontInfo for the font files of one or more directories.
+
+    Entries are loaded into memory when the catalog is opened; lookups by
+    path never touch the font files.
+    """
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._faces = {}  # absolute path -> [FontInfo]
+        self._stamps = {}  # absolute path -> (mtime_ns, size)
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS faces ("
+            " path TEXT NOT NULL, face_index INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL,"
+            " family TEXT, style TEXT, units_per_em INTEGER, ascent INTEGER, descent INTEGER,"
+            " coverage BLOB,"
+            " PRIMARY KEY (path, face_index))")
+        self._db.commit()
+        for row in self._db.execute("SELECT * FROM faces ORDER BY path, face_index"):
+            path, index, mtime_ns, size, family, style, units_per_em, ascent, descent, coverage = row
+            info = FontInfo(path, index, family, style, units_per_em, ascent, descent, Coverage.from_blob(coverage))
+            self._faces.setdefault(path, []).append(info)
+            self._stamps[path] = (mtime_ns, size)
+
+    def refresh(self, font_dir="FONT MAP"):
+        """Parse new or changed font files in font_dir and forget removed ones; returns paths parsed"""
+        font_dir = os.path.abspath(font_dir)
+        try:
+            names = [name for name in os.listdir(font_dir) if name.lower().endswith(FONT_EXTENSIONS)]
+        except OSError:
+            names = []
+        present = set()
+        parsed = []
+        for name in names:
+            path = os.path.join(font_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            present.add(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if self._stamps.get(path) == stamp:
+                continue
+            try:
+                faces = read_font_info(path)
+            except (OSError, FontFormatError) as e:
+                print(f"[FONT CATALOG] Skipping {name}: {e}")
+                faces = []
+            self._store(path, stamp, faces)
+            parsed.append(path)
+
+        for path in [path for path in self._stamps if os.path.dirname(path) == font_dir and path not in present]:
+            self._store(path, None, [])
+        return parsed
+
+    def _store(self, path, stamp, faces):
+        with self._lock:
+            self._db.execute("DELETE FROM faces WHERE path = ?", (path,))
+            self._db.executemany(
+                "INSERT INTO faces VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(path, info.index, stamp[0], stamp[1], info.family, info.style, info.units_per_em,
+                  info.ascent, info.descent, info.coverage.to_blob()) for info in faces])
+            self._db.commit()
+            if stamp is None:
+                self._faces.pop(path, None)
+                self._stamps.pop(path, None)
+            else:
+                # Unparseable files are kept without faces, so they are not retried this session
+                self._faces[path] = faces
+                self._stamps[path] = stamp
+
+    def get(self, font_path, index=0):
+        """Return the FontInfo of a face, or None if the file isn't catalogued"""
+        faces = self._faces.get(os.path.abspath(font_path), [])
+        return faces[index] if index < len(faces) else None
+
+    def faces(self):
+        """Return every catalogued face"""
+        return [info for faces in self._faces.values() for info in faces]
+
+    def missing_characters(self, font_path, text):
+        """Return the characters of text the font has no glyph for ("" if unknown)"""
+        info = self.get(font_path)
+        return info.coverage.missing(text) if info else ""
+
+    def close(self):
+        with self._lock:
+            self._db.close()
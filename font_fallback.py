@@ -0,0 +1,208 @@
+import math
+import os
+import platform
+import threading
+import unicodedata
+from font_cache import get_font
+from font_catalog import FontFormatError, read_font_info
+from utils import LRUCache
+
+# Per-character font fallback.
+#
+# A line used to be drawn entirely in its chosen font, so characters the font
+# has no glyph for came out as boxes, and the system font was only used when
+# the chosen font failed to load. Lines are now split into runs by glyph
+# coverage: each character goes to the first font of the fallback chain
+# (the line's font, then the system fonts) whose cmap covers it, and every
+# run is drawn in its font on a shared baseline. Coverage comes from the
+# FontCatalog when one is attached (UIManager attaches its own) and is
+# otherwise read from the cmap once per font and process. Segmentations are
+# cached per (text, chain), so a line that is drawn again, like a repeated
+# hashtag, costs one dictionary lookup.
+#
+# Lines the chosen font fully covers are drawn with the plain FreeTypeFont,
+# exactly as before.
+
+SYSTEM_FONTS = {
+    'Windows': [
+        os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts', 'arial.ttf'),
+        os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts', 'verdana.ttf'),
+        os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts', 'segoeui.ttf'),
+        os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts', 'calibri.ttf'),
+        os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts', 'tahoma.ttf'),
+    ],
+    'Darwin': [  # macOS
+        '/System/Library/Fonts/SFNS.ttf',
+        '/System/Library/Fonts/SFNSText.ttf',
+        '/Library/Fonts/Arial.ttf',
+        '/System/Library/Fonts/Helvetica.ttc',
+        '/Library/Fonts/Verdana.ttf',
+    ],
+    'Linux': [
+        '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+        '/usr/share/fonts/TTF/Arial.ttf',
+        '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
+        '/usr/share/fonts/ubuntu/Ubuntu-R.ttf',
+    ]
+}
+
+def system_font_paths():
+    """Return the existing system fonts of this platform, most preferred first"""
+    return [path for path in SYSTEM_FONTS.get(platform.system(), []) if os.path.exists(path)]
+
+def find_system_font():
+    """
+    Find a system font that can be used as a fallback.
+    Returns the path to a usable system font or None.
+    """
+    paths = system_font_paths()
+    return paths[0] if paths else None
+
+class FallbackFont:
+    """Font chain that draws each run of a text in the first font with glyphs for it.
+
+    Offers the parts of the FreeTypeFont interface the renderers use
+    (getbbox, getlength, getmetrics) plus draw_text(), which text_effects
+    calls instead of ImageDraw.text. Runs share the first font's baseline.
+    """
+    def __init__(self, fallback, paths, fonts):
+        self.fallback = fallback
+        self.paths = tuple(paths)
+        self.fonts = list(fonts)  # sized font per path, None for ones that failed to load
+        self.size = self.fonts[0].size
+        self.cache_key = ('fallback',) + tuple(getattr(font, 'cache_key', None) for font in self.fonts)
+        self._ascent = self.fonts[0].getmetrics()[0]
+
+    def runs(self, text):
+        """Return [(run text, font, (dx, dy))] with each run's offset from the text origin"""
+        runs = []
+        x = 0.0
+        for run_text, index in self.fallback.segment(text, self.paths):
+            font = self.fonts[index] or self.fonts[0]
+            runs.append((run_text, font, (x, self._ascent - font.getmetrics()[0])))
+            x += font.getlength(run_text)
+        return runs
+
+    def getbbox(self, text, *args, **kwargs):
+        boxes = []
+        for run_text, font, (dx, dy) in self.runs(text):
+            left, top, right, bottom = font.getbbox(run_text, *args, **kwargs)
+            boxes.append((left + dx, top + dy, right + dx, bottom + dy))
+        if not boxes:
+            return self.fonts[0].getbbox(text, *args, **kwargs)
+        return (math.floor(min(box[0] for box in boxes)), math.floor(min(box[1] for box in boxes)),
+                math.ceil(max(box[2] for box in boxes)), math.ceil(max(box[3] for box in boxes)))
+
+    def getlength(self, text, *args, **kwargs):
+        return sum(font.getlength(run_text, *args, **kwargs) for run_text, font, _ in self.runs(text))
+
+    def getmetrics(self):
+        return self.fonts[0].getmetrics()
+
+    def draw_text(self, draw, xy, text, fill):
+        """Draw text at xy (like draw.text with the default anchor)"""
+        x, y = xy
+        for run_text, font, (dx, dy) in self.runs(text):
+            draw.text((x + dx, y + dy), run_text, fill=fill, font=font)
+
+class FontFallback:
+    """Splits text into runs by glyph coverage along a chain of font files"""
+    def __init__(self, catalog=None, max_entries=1024):
+        self.catalog = catalog
+        self._segments = LRUCache(max_entries=max_entries)  # (text, paths) -> ((run text, index), ...)
+        self._coverage = {}  # absolute path -> Coverage, or None if the cmap can't be read
+        self._coverage_lock = threading.Lock()
+
+    def coverage(self, font_path):
+        """Return the Coverage of a font's first face, or None if it is unknown"""
+        path = os.path.abspath(font_path)
+        info = self.catalog.get(path) if self.catalog is not None else None
+        if info is not None:
+            return info.coverage
+        with self._coverage_lock:
+            if path in self._coverage:
+                return self._coverage[path]
+        try:
+            faces = read_font_info(path)
+            coverage = faces[0].coverage if faces else None
+        except (OSError, FontFormatError):
+            coverage = None
+        with self._coverage_lock:
+            self._coverage[path] = coverage
+        return coverage
+
+    def segment(self, text, paths):
+        """Return ((run text, index into paths), ...) covering text (cached)"""
+        key = (text, tuple(paths))
+        return self._segments.get_or_create(key, lambda: self._segment(text, paths))
+
+    def _segment(self, text, paths):
+        coverages = [self.coverage(path) for path in paths]
+
+        def covers(index, codepoint):
+            # A first font without coverage data is trusted with everything
+            coverage = coverages[index]
+            return codepoint in coverage if coverage is not None else index == 0
+
+        # Clusters of a base character and the combining marks that follow it
+        clusters = []
+        for char in text:
+            if clusters and unicodedata.combining(char):
+                clusters[-1] += char
+            else:
+                clusters.append(char)
+
+        runs = []
+        for cluster in clusters:
+            current = runs[-1][1] if runs else None
+            if current is not None and (cluster.isspace() or ord(cluster[0]) < 0x20):
+                # Spaces stay with the run they follow
+                index = current
+            else:
+                index = next((i for i in range(len(paths))
+                              if all(covers(i, ord(char)) for char in cluster)), 0)
+            if index == current:
+                runs[-1][0].append(cluster)
+            else:
+                runs.append(([cluster], index))
+        return tuple(("".join(chars), index) for chars, index in runs)
+
+    def font_for_text(self, text, font_path, size, fallback_paths=None):
+        """Return the font to draw text with: font_path's face, or a FallbackFont if it lacks glyphs.
+
+        fallback_paths defaults to the system fonts. Raises like get_font()
+        if font_path itself can't be loaded.
+        """
+        font = get_font(font_path, size)
+        if fallback_paths is None:
+            fallback_paths = system_font_paths()
+        paths = [font_path] + [path for path in fallback_paths
+                               if os.path.abspath(path) != os.path.abspath(font_path)]
+        if all(index == 0 for _, index in self.segment(text, paths)):
+            return font
+
+        fonts = [font]
+        for path in paths[1:]:
+            try:
+                fonts.append(get_font(path, size))
+            except OSError as e:
+                print(f"Failed to load fallback font {path}: {e}")
+                fonts.append(None)
+        return FallbackFont(self, paths, fonts)
+
+    def clear(self):
+        """Forget cached segmentations and coverage (e.g. after fonts changed)"""
+        self._segments.clear()
+        with self._coverage_lock:
+            self._coverage.clear()
+
+    def stats(self):
+        """Return hit/miss counters for the segmentation cache"""
+        return self._segments.stats()
+
+# Shared instance used by the preview and export renderers
+font_fallback = FontFallback()
+
+def font_for_text(text, font_path, size, fallback_paths=None):
+    """Shortcut for font_fallback.font_for_text()"""
+    return font_fallback.font_for_text(text, font_path, size, fallback_paths)
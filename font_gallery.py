@@ -0,0 +1,102 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageDraw
+from font_cache import get_font
+from render_cache import file_digest
+
+# Preview tiles for the Fonts tab.
+#
+# The tab used to render a tile for every font in FONT MAP on the Tk thread
+# while the window was being built. Tiles are now rendered by worker
+# processes (FreeType holds the GIL, so threads wouldn't run them in
+# parallel) and kept as small PNGs under CACHE/font_tiles, named by the
+# SHA-256 of the font file: renaming a font keeps its tile, editing it
+# renders a new one. UIManager only requests the tiles of fonts that are
+# on screen once the Fonts tab has been shown, and polls for finished ones.
+# Workers are spawned rather than forked, for the same reason as the export
+# pool (see parallel_export.py).
+#
+# Bump TILE_VERSION when the tile drawing changes so stale tiles stop matching.
+
+TILE_SIZE = (150, 50)
+TILE_TEXT = "Abc-123"
+TILE_FONT_SIZE = 24
+TILE_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join("CACHE", "font_tiles")
+
+def default_workers():
+    """Return the default number of tile worker processes"""
+    return min(4, os.cpu_count() or 1)
+
+def error_tile():
+    """Tile shown for fonts that can't be loaded"""
+    img = Image.new('RGBA', TILE_SIZE, (255, 255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    draw.text((5, 5), "Error", fill=(255, 0, 0))
+    return img
+
+def render_font_tile(font_path, size=TILE_FONT_SIZE):
+    """Render the preview tile of a font as an RGBA image"""
+    try:
+        img = Image.new('RGBA', TILE_SIZE, (255, 255, 255, 255))
+        draw = ImageDraw.Draw(img)
+        font = get_font(font_path, size)
+        draw.text((5, 5), TILE_TEXT, fill=(0, 0, 0), font=font)
+        return img
+    except Exception as e:
+        print(f"Error creating font preview: {e}")
+        return error_tile()
+
+def tile_path(font_path, cache_dir=DEFAULT_CACHE_DIR):
+    """Return the cache file for font_path's tile (raises OSError if the font can't be read)"""
+    return os.path.join(cache_dir, f"{file_digest(font_path)}-v{TILE_VERSION}.png")
+
+def build_tile(font_path, cache_dir=DEFAULT_CACHE_DIR):
+    """Return the path of font_path's cached tile, rendering it first if needed (runs in a worker)"""
+    path = tile_path(font_path, cache_dir)
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        render_font_tile(font_path).save(temp_path, format="PNG")
+        os.replace(temp_path, path)
+    return path
+
+class FontGallery:
+    """Builds font tiles in a process pool; see request() and poll()"""
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, workers=None):
+        self.cache_dir = cache_dir
+        self.workers = workers or default_workers()
+        self._executor = None  # started on the first request
+        self._futures = {}     # future -> key
+
+    def request(self, key, font_path):
+        """Queue the tile of font_path, reported under key by poll()"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        future = self._executor.submit(build_tile, os.path.abspath(font_path), os.path.abspath(self.cache_dir))
+        self._futures[future] = key
+
+    def busy(self):
+        return bool(self._futures)
+
+    def poll(self):
+        """Return [(key, tile image)] for the tiles finished since the last poll"""
+        results = []
+        for future in [future for future in self._futures if future.done()]:
+            key = self._futures.pop(future)
+            try:
+                with Image.open(future.result()) as tile:
+                    tile.load()
+            except Exception as e:
+                print(f"Error creating font preview for {key}: {e}")
+                tile = error_tile()
+            results.append((key, tile))
+        return results
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._futures.clear()
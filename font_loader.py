@@ -1,7 +1,9 @@
 import os
 import tkinter as tk
 from tkinter import ttk, Frame, Label, Checkbutton, IntVar, StringVar
-from PIL import ImageTk, Image, ImageFont, ImageDraw
+from PIL import ImageTk
+from font_gallery import render_font_tile
+from font_catalog import FONT_EXTENSIONS
 
 class FontLoader:
     def __init__(self):
@@ -12,29 +14,18 @@ class FontLoader:
         self.max_fonts = 3  # Maximum fonts per paragraph
         
     def load_fonts(self):
-        """Load all TTF fonts from the FONT MAP directory"""
+        """Load all TTF/OTF/TTC fonts from the FONT MAP directory"""
         self.fonts = []
         if os.path.exists('FONT MAP'):
             for filename in os.listdir('FONT MAP'):
-                if filename.lower().endswith('.ttf'):
+                if filename.lower().endswith(FONT_EXTENSIONS):
                     self.fonts.append(filename)
         else:
             print("Warning: FONT MAP directory not found")
             
     def create_font_preview(self, font_path, size=24):
         """Create a preview image for a font"""
-        try:
-            img = Image.new('RGBA', (150, 50), (255, 255, 255, 255))
-            draw = ImageDraw.Draw(img)
-            font = ImageFont.truetype(font_path, size)
-            draw.text((5, 5), "Abc-123", fill=(0, 0, 0), font=font)
-            return ImageTk.PhotoImage(img)
-        except Exception as e:
-            print(f"Error creating font preview: {e}")
-            img = Image.new('RGBA', (150, 50), (255, 255, 255, 255))
-            draw = ImageDraw.Draw(img)
-            draw.text((5, 5), "Error", fill=(255, 0, 0))
-            return ImageTk.PhotoImage(img)
+        return ImageTk.PhotoImage(render_font_tile(font_path, size))
     
     def display_fonts(self, parent_frame, selection_list):
         """This method is no longer used - UI manager now handles font display"""
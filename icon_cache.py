@@ -0,0 +1,84 @@
+import hashlib
+import io
+import os
+from PIL import Image
+from utils import LRUCache, load_icon_image, get_resized_image
+
+def image_bytes(image):
+    """Approximate memory used by a decoded image"""
+    return image.width * image.height * len(image.getbands())
+
+class IconCache:
+    """Process-wide cache of decoded icons and resized copies, shared by the preview and export paths.
+
+    Icons loaded through load() / from_bytes() get a stable ``cache_key``
+    (file path + mtime + size, or a digest of the encoded bytes), so the same
+    icon is recognised across paragraphs and in every worker process. Resized
+    copies are kept in an LRU keyed by (icon, size, resampling filter) within
+    a memory budget; other icon objects are keyed by identity.
+    """
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_icon_bytes=64 * 1024 * 1024):
+        self._icons = LRUCache(max_entries=256, max_weight=max_icon_bytes, weigher=image_bytes)
+        # key -> (icon for identity-keyed entries or None, resized image)
+        self._resized = LRUCache(max_entries=1024, max_weight=max_bytes,
+                                 weigher=lambda entry: image_bytes(entry[1]))
+
+    def load(self, path):
+        """Load an RGBA icon from path (None if it can't be read), reusing an earlier decode"""
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            print(f"Error loading icon: {e}")
+            return None
+        key = ('file', os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        icon = self._icons.get(key)
+        if icon is None:
+            icon = load_icon_image(path)
+            if icon is None:
+                return None
+            icon.cache_key = key
+            self._icons.put(key, icon)
+        return icon
+
+    def from_bytes(self, data):
+        """Decode an RGBA icon from encoded image bytes, reusing an earlier decode"""
+        key = ('bytes', hashlib.sha256(data).hexdigest())
+        icon = self._icons.get(key)
+        if icon is None:
+            icon = Image.open(io.BytesIO(data)).convert("RGBA")
+            icon.cache_key = key
+            self._icons.put(key, icon)
+        return icon
+
+    def resized(self, icon, width, height, resample=Image.LANCZOS):
+        """Return icon resized to fit width x height (keeping its aspect ratio).
+
+        The returned image is shared; callers must not modify it.
+        """
+        identity = getattr(icon, 'cache_key', None)
+        key = (identity or ('object', id(icon)), int(width), int(height), resample)
+        entry = self._resized.get(key)
+        # id() can be reused once an icon is freed, so check it is the same object
+        if entry is not None and (identity is not None or entry[0] is icon):
+            return entry[1]
+        resized = get_resized_image(icon, int(width), int(height), resample)
+        self._resized.put(key, (None if identity else icon, resized))
+        return resized
+
+    def clear(self):
+        """Forget all decoded and resized icons"""
+        self._icons.clear()
+        self._resized.clear()
+
+    def stats(self):
+        """Return hit/miss counters for the resize cache"""
+        stats = self._resized.stats()
+        stats['icons'] = len(self._icons)
+        return stats
+
+# Shared instance used by paragraph_spec (export) and UIManager (preview)
+icon_cache = IconCache()
+
+def get_resized_icon(icon, width, height, resample=Image.LANCZOS):
+    """Shortcut for icon_cache.resized()"""
+    return icon_cache.resized(icon, width, height, resample)
@@ -0,0 +1,205 @@
+import os
+from collections import Counter
+from thumbnail_store import ICON_EXTENSIONS
+
+# In-memory search index over the icon filenames in ICONS.
+#
+# Filenames (without extension) are lowercased and split into tokens on
+# "_", "-" and spaces; each token maps to the set of files containing it. A
+# query term matches a file when it is a substring of the file's name, as
+# the old linear scan did: the term is looked up against the token
+# vocabulary (a term without separators can only occur inside one token) and
+# the postings of every token containing it are merged. The vocabulary
+# lookup is memoized per term, so repeated and refined queries only touch the
+# posting lists of matching files. The index follows the directory's mtime
+# and updates incrementally when files are added or removed.
+#
+# Typos are handled by a character-trigram index over the same vocabulary:
+# a term's trigrams are looked up to count how many each token shares, and
+# tokens whose Jaccard similarity reaches FUZZY_THRESHOLD count as fuzzy
+# matches ("term~token"). They rank below exact matches of the same number
+# of terms, see search(). Trigrams say little about short words, where one
+# swapped or dropped letter ("nigth", "stra") breaks most of them, so terms
+# of up to EDIT_MAX_LENGTH characters also match the tokens sharing a trigram
+# with them that are a single edit (insert, delete, substitute or swap two
+# adjacent letters) away, with a similarity of at least 1 - 1 / length.
+
+SEPARATORS = ('_', '-', ' ')
+FUZZY_MIN_LENGTH = 3   # shorter terms are only matched exactly
+FUZZY_THRESHOLD = 0.35  # minimum trigram similarity for a fuzzy match
+EDIT_MAX_LENGTH = 8     # longest terms also matched by edit distance
+
+def trigrams(word):
+    """Return the set of character trigrams of word, padded so its start and end count"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def edit_distance(a, b, limit):
+    """Return the optimal string alignment distance of a and b, or limit + 1 if it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other))
+            if before is not None and j > 1 and char == b[j - 2] and a[i - 2] == other:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+def tokenize(name):
+    """Split a filename base into lowercase search tokens"""
+    name = name.lower()
+    for separator in SEPARATORS[:-1]:
+        name = name.replace(separator, ' ')
+    return name.split()
+
+class IconIndex:
+    """Token index of the icon files in icon_dir, see search()"""
+    def __init__(self, icon_dir='ICONS'):
+        self.icon_dir = icon_dir
+        self._dir_mtime = None
+        self._bases = {}       # filename -> lowercase name without extension
+        self._order = {}       # filename -> position, keeps results in a stable order
+        self._next_order = 0
+        self._postings = {}    # token -> set of filenames
+        self._term_tokens = {}  # query term -> tokens containing it (reset on change)
+        self._trigrams = {}     # trigram -> set of tokens
+        self._trigram_counts = {}  # token -> number of distinct trigrams
+        self._similar = {}      # query term -> [(token, similarity)] (reset on change)
+
+    def __len__(self):
+        return len(self._bases)
+
+    def refresh(self):
+        """Pick up files added to or removed from icon_dir; returns True if anything changed"""
+        try:
+            mtime = os.stat(self.icon_dir).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._dir_mtime:
+            return False
+        self._dir_mtime = mtime
+
+        current = set()
+        if mtime is not None:
+            current = {name for name in os.listdir(self.icon_dir) if name.lower().endswith(ICON_EXTENSIONS)}
+        known = set(self._bases)
+        for filename in known - current:
+            self._remove(filename)
+        # Sorted so that newly indexed files get a deterministic order
+        for filename in sorted(current - known):
+            self._add(filename)
+        self._term_tokens.clear()
+        self._similar.clear()
+        return current != known
+
+    def _add(self, filename):
+        base = os.path.splitext(filename)[0].lower()
+        self._bases[filename] = base
+        self._order[filename] = self._next_order
+        self._next_order += 1
+        for token in set(tokenize(base)):
+            if token not in self._postings:
+                self._postings[token] = set()
+                token_trigrams = trigrams(token)
+                self._trigram_counts[token] = len(token_trigrams)
+                for trigram in token_trigrams:
+                    self._trigrams.setdefault(trigram, set()).add(token)
+            self._postings[token].add(filename)
+
+    def _remove(self, filename):
+        base = self._bases.pop(filename)
+        del self._order[filename]
+        for token in set(tokenize(base)):
+            files = self._postings[token]
+            files.discard(filename)
+            if not files:
+                del self._postings[token]
+                del self._trigram_counts[token]
+                for trigram in trigrams(token):
+                    tokens = self._trigrams[trigram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._trigrams[trigram]
+
+    def _files_containing(self, term):
+        """Return the files whose name contains term"""
+        if any(separator in term for separator in SEPARATORS):
+            # Spans a separator, so it can't be answered from single tokens
+            return [filename for filename, base in self._bases.items() if term in base]
+        tokens = self._term_tokens.get(term)
+        if tokens is None:
+            tokens = [token for token in self._postings if term in token]
+            self._term_tokens[term] = tokens
+        if len(tokens) == 1:
+            return self._postings[tokens[0]]
+        files = set()
+        for token in tokens:
+            files.update(self._postings[token])
+        return files
+
+    def _similar_tokens(self, term):
+        """Return [(token, similarity)] for vocabulary tokens close to term"""
+        similar = self._similar.get(term)
+        if similar is None:
+            term_trigrams = trigrams(term)
+            shared = Counter()
+            for trigram in term_trigrams:
+                shared.update(self._trigrams.get(trigram, ()))
+            similar = []
+            short = len(term) <= EDIT_MAX_LENGTH
+            for token, count in shared.items():
+                # Jaccard similarity of the two trigram sets
+                similarity = count / (len(term_trigrams) + self._trigram_counts[token] - count)
+                if short and edit_distance(term, token, 1) <= 1:
+                    similarity = max(similarity, 1 - 1 / max(len(term), len(token)))
+                if similarity >= FUZZY_THRESHOLD:
+                    similar.append((token, similarity))
+            self._similar[term] = similar
+        return similar
+
+    def search(self, search_text, fuzzy=True):
+        """Return (filename, score, matching_terms) for files matching any term, best first.
+
+        A file scores 1000 when every term occurs in its name, otherwise the
+        number of terms that do plus, for each remaining term, the similarity
+        (0-1) of its closest fuzzy match. Fuzzy matches are listed in
+        matching_terms as "term~token".
+        """
+        self.refresh()
+        search_terms = search_text.strip().lower().split()
+        matches = {}  # filename -> exact matching terms, in query order
+        near = {}     # filename -> {term: (similarity, token)} for terms not matched exactly
+        for term in search_terms:
+            exact_files = self._files_containing(term)
+            for filename in exact_files:
+                matches.setdefault(filename, []).append(term)
+            if not fuzzy or len(term) < FUZZY_MIN_LENGTH:
+                continue
+            if not isinstance(exact_files, set):
+                exact_files = set(exact_files)
+            for token, similarity in self._similar_tokens(term):
+                for filename in self._postings[token]:
+                    if filename in exact_files:
+                        continue
+                    best = near.setdefault(filename, {})
+                    if similarity > best.get(term, (0, None))[0]:
+                        best[term] = (similarity, token)
+
+        results = []
+        for filename in matches.keys() | near.keys():
+            matching_terms = matches.get(filename, [])
+            if len(matching_terms) == len(search_terms):
+                results.append((filename, 1000, matching_terms))
+                continue
+            fuzzy_terms = near.get(filename, {})
+            score = len(matching_terms) + sum(similarity for similarity, _ in fuzzy_terms.values())
+            matching_terms = matching_terms + [f"{term}~{token}" for term, (_, token) in fuzzy_terms.items()]
+            results.append((filename, round(score, 2), matching_terms))
+        results.sort(key=lambda result: (-result[1], self._order[result[0]]))
+        return results
@@ -0,0 +1,232 @@
+import os
+import tkinter as tk
+from tkinter import Frame, Label, Button
+from PIL import Image, ImageTk
+from thumbnail_loader import ThumbnailLoader
+from thumbnail_store import THUMBNAIL_KINDS
+from utils import LRUCache
+
+# Virtualized icon search results.
+#
+# display_icon_results used to create a frame, two labels, an image label and
+# two buttons for every match, so a broad query built tens of thousands of
+# widgets (and decoded as many thumbnails) before anything was shown.
+# IconResultList only keeps widgets for the rows that fit in the canvas: the
+# scroll region is sized for every result, and whenever the view moves the
+# row widgets are repositioned and rebound to the results now in view.
+# Rows show a placeholder until their thumbnail has been read from the
+# ThumbnailStore on a ThumbnailLoader worker; finished thumbnails are picked
+# up by polling from the Tk thread and their PhotoImages kept in a small LRU.
+# Hovering a row's preview button shows the larger hover thumbnail.
+
+class IconResultRow:
+    """Reusable widgets for one result row, bound to a result with bind()"""
+    def __init__(self, canvas, on_select, on_preview, on_preview_end):
+        self.on_select = on_select
+        self.index = None  # result index the widgets currently show
+        self.img_path = None
+        self.frame = Frame(canvas, borderwidth=1, relief="solid", padx=5, pady=5)
+
+        self.image_label = Label(self.frame)
+        self.image_label.pack(side=tk.LEFT, padx=5)
+
+        name_frame = Frame(self.frame)
+        name_frame.pack(side=tk.LEFT, padx=5)
+        self.name_label = Label(name_frame, anchor="w")
+        self.name_label.pack(anchor=tk.W)
+        self.match_label = Label(name_frame, font=("Arial", 8), fg="#666666")
+        self.match_label.pack(anchor=tk.W)
+
+        button_frame = Frame(self.frame)
+        button_frame.pack(side=tk.RIGHT)
+        self.big_button = Button(button_frame, text="Big Icon")
+        self.big_button.pack(side=tk.LEFT, padx=2)
+        self.small_button = Button(button_frame, text="Small Icon")
+        self.small_button.pack(side=tk.LEFT, padx=2)
+        # Larger preview while hovering
+        preview_button = Button(button_frame, text="👁️", width=2)
+        preview_button.pack(side=tk.LEFT, padx=2)
+        preview_button.bind("<Enter>", lambda event: on_preview(self, event))
+        preview_button.bind("<Leave>", lambda event: on_preview_end())
+
+        self.item_id = canvas.create_window(0, 0, window=self.frame, anchor="nw", state="hidden")
+
+    def bind(self, index, result, img_path, photo, failed=False):
+        """Show result (filename, score, matching_terms) in this row"""
+        filename, score, matching_terms = result
+        self.index = index
+        self.img_path = img_path
+
+        # Truncate filename if needed
+        self.display_name = filename
+        if len(self.display_name) > 25:
+            self.display_name = self.display_name[:22] + "..."
+        self.set_image(photo, failed)
+
+        # Display matching terms if not an exact match (fuzzy ones as term≈word)
+        match_text = ""
+        if len(matching_terms) < len(filename.split('_')):
+            match_text = "Matched: " + ", ".join(term.replace("~", "≈") for term in matching_terms)
+        self.match_label.configure(text=match_text)
+
+        self.big_button.configure(command=lambda: self.on_select(img_path, 'big_icon'))
+        self.small_button.configure(command=lambda: self.on_select(img_path, 'small_icon'))
+
+    def set_image(self, photo, failed=False):
+        """Show the thumbnail (or placeholder) of the bound icon"""
+        self.name_label.configure(text=f"Error: {self.display_name}" if failed else self.display_name)
+        self.image_label.configure(image="" if failed else photo)
+
+class IconResultList:
+    """Scrollable list of icon search results that only builds widgets for visible rows.
+
+    header is the widget shown at the top of the canvas (the window at
+    (0, 0), used for messages and the result count); rows start below it.
+    The list takes over the canvas's yscrollcommand to follow scrolling.
+    """
+    ROW_HEIGHT = 72
+    ROW_PADDING = 5
+    POLL_MS = 15
+
+    def __init__(self, canvas, scrollbar, header, thumbnail_store, on_select, icon_dir='ICONS',
+                 photo_cache_size=256):
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.header = header
+        self.thumbnail_store = thumbnail_store
+        self.on_select = on_select
+        self.icon_dir = icon_dir
+        self.items = []
+        self._rows = []
+        self._photos = LRUCache(max_entries=photo_cache_size)  # img_path -> PhotoImage
+        self._failed = set()  # img_paths whose thumbnail could not be loaded
+        self._placeholder = None
+        self.loader = ThumbnailLoader()
+        self._poll_scheduled = False
+        self._region = None
+        self._refreshing = False
+        self._preview_window = None
+        self.rows_bound = 0  # row rebinds, for diagnostics
+
+        canvas.configure(yscrollcommand=self._on_yscroll, yscrollincrement=self.ROW_HEIGHT // 3)
+        canvas.bind("<Configure>", lambda e: self.refresh(), add="+")
+
+    def set_items(self, items):
+        """Show a new list of (filename, score, matching_terms) results, scrolled to the top"""
+        # Thumbnails still loading for the previous results are no longer needed
+        self.loader.cancel()
+        self._failed.clear()
+        self.items = list(items)
+        for row in self._rows:
+            row.index = None
+        self.canvas.yview_moveto(0)
+        self.refresh()
+
+    def clear(self):
+        self.set_items([])
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def _photo(self, img_path):
+        """Return the thumbnail PhotoImage for img_path, or a placeholder while it loads"""
+        photo = self._photos.get(img_path)
+        if photo is not None:
+            return photo
+        self.loader.request(img_path, self.thumbnail_store.get, img_path)
+        self._schedule_poll()
+        if self._placeholder is None:
+            width, height, _ = THUMBNAIL_KINDS['result']
+            self._placeholder = ImageTk.PhotoImage(Image.new("RGBA", (width, height), (221, 221, 221, 255)))
+        return self._placeholder
+
+    def _schedule_poll(self):
+        if not self._poll_scheduled:
+            self._poll_scheduled = True
+            self.canvas.after(self.POLL_MS, self._poll_loader)
+
+    def _poll_loader(self):
+        """Swap finished thumbnails into the rows still showing their icon"""
+        self._poll_scheduled = False
+        rows = {row.img_path: row for row in self._rows if row.index is not None}
+        for img_path, image, error in self.loader.poll():
+            photo = None
+            if error is not None:
+                print(f"Error loading icon {img_path}: {error}")
+                self._failed.add(img_path)
+            else:
+                photo = ImageTk.PhotoImage(image)
+                self._photos.put(img_path, photo)
+            row = rows.get(img_path)
+            if row is not None:
+                row.set_image(photo, failed=error is not None)
+        if self.loader.busy():
+            self._schedule_poll()
+
+    def _show_preview(self, row, event):
+        """Show the hover thumbnail of row's icon next to the pointer"""
+        self._hide_preview()
+        try:
+            photo = ImageTk.PhotoImage(self.thumbnail_store.get(row.img_path, 'hover'))
+        except Exception as e:
+            print(f"Error loading icon {row.img_path}: {e}")
+            return
+        window = tk.Toplevel(self.canvas)
+        window.wm_overrideredirect(True)
+        window.wm_geometry(f"+{event.x_root + 10}+{event.y_root + 10}")
+        label = Label(window, image=photo, borderwidth=2, relief="solid")
+        label.image = photo  # prevent garbage collection
+        label.pack()
+        self._preview_window = window
+
+    def _hide_preview(self):
+        if self._preview_window is not None:
+            self._preview_window.destroy()
+            self._preview_window = None
+
+    def refresh(self):
+        """Size the scroll region and bind row widgets to the results in view"""
+        if self._refreshing:
+            return
+        self._refreshing = True
+        try:
+            self._layout()
+        finally:
+            self._refreshing = False
+
+    def _layout(self):
+        top = self.header.winfo_reqheight()
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        region = (0, 0, max(width, self.header.winfo_reqwidth()), top + len(self.items) * self.ROW_HEIGHT)
+        if region != self._region:
+            self._region = region
+            self.canvas.configure(scrollregion=region)
+
+        # Rows coming into view now load before the ones requested earlier
+        self.loader.next_batch()
+        view_top = self.canvas.canvasy(0)
+        first = max(0, int((view_top - top) // self.ROW_HEIGHT))
+        last = min(len(self.items), int((view_top + height - top) // self.ROW_HEIGHT) + 1)
+        while len(self._rows) < last - first:
+            self._rows.append(IconResultRow(self.canvas, self.on_select, self._show_preview, self._hide_preview))
+
+        used = set()
+        row_width = max(1, width - 2 * self.ROW_PADDING)
+        for index in range(first, last):
+            slot = index % len(self._rows)
+            row = self._rows[slot]
+            used.add(slot)
+            if row.index != index:
+                filename = self.items[index][0]
+                img_path = os.path.join(self.icon_dir, filename)
+                row.bind(index, self.items[index], img_path, self._photo(img_path), img_path in self._failed)
+                self.rows_bound += 1
+            self.canvas.coords(row.item_id, self.ROW_PADDING, top + index * self.ROW_HEIGHT)
+            self.canvas.itemconfigure(row.item_id, state="normal", width=row_width,
+                                      height=self.ROW_HEIGHT - self.ROW_PADDING)
+        for slot, row in enumerate(self._rows):
+            if slot not in used:
+                self.canvas.itemconfigure(row.item_id, state="hidden")
+                row.index = None
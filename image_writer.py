@@ -0,0 +1,135 @@
+import os
+import sys
+from PIL import Image, features
+
+# Output writer for rendered images. Every save goes through save_image(),
+# which picks the file format and encoder settings in one place.
+#
+# Output formats:
+#   png         - lossless PNG
+#   webp        - lossless WebP with alpha
+#   webp-lossy  - quality-based WebP with alpha (quality 1-100)
+#
+# Encoder profiles trade encode time for file size:
+#   fast      - zlib level 1 / WebP method 1
+#   balanced  - zlib level 6 (Pillow's default) / WebP method 4 (Pillow's default)
+#   smallest  - zlib level 9 + optimize / WebP method 6, and for PNG a
+#               palette (P + tRNS) image when the picture has at most 256
+#               distinct RGBA colors
+#
+# The palette image is only written when it maps back to exactly the same
+# RGBA pixels, so png and webp output is always lossless.
+
+ENCODER_PROFILES = {
+    'fast': {
+        'png': {'compress_level': 1},
+        'webp': {'method': 1, 'lossless_effort': 25},
+    },
+    'balanced': {
+        'png': {'compress_level': 6},
+        'webp': {'method': 4, 'lossless_effort': 75},
+    },
+    'smallest': {
+        'png': {'compress_level': 9, 'optimize': True, 'palette': True},
+        'webp': {'method': 6, 'lossless_effort': 100},
+    },
+}
+DEFAULT_PROFILE = 'balanced'
+
+OUTPUT_FORMATS = {
+    'png': {'extension': '.png', 'label': "PNG files"},
+    'webp': {'extension': '.webp', 'label': "WebP files"},
+    'webp-lossy': {'extension': '.webp', 'label': "WebP files"},
+}
+DEFAULT_FORMAT = 'png'
+DEFAULT_WEBP_QUALITY = 90
+
+# Format used when only a file extension is known
+FORMAT_BY_EXTENSION = {'.png': 'png', '.webp': 'webp'}
+
+def format_extension(output_format):
+    """Return the file extension (with dot) for an output format"""
+    return OUTPUT_FORMATS[output_format]['extension']
+
+def save_filetypes(output_format=DEFAULT_FORMAT):
+    """Return filedialog filetypes with output_format's type listed first"""
+    filetypes = []
+    for name in [output_format] + list(OUTPUT_FORMATS):
+        filetype = (OUTPUT_FORMATS[name]['label'], "*" + format_extension(name))
+        if filetype not in filetypes:
+            filetypes.append(filetype)
+    return filetypes
+
+def negotiate_format(output_path, output_format=None):
+    """Pick the output format for a path.
+
+    A known file extension wins over a requested format that doesn't match it
+    (saving "x.webp" while PNG is selected writes lossless WebP); otherwise the
+    requested format, or the default, is used.
+    """
+    extension = os.path.splitext(output_path)[1].lower() if isinstance(output_path, str) else ""
+    if extension in FORMAT_BY_EXTENSION:
+        if output_format is None or format_extension(output_format) != extension:
+            return FORMAT_BY_EXTENSION[extension]
+    return output_format or DEFAULT_FORMAT
+
+def to_lossless_palette(img):
+    """Return img as a 'P' image with per-entry alpha, or None if it has more than 256 colors.
+
+    Unlike Image.quantize() this never merges colors, so the result converts
+    back to exactly the same RGBA pixels.
+    """
+    img = img.convert("RGBA") if img.mode != "RGBA" else img
+    colors = img.getcolors(256)
+    if colors is None:
+        return None
+
+    # Look pixels up as packed 32-bit ints, which is much faster than tuples
+    lookup = {int.from_bytes(bytes(color), sys.byteorder): index
+              for index, (_, color) in enumerate(colors)}
+    pixels = memoryview(img.tobytes()).cast('I')
+    indexed = Image.frombytes('P', img.size, bytes(map(lookup.__getitem__, pixels)))
+
+    palette = []
+    alpha = []
+    for _, (r, g, b, a) in colors:
+        palette.extend((r, g, b))
+        alpha.append(a)
+    indexed.putpalette(palette)
+    indexed.info['transparency'] = bytes(alpha)
+    return indexed
+
+def save_image(img, output_path, profile=DEFAULT_PROFILE, output_format=None, quality=DEFAULT_WEBP_QUALITY):
+    """Write img to output_path (a path or file object).
+
+    output_format is one of OUTPUT_FORMATS; when omitted it is taken from the
+    file extension (see negotiate_format). quality only applies to webp-lossy.
+    Returns the format that was written.
+    """
+    if profile not in ENCODER_PROFILES:
+        raise ValueError(f"Unknown encoder profile: {profile} (expected one of {', '.join(ENCODER_PROFILES)})")
+    if output_format is not None and output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format} (expected one of {', '.join(OUTPUT_FORMATS)})")
+    output_format = negotiate_format(output_path, output_format)
+
+    if output_format == 'png':
+        options = dict(ENCODER_PROFILES[profile]['png'])
+        if options.pop('palette', False):
+            indexed = to_lossless_palette(img)
+            if indexed is not None:
+                img = indexed
+        img.save(output_path, format="PNG", **options)
+        return output_format
+
+    if not features.check('webp'):
+        raise ValueError("This Pillow build has no WebP support")
+    options = dict(ENCODER_PROFILES[profile]['webp'])
+    # For lossless WebP "quality" is the compression effort
+    effort = options.pop('lossless_effort')
+    if output_format == 'webp':
+        # exact keeps the RGB of fully transparent pixels, so decoding gives the same pixels back
+        options.update(lossless=True, quality=effort, exact=True)
+    else:
+        options.update(lossless=False, quality=max(1, min(100, int(quality))))
+    img.save(output_path, format="WEBP", **options)
+    return output_format
@@ -1,5 +1,6 @@
 import tkinter as tk
 from ui_manager_module import UIManager
+import multiprocessing
 import sys
 import os
 
@@ -48,6 +49,10 @@ def main():
         
     app = UIManager(root)
     root.mainloop()
+    # Don't wait for font tiles nobody will see
+    app.font_gallery.shutdown()
 
 if __name__ == '__main__':
+    # Needed for the export process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,175 @@
+import copy
+import io
+import json
+import os
+from icon_cache import icon_cache
+
+# Paragraph specs are plain JSON objects using the same keys as the paragraph
+# dicts UIManager builds, except that icons are given as file paths:
+#
+#   {"text_lines": ["#one", "#two", "#three"],
+#    "fonts": ["Roboto.ttf"],
+#    "colors": ["#00a69c", "#fc1a84", "#fc1a84"],
+#    "positions": {"text0": [150, 150], "big_icon": [100, 600]},
+#    "font_sizes": {"text0": 150},
+#    "icon_sizes": {"big_icon": [300, 300]},
+#    "effects": {"stroke": true, "stroke_width": 3},
+#    "icons": {"big_icon": "ICONS/star.png"},
+#    "output": "star.png"}
+#
+# Every key is optional; missing values fall back to default_paragraph().
+# Specs built in-process (spec_from_paragraph) may carry icons as PNG bytes
+# instead of paths; both forms pickle cheaply for worker processes.
+
+ICON_TYPES = ('small_icon', 'big_icon')
+SPEC_KEYS = ('active', 'text_lines', 'fonts', 'colors', 'positions', 'font_sizes', 'icon_sizes', 'effects')
+
+def default_paragraph():
+    """Return a new paragraph dict with the same defaults as UIManager.add_paragraph"""
+    return {
+        'active': True,
+        'text_lines': ['', '', ''],
+        'fonts': [],
+        'colors': ['#000000', '#000000', '#000000'],
+        'positions': {
+            'text0': (150, 150),
+            'text1': (150, 250),
+            'text2': (150, 350),
+            'small_icon': (600, 600),
+            'big_icon': (100, 600)
+        },
+        'font_sizes': {
+            'text0': 50,
+            'text1': 50,
+            'text2': 50
+        },
+        'icon_sizes': {
+            'small_icon': (70, 70),
+            'big_icon': (150, 150)
+        },
+        'icons': {
+            'small_icon': None,
+            'big_icon': None
+        },
+        'effects': {
+            'shadow': False,
+            'outline': False,
+            'stroke': False,
+            'shadow_offset': 3,
+            'outline_width': 1,
+            'stroke_width': 2
+        }
+    }
+
+def resolve_path(path, base_dir=None):
+    """Resolve a spec path relative to the working directory, then base_dir"""
+    if os.path.isabs(path) or os.path.exists(path) or not base_dir:
+        return path
+    return os.path.join(base_dir, path)
+
+def paragraph_from_spec(spec, base_dir=None):
+    """Build a render-ready paragraph dict from a JSON spec.
+
+    Icons are loaded from their paths and resized to icon_sizes, the way
+    update_preview prepares them for ImageGenerator.generate_image.
+    """
+    paragraph = default_paragraph()
+
+    paragraph['active'] = spec.get('active', True)
+    text_lines = list(spec.get('text_lines', []))[:3]
+    paragraph['text_lines'] = text_lines + [''] * (3 - len(text_lines))
+    paragraph['fonts'] = list(spec.get('fonts', paragraph['fonts']))
+    colors = list(spec.get('colors', []))[:3]
+    paragraph['colors'] = colors + paragraph['colors'][len(colors):]
+
+    for key, value in spec.get('positions', {}).items():
+        paragraph['positions'][key] = tuple(value)
+    for key, value in spec.get('font_sizes', {}).items():
+        paragraph['font_sizes'][key] = int(value)
+    for key, value in spec.get('icon_sizes', {}).items():
+        paragraph['icon_sizes'][key] = tuple(int(v) for v in value)
+    paragraph['effects'].update(spec.get('effects', {}))
+
+    for icon_type in ICON_TYPES:
+        icon_source = spec.get('icons', {}).get(icon_type)
+        if not icon_source:
+            continue
+        if isinstance(icon_source, bytes):
+            icon = icon_cache.from_bytes(icon_source)
+        else:
+            icon_path = resolve_path(icon_source, base_dir)
+            icon = icon_cache.load(icon_path)
+            if icon is None:
+                raise ValueError(f"Could not load {icon_type}: {icon_path}")
+            paragraph['icons'][f'{icon_type}_path'] = icon_path
+        width, height = paragraph['icon_sizes'][icon_type]
+        paragraph['icons'][icon_type] = icon
+        paragraph['icons'][f'{icon_type}_resized'] = icon_cache.resized(icon, width, height)
+
+    return paragraph
+
+def spec_from_paragraph(paragraph):
+    """Return a pickle-friendly spec for a UI paragraph dict.
+
+    Icons are referenced by path when the paragraph knows where they came
+    from, otherwise the original icon is passed as PNG bytes.
+    """
+    spec = {key: copy.deepcopy(paragraph[key]) for key in SPEC_KEYS if key in paragraph}
+    icons = {}
+    for icon_type in ICON_TYPES:
+        icon = paragraph.get('icons', {}).get(icon_type)
+        if icon is None:
+            continue
+        if isinstance(icon, (str, bytes)):
+            # Already in spec form
+            icons[icon_type] = icon
+            continue
+        icon_path = paragraph['icons'].get(f'{icon_type}_path')
+        if icon_path:
+            icons[icon_type] = icon_path
+        else:
+            buffer = io.BytesIO()
+            icon.save(buffer, format="PNG")
+            icons[icon_type] = buffer.getvalue()
+    spec['icons'] = icons
+    return spec
+
+def merge_specs(base, override):
+    """Overlay one spec onto another; nested dicts are merged one level deep"""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+def load_specs(path):
+    """Yield paragraph specs from a .jsonl file (one per line) or a .json file.
+
+    A .json file may hold a single spec, a list of specs, or an object with a
+    "paragraphs" list and an optional shared "template" spec.
+    """
+    if path.lower().endswith('.jsonl'):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_number}: invalid JSON: {e}") from e
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if isinstance(data, dict) and 'paragraphs' in data:
+        template = data.get('template', {})
+        for spec in data['paragraphs']:
+            yield merge_specs(template, spec) if template else spec
+    elif isinstance(data, list):
+        yield from data
+    else:
+        yield data
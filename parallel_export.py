@@ -0,0 +1,260 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from image_generator import ImageGenerator
+from image_writer import format_extension, DEFAULT_PROFILE, DEFAULT_FORMAT, DEFAULT_WEBP_QUALITY
+from paragraph_spec import paragraph_from_spec
+from render_cache import render_key, fallback_font_digests
+from utils import sanitize_filename
+
+# Parallel export of paragraph specs (see paragraph_spec.py).
+#
+# Every worker process builds its own ImageGenerator once, so it keeps a warm
+# font_cache and text layer cache for all the jobs it handles. Jobs are
+# (index, spec, output_path) tuples; the output filename depends only on the
+# spec's position in the input, so the files written (and their pixels) are the
+# same whatever the worker count. With a RenderCache, specs whose render inputs
+# were exported before are copied from the cache instead of being rendered.
+#
+# Workers are spawned, not forked: the UI process runs threads (preview
+# renderer, thumbnail loaders) that hold locks such as the font_cache and
+# LRUCache ones, and a child forked while one is held would deadlock on it.
+
+_generator = None
+_base_dir = None
+_render_cache = None
+_fallback_digests = None
+
+def default_workers():
+    """Return the default number of export worker processes"""
+    return os.cpu_count() or 1
+
+def output_filename(spec, index, output_format=DEFAULT_FORMAT):
+    """Return the output filename for the index-th (0-based) spec"""
+    if spec.get('output'):
+        return sanitize_filename(os.path.basename(spec['output']))
+    # Same naming as the original UIManager.export_all_images
+    return f"CrHashtag_P{index + 1}{format_extension(output_format)}"
+
+def _init_worker(font_dir, base_dir, encoder_profile=DEFAULT_PROFILE,
+                 output_format=DEFAULT_FORMAT, webp_quality=DEFAULT_WEBP_QUALITY, render_cache=None,
+                 fallback_digests=None):
+    """Set up the per-process generator (process pool initializer)"""
+    global _generator, _base_dir, _render_cache, _fallback_digests
+    _generator = ImageGenerator(font_dir=font_dir, encoder_profile=encoder_profile,
+                                output_format=output_format, webp_quality=webp_quality)
+    _base_dir = base_dir
+    _render_cache = render_cache
+    _fallback_digests = fallback_digests
+
+def _render_job(job):
+    """Render one job; returns (index, output_path, error message or None, served from cache)"""
+    index, spec, output_path = job
+    try:
+        key = None
+        if _render_cache is not None:
+            key = render_key(spec, _generator.font_dir, _base_dir, _generator.output_size,
+                             _generator.writer_options(output_path), _fallback_digests)
+            if _render_cache.fetch(key, output_path):
+                return index, output_path, None, True
+        paragraph = paragraph_from_spec(spec, _base_dir)
+        _generator.generate_image([paragraph], output_path)
+        if key is not None:
+            _render_cache.store(key, output_path)
+        return index, output_path, None, False
+    except Exception as e:
+        return index, output_path, str(e), False
+
+def iter_export(specs, out_dir, workers=1, font_dir="FONT MAP", base_dir=None,
+                in_process=True, cancel_event=None, encoder_profile=DEFAULT_PROFILE,
+                output_format=DEFAULT_FORMAT, webp_quality=DEFAULT_WEBP_QUALITY, render_cache=None):
+    """Render specs into out_dir, yielding (index, output_path, error, cached) per image.
+
+    Results are yielded as they finish, not in input order. Jobs go to a
+    ProcessPoolExecutor with only a few jobs per worker in flight, so specs
+    may be a lazy iterator; with workers <= 1 and in_process set they are
+    rendered in the calling process instead.
+
+    Setting cancel_event (a threading.Event) stops the export between images:
+    no new jobs start, but images already being rendered are finished and
+    yielded. Closing the generator early cancels every job that has not
+    started yet without reporting the running ones.
+
+    encoder_profile, output_format and webp_quality are passed to
+    image_writer.save_image() for every image. With a render_cache
+    (render_cache.RenderCache) unchanged specs are copied from the cache and
+    reported with cached set; the cache is trimmed to its size limit at the end.
+    """
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = (
+        (index, spec, os.path.join(out_dir, output_filename(spec, index, output_format)))
+        for index, spec in enumerate(specs)
+    )
+
+    # Hash the fallback fonts for the cache keys once here, not in every worker
+    fallback_digests = fallback_font_digests() if render_cache is not None else None
+    worker_args = (font_dir, base_dir, encoder_profile, output_format, webp_quality, render_cache,
+                   fallback_digests)
+    workers = max(1, workers)
+    if workers == 1 and in_process:
+        _init_worker(*worker_args)
+        try:
+            for job in jobs:
+                if cancelled():
+                    return
+                yield _render_job(job)
+        finally:
+            if render_cache is not None:
+                render_cache.evict()
+        return
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=worker_args,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+    max_in_flight = workers * 2
+    pending = set()
+    try:
+        for job in jobs:
+            if cancelled():
+                break
+            pending.add(executor.submit(_render_job, job))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        while pending:
+            if cancelled():
+                # Drop queued jobs; the ones already running still get reported
+                pending = {future for future in pending if not future.cancel()}
+                if not pending:
+                    break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if render_cache is not None:
+            render_cache.evict()
+
+def export_specs(specs, out_dir, workers=1, font_dir="FONT MAP", base_dir=None,
+                 encoder_profile=DEFAULT_PROFILE, output_format=DEFAULT_FORMAT,
+                 webp_quality=DEFAULT_WEBP_QUALITY, render_cache=None):
+    """Render all specs and return their (index, output_path, error, cached) results in input order"""
+    results = list(iter_export(specs, out_dir, workers, font_dir, base_dir,
+                               encoder_profile=encoder_profile, output_format=output_format,
+                               webp_quality=webp_quality, render_cache=render_cache))
+    results.sort(key=lambda result: result[0])
+    return results
+
+class ExportJob:
+    """Runs iter_export on a background thread and reports through a queue.
+
+    specs may be a lazy iterator (pass total for progress/ETA); it is consumed
+    on the background thread. total may also be a function that counts the
+    specs; it is called on the background thread before the export starts,
+    and self.total is None until poll() has picked up its result. The owner
+    (normally the Tk main thread) polls `events` for ('total', count) and
+    ('result', (index, output_path, error, cached)) items and a final
+    ('finished', cancelled) item. cancel() stops the export between images;
+    images that were already written are kept.
+    """
+    def __init__(self, specs, out_dir, workers=1, font_dir="FONT MAP", base_dir=None, total=None,
+                 encoder_profile=DEFAULT_PROFILE, output_format=DEFAULT_FORMAT,
+                 webp_quality=DEFAULT_WEBP_QUALITY, render_cache=None):
+        self.specs = specs
+        self.out_dir = out_dir
+        self.workers = workers
+        self.font_dir = font_dir
+        self.base_dir = base_dir
+        self.encoder_profile = encoder_profile
+        self.output_format = output_format
+        self.webp_quality = webp_quality
+        self.render_cache = render_cache
+        if total is None and hasattr(specs, '__len__'):
+            total = len(specs)
+        self._count = total if callable(total) else None
+        self.total = None if callable(total) else total
+        self.events = queue.Queue()
+        self.results = []
+        self.started_at = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def _run(self):
+        try:
+            if self._count is not None:
+                self.events.put(('total', self._count()))
+            # Always render in worker processes: FreeType rendering in this
+            # process competes with the preview renderer and the Tk thread
+            # for the GIL instead of running in parallel with them.
+            exporter = iter_export(self.specs, self.out_dir, self.workers, self.font_dir,
+                                   self.base_dir, in_process=False, cancel_event=self._cancel,
+                                   encoder_profile=self.encoder_profile,
+                                   output_format=self.output_format,
+                                   webp_quality=self.webp_quality,
+                                   render_cache=self.render_cache)
+            for result in exporter:
+                self.events.put(('result', result))
+        except Exception as e:
+            self.events.put(('error', str(e)))
+        finally:
+            self.events.put(('finished', self._cancel.is_set()))
+
+    def poll(self):
+        """Drain pending events; returns (new results, finished flag, error or None)"""
+        new_results = []
+        finished = False
+        error = None
+        while True:
+            try:
+                kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'total':
+                self.total = payload
+            elif kind == 'result':
+                new_results.append(payload)
+            elif kind == 'error':
+                error = payload
+            elif kind == 'finished':
+                finished = True
+        self.results.extend(new_results)
+        return new_results, finished, error
+
+    def progress(self):
+        """Return (done, total, images per second, ETA seconds or None)"""
+        done = len(self.results)
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.total is not None and rate > 0:
+            eta = (self.total - done) / rate
+        return done, self.total, rate, eta
+
+    def cache_stats(self):
+        """Return (hits, misses) of the render cache over the finished images"""
+        hits = sum(1 for _, _, _, cached in self.results if cached)
+        misses = sum(1 for _, _, error, cached in self.results if not cached and not error)
+        return hits, misses
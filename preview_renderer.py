@@ -0,0 +1,184 @@
+import math
+import queue
+import threading
+from PIL import Image, ImageDraw, ImageFont
+from font_cache import get_font
+from font_fallback import font_for_text
+from text_effects import draw_text_with_effects
+from icon_cache import get_resized_icon
+
+# Background rasterization for the preview.
+#
+# UIManager.render_preview describes what each preview element needs and
+# hands the uncached ones to PreviewRenderer, which draws them on a worker
+# thread. Only PIL work happens there: PhotoImages are created and shown on
+# the Tk main thread when the result is picked up. font_cache gives the
+# worker its own FreeType faces, so it never shares one with the Tk thread. Every request carries a
+# generation number; a newer request makes older ones stale, so the worker
+# skips what is left of them and the UI drops their results.
+#
+# While the user is interacting (e.g. clicking the size buttons) the preview
+# uses proxy images: lines drawn at PROXY_SCALE without stroke/outline and
+# scaled back up, icons resized with BILINEAR. UIManager schedules a
+# full-quality refine pass once the input has been idle for a while.
+
+PROXY_SCALE = 0.5
+
+# Space around a line's text, plus room for shadow/stroke/outline
+LINE_PADDING = 20
+EFFECT_PADDING = 10
+
+def line_padding(effects=None):
+    """Return the space text_line_image leaves around the text on each side"""
+    return LINE_PADDING + (EFFECT_PADDING if effects else 0)
+
+def text_line_image(text, font_path, size, color, effects=None, fallback_font_path=None, padding=None):
+    """Rasterize one preview text line into a padded RGBA image.
+
+    padding overrides line_padding(effects), e.g. for proxies drawn at a
+    reduced scale. fallback_font_path is only used when font_path can't be
+    loaded.
+    """
+    try:
+        # Characters the font lacks are drawn in the first system font that has them,
+        # the same chain ImageGenerator uses for export
+        font = font_for_text(text, font_path, size)
+    except Exception as e:
+        print(f"Failed to load font {font_path}: {e}")
+        # Try system font as fallback if available
+        try:
+            if fallback_font_path:
+                font = get_font(fallback_font_path, size)
+                print(f"Using system font as fallback: {fallback_font_path}")
+            else:
+                # Last resort: use default font
+                font = ImageFont.load_default()
+                print("Using default font as final fallback")
+        except Exception:
+            # Absolute last resort
+            font = ImageFont.load_default()
+            print("Using PIL default font as final fallback")
+
+    # Get text dimensions using getbbox() (more reliable than getsize)
+    try:
+        bbox = font.getbbox(text)
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
+    except AttributeError:
+        # Fall back to getsize() for older PIL versions
+        try:
+            text_width, text_height = font.getsize(text)
+        except Exception as e:
+            print(f"Error measuring text: {e}")
+            # Estimate dimensions as fallback
+            text_width = len(text) * size // 2
+            text_height = size + 4
+
+    # Add padding and space for effects
+    if padding is None:
+        padding = line_padding(effects)
+
+    # Thêm chiều cao để tránh bị cắt phần descender (g, y, p...)
+    descender_fix = int(size * 0.3)  # Khoảng 30% font size
+
+    width = math.ceil(text_width + padding * 2)
+    height = math.ceil(text_height + padding * 2 + descender_fix)
+
+    # Create a transparent image
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+
+    # Draw the text and any effects from a single glyph mask
+    draw_text_with_effects(img, padding, padding, text, font, color, effects)
+    return img
+
+def proxy_text_line_image(text, font_path, size, color, effects=None, fallback_font_path=None,
+                          scale=PROXY_SCALE):
+    """Quick stand-in for text_line_image: drawn at a reduced scale, without stroke/outline.
+
+    The padding is scaled down with the text, so once scaled back up the
+    text sits where text_line_image puts it.
+    """
+    padding = line_padding(effects) * scale
+    if effects:
+        effects = dict(effects, stroke=False, outline=False,
+                       shadow_offset=max(1, round(effects.get('shadow_offset', 3) * scale)))
+        if not effects.get('shadow'):
+            effects = None
+    small = text_line_image(text, font_path, max(1, round(size * scale)), color, effects, fallback_font_path,
+                            padding)
+    return small.resize((round(small.width / scale), round(small.height / scale)), Image.BILINEAR)
+
+def error_line_image(text):
+    """Placeholder shown instead of a text line that could not be rendered"""
+    img = Image.new('RGBA', (400, 50), (255, 255, 255, 200))
+    draw = ImageDraw.Draw(img)
+    fallback_font = ImageFont.load_default()
+    draw.text((10, 10), f"Font Error: {text}", fill="#FF0000", font=fallback_font)
+    return img
+
+def icon_image(icon, width, height, resample=Image.LANCZOS):
+    """Resize an icon for the preview (shared with export through icon_cache)"""
+    return get_resized_icon(icon, width, height, resample)
+
+class PreviewRenderer:
+    """Single worker thread that runs preview raster jobs, newest request first.
+
+    submit(generation, jobs) queues a dict of key -> (function, args); the
+    worker calls each function and puts (generation, {key: (image, error)})
+    on `results`, with error set (and image None) for jobs that raised. Only
+    the newest request is kept: submitting replaces a request that hasn't
+    started, and a running one is abandoned between jobs.
+    """
+    def __init__(self):
+        self.results = queue.Queue()
+        self.submitted = 0
+        self.abandoned = 0
+        self._condition = threading.Condition()
+        self._request = None  # (generation, jobs) waiting for the worker
+        self._latest = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, generation, jobs):
+        with self._condition:
+            if self._request is not None:
+                self.abandoned += 1
+            self._request = (generation, jobs)
+            self._latest = generation
+            self.submitted += 1
+            self._condition.notify()
+
+    def _superseded(self, generation):
+        with self._condition:
+            return generation != self._latest
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._request is None:
+                    self._condition.wait()
+                generation, jobs = self._request
+                self._request = None
+
+            rendered = {}
+            for key, (function, args) in jobs.items():
+                if self._superseded(generation):
+                    break
+                try:
+                    rendered[key] = (function(*args), None)
+                except Exception as e:
+                    rendered[key] = (None, str(e))
+            else:
+                self.results.put((generation, rendered))
+                continue
+            with self._condition:
+                self.abandoned += 1
+
+    def poll(self):
+        """Return the results that arrived since the last poll, oldest first"""
+        results = []
+        while True:
+            try:
+                results.append(self.results.get_nowait())
+            except queue.Empty:
+                return results
@@ -0,0 +1,98 @@
+from utils import DraggableItem
+
+# Retained canvas items for the preview.
+#
+# UIManager.update_preview used to delete every canvas item and recreate the
+# grid, the border, one image item per element and three drag bindings per
+# element on each refresh. PreviewScene creates those items once and, on
+# later refreshes, only touches the items whose image, position or visibility
+# actually changed.
+
+ELEMENTS = ('text0', 'text1', 'text2', 'small_icon', 'big_icon')
+
+class PreviewScene:
+    """Canvas items for the preview grid, border, overlays and draggable elements.
+
+    Elements (ELEMENTS) are image items tagged with their name and made
+    draggable once; on_move(element, x, y) is called when a drag ends.
+    Overlays are plain image items (e.g. the "select fonts" reminder) that
+    sit below the elements.
+    """
+    def __init__(self, canvas, on_move, grid_spacing=50, border=(2, 2, 798, 798), overlays=()):
+        self.canvas = canvas
+        self.on_move = on_move
+        self.grid_spacing = grid_spacing
+        self.border = border
+        self._grid_size = None
+        self._items = {}      # element/overlay name -> canvas item id
+        self._shown = {}      # name -> (image, x, y) currently displayed, or None if hidden
+        self.draggables = {}  # element -> DraggableItem
+        self.item_updates = 0  # canvas calls made by show()/hide(), for benchmarks
+
+        self.canvas.delete("all")
+        self.update_grid()
+        # Stacking order: grid, border, overlays, then the elements in ELEMENTS order
+        self.canvas.create_rectangle(*border, outline="#cccccc", width=2, tags="border")
+        for name in overlays:
+            self._items[name] = self.canvas.create_image(0, 0, anchor='nw', state='hidden', tags=name)
+            self._shown[name] = None
+        for element in ELEMENTS:
+            self._add_element(element)
+
+    def _add_element(self, element):
+        item_id = self.canvas.create_image(0, 0, anchor='nw', state='hidden', tags=element)
+        self._items[element] = item_id
+        self._shown[element] = None
+
+        draggable = DraggableItem(self.canvas, item_id, element, self.on_move)
+        self.draggables[element] = draggable
+        self.canvas.tag_bind(element, "<ButtonPress-1>", draggable.on_drag_start)
+        self.canvas.tag_bind(element, "<B1-Motion>", draggable.on_drag_motion)
+        self.canvas.tag_bind(element, "<ButtonRelease-1>", draggable.on_drag_end)
+
+    def update_grid(self):
+        """(Re)draw the alignment grid if the canvas size changed since the last call"""
+        size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+        if size == self._grid_size:
+            return
+        self._grid_size = size
+        self.canvas.delete("grid")
+        canvas_width, canvas_height = size
+        for x in range(0, canvas_width, self.grid_spacing):
+            self.canvas.create_line(x, 0, x, canvas_height, fill="#dddddd", tags="grid")
+        for y in range(0, canvas_height, self.grid_spacing):
+            self.canvas.create_line(0, y, canvas_width, y, fill="#dddddd", tags="grid")
+        self.canvas.tag_lower("grid")
+
+    def show(self, name, image, x, y):
+        """Display image at (x, y) for an element or overlay, updating only what changed.
+
+        The scene keeps a reference to image, so callers don't need to.
+        """
+        item_id = self._items[name]
+        shown = self._shown[name]
+        if shown is None:
+            self.canvas.itemconfigure(item_id, image=image, state='normal')
+            self.canvas.coords(item_id, x, y)
+            self.item_updates += 2
+        else:
+            shown_image, shown_x, shown_y = shown
+            if shown_image is not image:
+                self.canvas.itemconfigure(item_id, image=image)
+                self.item_updates += 1
+            # Also re-sync after a drag moved the item without a refresh
+            if (shown_x, shown_y) != (x, y) or self.canvas.coords(item_id)[:2] != [x, y]:
+                self.canvas.coords(item_id, x, y)
+                self.item_updates += 1
+        self._shown[name] = (image, x, y)
+
+    def hide(self, name):
+        """Hide an element or overlay (its bindings stay in place)"""
+        if self._shown[name] is not None:
+            self.canvas.itemconfigure(self._items[name], state='hidden', image='')
+            self._shown[name] = None
+            self.item_updates += 1
+
+    def hide_all(self):
+        for name in self._items:
+            self.hide(name)
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from paragraph_spec import resolve_path
+from font_fallback import system_font_paths
+
+# Content-addressed cache of rendered export files.
+#
+# The key is a SHA-256 over everything that decides the output bytes: the
+# paragraph spec (text, sizes, colors, positions, effects), the contents of
+# its font files, the system fallback fonts and its icons, the canvas size and
+# the writer settings (encoder profile, format, quality). Renaming or moving a font or icon does not
+# invalidate entries, editing one does. Entries are plain files named by key
+# under the cache directory; hits are copied to the output path and the
+# least recently used entries are evicted once the directory grows past
+# max_bytes.
+#
+# Bump RENDER_VERSION whenever a change to the renderer alters the pixels it
+# produces, so stale entries stop matching.
+
+RENDER_VERSION = 2
+DEFAULT_CACHE_DIR = os.path.join("CACHE", "renders")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Spec keys that affect rendering (icons and output are handled separately)
+_KEYED_SPEC_KEYS = ('active', 'text_lines', 'fonts', 'colors', 'positions', 'font_sizes', 'icon_sizes', 'effects')
+
+_file_digests = {}  # (path, mtime_ns, size) -> sha256 hex of the file contents
+_file_digests_lock = threading.Lock()
+
+def file_digest(path):
+    """Return the SHA-256 of a file's contents, memoized by path, mtime and size"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _file_digests_lock:
+        digest = _file_digests.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        with _file_digests_lock:
+            _file_digests[key] = digest
+    return digest
+
+def _font_digest(font_dir, font_name):
+    try:
+        return file_digest(os.path.join(font_dir, font_name))
+    except OSError:
+        # ImageGenerator falls back to the default font for missing files
+        return None
+
+def fallback_font_digests():
+    """Return the digests of the system fallback fonts, in fallback order"""
+    return [file_digest(path) for path in system_font_paths()]
+
+def render_key(spec, font_dir="FONT MAP", base_dir=None, output_size=(1200, 1200), writer_options=None,
+               fallback_digests=None):
+    """Return the cache key (hex digest) for rendering spec with the given settings.
+
+    fallback_digests is fallback_font_digests(), computed here if not given
+    (export workers get it from the parent instead of hashing the fonts
+    again). Raises OSError if an icon file can't be read; the render would
+    fail too.
+    """
+    fonts = list(spec.get('fonts', [])) or ["Arial.ttf"]
+    icons = {}
+    for icon_type, icon_source in sorted(spec.get('icons', {}).items()):
+        if not icon_source:
+            continue
+        if isinstance(icon_source, bytes):
+            icons[icon_type] = hashlib.sha256(icon_source).hexdigest()
+        else:
+            icons[icon_type] = file_digest(resolve_path(icon_source, base_dir))
+
+    material = {
+        'version': RENDER_VERSION,
+        'spec': {key: spec[key] for key in _KEYED_SPEC_KEYS if key in spec},
+        'font_files': [_font_digest(font_dir, font_name) for font_name in fonts],
+        'fallback_fonts': fallback_digests if fallback_digests is not None else fallback_font_digests(),
+        'icons': icons,
+        'output_size': list(output_size),
+        'writer': writer_options or {},
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(',', ':'), default=list)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+class RenderCache:
+    """Size-bounded directory of rendered files keyed by render_key().
+
+    Safe to share between export worker processes: entries are written to a
+    temporary file and renamed into place, and a lookup that loses a race
+    with eviction just counts as a miss.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def fetch(self, key, output_path):
+        """Copy the cached file for key to output_path; returns False on a miss"""
+        entry = self._entry_path(key)
+        try:
+            shutil.copyfile(entry, output_path)
+            os.utime(entry)  # mark as recently used for eviction
+            return True
+        except OSError:
+            return False
+
+    def store(self, key, rendered_path):
+        """Add a freshly rendered file to the cache (errors are ignored)"""
+        entry = self._entry_path(key)
+        temp_path = f"{entry}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            shutil.copyfile(rendered_path, temp_path)
+            os.replace(temp_path, entry)
+        except OSError as e:
+            print(f"[RENDER CACHE] Could not store {key}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _entries(self):
+        """Return (mtime, size, path) for every cached file"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self):
+        """Return the total size of the cache in bytes"""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes; returns files removed"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Delete every cached file"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
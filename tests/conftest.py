@@ -0,0 +1,15 @@
+import os
+import pytest
+
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+FONT_NAME = "Lato-Regular.ttf"
+
+@pytest.fixture
+def font_dir():
+    """Directory of the fonts tracked for the tests"""
+    return FONT_DIR
+
+@pytest.fixture
+def font_path(font_dir):
+    """A small Latin font (Lato Regular, 263 code points)"""
+    return os.path.join(font_dir, FONT_NAME)
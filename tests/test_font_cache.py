@@ -0,0 +1,17 @@
+import threading
+from font_cache import FontCache
+
+def test_faces_are_per_thread(font_path):
+    cache = FontCache()
+    font = cache.get_font(font_path, 20)
+    assert cache.get_font(font_path, 20) is font
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(cache.get_font(font_path, 20)))
+    thread.start()
+    thread.join()
+    assert other[0] is not font
+    assert other[0].cache_key == font.cache_key
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['threads'], stats['font_files']) == (1, 2, 2, 1)
@@ -0,0 +1,65 @@
+import struct
+from PIL import ImageFont
+from font_catalog import Coverage, read_font_info, _cmap_ranges
+
+def cmap_format4(segments):
+    """Build a cmap table with one (3, 1) format 4 subtable from (start, end, delta, glyph ids) segments"""
+    segments = list(segments) + [(0xFFFF, 0xFFFF, 1, None)]
+    seg_count = len(segments)
+    glyph_arrays = b""
+    range_offsets = []
+    for i, (start, end, delta, glyph_ids) in enumerate(segments):
+        if glyph_ids is None:
+            range_offsets.append(0)
+        else:
+            # Offset from this segment's idRangeOffset entry to its glyph ids
+            range_offsets.append(2 * (seg_count - i) + len(glyph_arrays))
+            glyph_arrays += struct.pack(f">{len(glyph_ids)}H", *glyph_ids)
+    body = (struct.pack(">HHHH", 2 * seg_count, 0, 0, 0)
+            + struct.pack(f">{seg_count}H", *(end for _, end, _, _ in segments)) + b"\0\0"
+            + struct.pack(f">{seg_count}H", *(start for start, _, _, _ in segments))
+            + struct.pack(f">{seg_count}h", *(delta for _, _, delta, _ in segments))
+            + struct.pack(f">{seg_count}H", *range_offsets)
+            + glyph_arrays)
+    subtable = struct.pack(">HHH", 4, 6 + len(body), 0) + body
+    return struct.pack(">HHHHI", 0, 1, 3, 1, 12) + subtable
+
+def test_coverage_matches_rendered_glyphs(font_path):
+    coverage = read_font_info(font_path)[0].coverage
+    font = ImageFont.truetype(font_path, 8)
+    # Unmapped code points render the .notdef glyph; U+FFFF is never mapped
+    notdef = font.getmask(chr(0xFFFF))
+    notdef = (notdef.size, bytes(notdef))
+    # Every code point up to U+2FFF (all the scripts Latin fonts cover), a
+    # sample of the rest of the BMP: .notdef is slow to render in bulk
+    codepoints = list(range(0x20, 0x3000)) + list(range(0x3000, 0x10000, 7))
+    mismatches = []
+    for codepoint in codepoints:
+        if 0xD800 <= codepoint <= 0xDFFF:
+            continue
+        mask = font.getmask(chr(codepoint))
+        if ((mask.size, bytes(mask)) != notdef) != (codepoint in coverage):
+            mismatches.append(hex(codepoint))
+    assert mismatches == []
+    assert len(coverage) == 263
+
+def test_format4_delta_wrapping_to_glyph_zero_is_a_hole():
+    # 'C' + delta == 0 (mod 65536): only 'C' is unmapped
+    assert _cmap_ranges(cmap_format4([(0x41, 0x45, -0x43, None)])) == [(0x41, 0x42), (0x44, 0x45)]
+    # Hole at the start and end of a segment
+    assert _cmap_ranges(cmap_format4([(0x41, 0x43, -0x41, None)])) == [(0x42, 0x43)]
+    assert _cmap_ranges(cmap_format4([(0x41, 0x43, -0x43, None)])) == [(0x41, 0x42)]
+
+def test_format4_glyph_id_array():
+    # Zero entries, and entries that the delta wraps to 0, are unmapped
+    segment = (0x61, 0x65, -5, [7, 0, 5, 9, 10])
+    assert _cmap_ranges(cmap_format4([segment])) == [(0x61, 0x61), (0x64, 0x65)]
+
+def test_coverage_bitmap_round_trip():
+    ranges = [(0, 0), (7, 8), (15, 33), (0x1F600, 0x1F64F)]
+    coverage = Coverage.from_blob(Coverage.from_ranges(ranges).to_blob())
+    expected = {codepoint for first, last in ranges for codepoint in range(first, last + 1)}
+    assert {codepoint for codepoint in range(0x1F700) if codepoint in coverage} == expected
+    assert len(coverage) == len(expected)
+    assert 0x1F700 not in coverage and -1 not in coverage
+    assert coverage.missing("\x07\x08!\"\U0001F600") == '"'
@@ -0,0 +1,35 @@
+import pytest
+from icon_index import IconIndex, edit_distance
+
+NAMES = ["red_heart", "night_sky", "gold_star", "calendar_blue", "music_note"]
+
+@pytest.fixture
+def index(tmp_path):
+    for name in NAMES:
+        (tmp_path / f"{name}.png").write_bytes(b"")
+    return IconIndex(str(tmp_path))
+
+def test_exact_terms_score_1000(index):
+    assert index.search("gold star") == [("gold_star.png", 1000, ["gold", "star"])]
+
+@pytest.mark.parametrize("typo, filename, token", [
+    ("heatr", "red_heart.png", "heart"),   # swapped letters
+    ("nigth", "night_sky.png", "night"),
+    ("stra", "gold_star.png", "star"),
+    ("calender", "calendar_blue.png", "calendar"),  # substituted letter
+    ("msic", "music_note.png", "music"),   # dropped letter
+])
+def test_typos_match_fuzzily(index, typo, filename, token):
+    results = index.search(typo)
+    assert results and results[0][0] == filename
+    assert results[0][2] == [f"{typo}~{token}"]
+    assert 0 < results[0][1] < 1
+
+def test_fuzzy_can_be_disabled(index):
+    assert index.search("heatr", fuzzy=False) == []
+
+def test_edit_distance():
+    assert edit_distance("stra", "star", 1) == 1
+    assert edit_distance("star", "star", 1) == 0
+    assert edit_distance("kitten", "sitting", 1) == 2
+    assert edit_distance("kitten", "sitting", 5) == 3
@@ -0,0 +1,10 @@
+from preview_renderer import text_line_image, proxy_text_line_image
+
+def test_proxy_text_lines_up_with_full_quality_line(font_path):
+    for effects in (None, {'shadow': True, 'stroke': True, 'outline': True}):
+        full = text_line_image("Hashtag", font_path, 120, "#000000", effects)
+        proxy = proxy_text_line_image("Hashtag", font_path, 120, "#000000", effects)
+        full_left, full_top = full.getbbox()[:2]
+        proxy_left, proxy_top = proxy.getbbox()[:2]
+        # Half-size rasterization moves the ink edge by a pixel or two at most
+        assert abs(full_left - proxy_left) <= 3 and abs(full_top - proxy_top) <= 3
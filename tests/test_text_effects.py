@@ -0,0 +1,24 @@
+import os
+from PIL import Image
+from font_cache import get_font
+from image_generator import ImageGenerator
+from preview_renderer import text_line_image
+from text_effects import draw_text_with_effects, get_text_layer
+
+EFFECTS = {'shadow': True, 'stroke': True, 'outline': True}
+
+def test_blank_layer_colorizes_to_nothing(font_path):
+    layer = get_text_layer("   ", get_font(font_path, 32), padding=2)
+    assert layer.colorize("#ff0000", EFFECTS) == (None, (0, 0))
+
+def test_whitespace_only_line_draws_nothing(font_path):
+    img = Image.new('RGBA', (200, 100), (0, 0, 0, 0))
+    draw_text_with_effects(img, 10, 10, "   ", get_font(font_path, 32), "#ff0000", EFFECTS)
+    assert img.getbbox() is None
+
+def test_whitespace_only_line_in_preview_and_export(font_dir, font_path):
+    assert text_line_image("   ", font_path, 32, "#000000", EFFECTS).getbbox() is None
+
+    generator = ImageGenerator(font_dir=font_dir)
+    paragraph = {'active': True, 'text_lines': ["  ", "ok"], 'fonts': [os.path.basename(font_path)], 'effects': EFFECTS}
+    assert generator.render_image([paragraph]).getbbox() is not None
@@ -0,0 +1,23 @@
+import pytest
+import text_import
+from text_import import ParagraphStore, iter_text_paragraphs
+
+LINES = ["#one", "  ", "#two", "#three", "", "#four", "#năm", "#six", "#seven"]
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n", "\r"])
+def test_store_splits_like_iter_text_paragraphs(tmp_path, newline):
+    path = tmp_path / "tags.txt"
+    path.write_bytes(newline.join(LINES).encode('utf-8'))
+    expected = [p['text_lines'] for p in iter_text_paragraphs(str(path))]
+    store = ParagraphStore.from_text_file(str(path))
+    assert [p['text_lines'] for p in store.iter_paragraphs()] == expected
+    assert [store.peek(i)['text_lines'] for i in range(len(store))] == expected
+    assert expected == [["#one", "#two", "#three"], ["#four", "#năm", "#six"], ["#seven", "", ""]]
+
+def test_crlf_split_across_reads(tmp_path):
+    path = tmp_path / "tags.txt"
+    path.write_bytes(b"ab\r\ncd\r\n\r\nef\rgh")
+    with open(path, 'rb') as f:
+        # Every read ends right after a \r
+        lines = list(text_import.iter_raw_lines(f, chunk_size=3))
+    assert lines == [(0, b"ab"), (4, b"cd"), (8, b""), (10, b"ef"), (13, b"gh")]
@@ -0,0 +1,16 @@
+from PIL import Image
+from thumbnail_store import ThumbnailStore, THUMBNAIL_KINDS
+
+def test_stored_thumbnails_are_decoded_before_returning(tmp_path):
+    icon = tmp_path / "icon.png"
+    Image.new('RGBA', (400, 300), (10, 20, 30, 255)).save(icon)
+    store = ThumbnailStore(str(tmp_path / "thumbnails.sqlite3"))
+    try:
+        store.get(str(icon))  # renders and stores every kind
+        for kind, (width, height, _) in THUMBNAIL_KINDS.items():
+            thumbnail = store.get(str(icon), kind)
+            # Loaded on this thread, not lazily by whoever uses it
+            assert thumbnail.im is not None
+            assert thumbnail.mode == 'RGBA' and max(thumbnail.size) <= max(width, height)
+    finally:
+        store.close()
@@ -0,0 +1,186 @@
+import math
+from PIL import Image, ImageChops, ImageColor, ImageDraw
+from utils import lighten_color, darken_color, LRUCache
+
+# Text effect engine shared by ImageGenerator and the preview renderer.
+#
+# Each line is rasterized once into an 8-bit coverage mask (a TextLayer).
+# Shadow, stroke and outline layers are built from that mask by offsetting and
+# dilating it, colorized, and alpha-composited inside the line's bounding box
+# in the same order the old per-offset draw.text loops used: shadow, stroke,
+# outline, fill. TextLayers are cached without any color baked in, so a color
+# change only re-tints the masks instead of rasterizing the text again.
+#
+# Accuracy: the old loops blended (2w+1)²-1 copies of the same color, which is
+# a "screen" of the shifted coverage masks. dilate_mask() computes the same
+# screen separably, so coverage (alpha) matches the loop output to within a
+# few levels of 8-bit rounding. Color can differ more only in the antialiased
+# fringe where a shadow and a stroke/outline overlap, because each old
+# draw.text call re-blended the pixel; bench_effects.py reports both numbers.
+
+def effect_colors(color):
+    """Return the shadow/outline/stroke colors derived from a line color"""
+    return {
+        'shadow_color': lighten_color(color, 3.0),  # 3× lighter
+        'outline_color': lighten_color(color, 2.0), # 2× lighter
+        'stroke_color': darken_color(color, 2.0)    # 2× darker
+    }
+
+def effect_padding(effects):
+    """Return how many pixels the enabled stroke/outline grow the glyphs by"""
+    if not effects:
+        return 0
+    padding = 0
+    if effects.get('stroke', False):
+        padding = max(padding, effects.get('stroke_width', 2))
+    if effects.get('outline', False):
+        padding = max(padding, effects.get('outline_width', 1))
+    return padding
+
+def render_text_mask(text, font, x, y, padding=0):
+    """Rasterize text once into an 8-bit coverage mask.
+
+    Returns (mask, (left, top)) where (left, top) is the canvas position of the
+    mask's top-left corner, so that compositing the mask there lines up with
+    draw.text((x, y), text, font=font). The mask has `padding` empty pixels
+    on every side of the ink so it can be dilated in place.
+    """
+    ix, iy = math.floor(x), math.floor(y)
+    fx, fy = x - ix, y - iy
+    bbox_left, bbox_top, bbox_right, bbox_bottom = font.getbbox(text)
+
+    # +2 leaves room for the sub-pixel start offset
+    width = bbox_right - bbox_left + padding * 2 + 2
+    height = bbox_bottom - bbox_top + padding * 2 + 2
+    mask = Image.new('L', (max(1, width), max(1, height)), 0)
+    position = (padding - bbox_left + fx, padding - bbox_top + fy)
+    if hasattr(font, 'draw_text'):
+        # FallbackFont draws its runs in several faces
+        font.draw_text(ImageDraw.Draw(mask), position, text, fill=255)
+    else:
+        ImageDraw.Draw(mask).text(position, text, fill=255, font=font)
+    return mask, (ix + bbox_left - padding, iy + bbox_top - padding)
+
+def dilate_mask(mask, width):
+    """Grow a coverage mask by `width` pixels in every direction (square kernel).
+
+    Equivalent to blending the mask at every offset in [-width, width]², but done
+    as one horizontal and one vertical pass, so the cost is linear in width.
+    The mask needs at least `width` pixels of empty padding on each side.
+    """
+    if width <= 0:
+        return mask
+
+    horizontal = mask
+    for d in range(1, width + 1):
+        horizontal = ImageChops.screen(horizontal, ImageChops.offset(mask, d, 0))
+        horizontal = ImageChops.screen(horizontal, ImageChops.offset(mask, -d, 0))
+
+    dilated = horizontal
+    for d in range(1, width + 1):
+        dilated = ImageChops.screen(dilated, ImageChops.offset(horizontal, 0, d))
+        dilated = ImageChops.screen(dilated, ImageChops.offset(horizontal, 0, -d))
+    return dilated
+
+def composite_tile(img, tile, left, top):
+    """Alpha-composite an RGBA tile onto img at (left, top), clipped to the image"""
+    x0 = max(left, 0)
+    y0 = max(top, 0)
+    x1 = min(left + tile.width, img.width)
+    y1 = min(top + tile.height, img.height)
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    if (x0, y0, x1, y1) != (left, top, left + tile.width, top + tile.height):
+        tile = tile.crop((x0 - left, y0 - top, x1 - left, y1 - top))
+    img.alpha_composite(tile, (x0, y0))
+
+class TextLayer:
+    """One line of text rasterized once into a coverage mask.
+
+    Stroke/outline masks are dilated from it on first use and kept, so
+    recoloring a line never touches the font rasterizer again.
+    """
+    def __init__(self, text, font, fraction=(0.0, 0.0), padding=0):
+        self.text = text
+        self.padding = padding
+        self.mask, self.origin = render_text_mask(text, font, fraction[0], fraction[1], padding)
+        self._dilated = {0: self.mask}
+
+    def dilated(self, width):
+        """Return the mask grown by width pixels (cached)"""
+        width = min(width, self.padding)
+        mask = self._dilated.get(width)
+        if mask is None:
+            mask = dilate_mask(self.mask, width)
+            self._dilated[width] = mask
+        return mask
+
+    def layers(self, color, effects=None):
+        """Return the (mask, (dx, dy), color) layers to stack, bottom first"""
+        layers = []
+        if effects:
+            colors = effect_colors(color)
+
+            # Shadow is the plain glyph mask, offset
+            if effects.get('shadow', False):
+                offset = effects.get('shadow_offset', 3)
+                layers.append((self.mask, (offset, offset), colors['shadow_color']))
+
+            # Stroke (darker than text)
+            if effects.get('stroke', False):
+                layers.append((self.dilated(effects.get('stroke_width', 2)), (0, 0), colors['stroke_color']))
+
+            # Outline (brighter than text)
+            if effects.get('outline', False):
+                layers.append((self.dilated(effects.get('outline_width', 1)), (0, 0), colors['outline_color']))
+
+        # Main text on top
+        layers.append((self.mask, (0, 0), color))
+        return layers
+
+    def colorize(self, color, effects=None):
+        """Stack the colored layers into one RGBA tile covering the line's bounding box.
+
+        Returns (tile, (left, top)) with left/top relative to the integer text
+        position, or (None, (0, 0)) if the line has no ink (e.g. only spaces).
+        """
+        layers = [(mask, offset, fill, mask.getbbox()) for mask, offset, fill in self.layers(color, effects)]
+        layers = [layer for layer in layers if layer[3]]
+        if not layers:
+            return None, (0, 0)
+
+        left = min(dx + box[0] for _, (dx, _), _, box in layers)
+        top = min(dy + box[1] for _, (_, dy), _, box in layers)
+        right = max(dx + box[2] for _, (dx, _), _, box in layers)
+        bottom = max(dy + box[3] for _, (_, dy), _, box in layers)
+
+        tile = Image.new('RGBA', (right - left, bottom - top), (0, 0, 0, 0))
+        for mask, (dx, dy), fill, box in layers:
+            alpha = mask.crop(box)
+            layer = Image.new('RGBA', alpha.size, ImageColor.getrgb(fill)[:3] + (0,))
+            layer.putalpha(alpha)
+            tile.alpha_composite(layer, (dx + box[0] - left, dy + box[1] - top))
+
+        return tile, (self.origin[0] + left, self.origin[1] + top)
+
+# Cache of TextLayers keyed by text, font, sub-pixel position and padding
+text_layer_cache = LRUCache(max_entries=256)
+
+def get_text_layer(text, font, x=0, y=0, padding=0):
+    """Return a (possibly cached) TextLayer for text drawn at (x, y)"""
+    fraction = (round(x - math.floor(x), 3), round(y - math.floor(y), 3))
+    font_key = getattr(font, 'cache_key', None)
+    if font_key is None:
+        # Fonts that did not come from font_cache have no stable identity
+        return TextLayer(text, font, fraction, padding)
+
+    key = (text, font_key, fraction, padding)
+    return text_layer_cache.get_or_create(key, lambda: TextLayer(text, font, fraction, padding))
+
+def draw_text_with_effects(img, x, y, text, font, color, effects=None):
+    """Draw text with line-specific effects (shadow, stroke, outline) onto an RGBA image"""
+    layer = get_text_layer(text, font, x, y, effect_padding(effects))
+    tile, (left, top) = layer.colorize(color, effects)
+    if tile is not None:
+        composite_tile(img, tile, math.floor(x) + left, math.floor(y) + top)
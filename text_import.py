@@ -0,0 +1,221 @@
+from array import array
+from collections.abc import MutableSequence
+from utils import LRUCache
+
+# Streaming import of hashtag text files.
+#
+# A text file is read as groups of three non-empty lines, one paragraph per
+# group. iter_text_paragraphs() yields them lazily for headless export, and
+# ParagraphStore gives the UI a list-like view of a huge file that only keeps
+# byte offsets per paragraph plus the paragraphs the user actually opened.
+
+LINES_PER_PARAGRAPH = 3
+
+# Files are split into lines like universal newlines mode does (at \n, \r\n
+# and \r), so ParagraphStore sees the same paragraphs as iter_text_paragraphs
+INDEX_CHUNK_SIZE = 1024 * 1024
+PARAGRAPH_CHUNK_SIZE = 4096
+
+def iter_raw_lines(f, offset=0, chunk_size=INDEX_CHUNK_SIZE):
+    """Yield (offset, line bytes without the line break) for binary file f from offset on"""
+    f.seek(offset)
+    pending = b""
+    while True:
+        chunk = f.read(chunk_size)
+        lines = (pending + chunk).splitlines(keepends=True)
+        pending = b""
+        # A last line without its break, or ending in a \r that may be half of
+        # a \r\n, continues in the next read
+        if chunk and lines and (lines[-1].endswith(b"\r") or not lines[-1].endswith(b"\n")):
+            pending = lines.pop()
+        for line in lines:
+            yield offset, line.rstrip(b"\r\n")
+            offset += len(line)
+        if not chunk:
+            return
+
+def paragraph_from_lines(lines):
+    """Build a paragraph dict for up to three imported text lines"""
+    lines = list(lines) + [""] * (LINES_PER_PARAGRAPH - len(lines))
+    return {
+        'active': True,
+        'text_lines': lines,
+        'fonts': [],
+        'colors': ['#000000', '#000000', '#000000'],
+        'positions': {
+            'text0': (150, 150),
+            'text1': (150, 250),
+            'text2': (150, 350),
+            'small_icon': (600, 600),
+            'big_icon': (100, 600)
+        },
+        'font_sizes': {
+            'text0': 150,
+            'text1': 160,
+            'text2': 140
+        },
+        'icon_sizes': {
+            'small_icon': (150, 150),
+            'big_icon': (300, 300)
+        },
+        'icons': {
+            'small_icon': None,
+            'big_icon': None
+        },
+        'effects': {
+            'shadow': False,
+            'outline': False,
+            'stroke': False,
+            'shadow_color': '#888888',
+            'shadow_offset': 3,
+            'outline_color': '#FFFFFF',
+            'outline_width': 1,
+            'stroke_color': '#222222',
+            'stroke_width': 2
+        }
+    }
+
+def iter_text_paragraphs(path, encoding='utf-8'):
+    """Yield paragraph dicts from a text file, three non-empty lines at a time.
+
+    Only the current group of lines is held in memory.
+    """
+    group = []
+    with open(path, 'r', encoding=encoding) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            group.append(line)
+            if len(group) == LINES_PER_PARAGRAPH:
+                yield paragraph_from_lines(group)
+                group = []
+    if group:
+        yield paragraph_from_lines(group)
+
+class ParagraphStore(MutableSequence):
+    """List of paragraph dicts, optionally backed by a large text file.
+
+    Paragraphs from the file are parsed on access. Paragraphs returned by
+    store[i] (and plain iteration) are kept ("loaded") because the UI edits
+    them in place. peek() goes through a small LRU window and
+    iter_paragraphs() streams from the file instead, so browsing or exporting
+    never pulls the whole file into memory. Per paragraph the store only
+    keeps a byte offset and a slot for a loaded dict.
+    """
+    def __init__(self, path=None, encoding='utf-8', window=256):
+        self.path = path
+        self.encoding = encoding
+        self._offsets = array('q')  # file offset of each paragraph, -1 if in-memory only
+        self._loaded = []           # loaded paragraph dict or None, aligned with _offsets
+        self._window = LRUCache(max_entries=window)
+        if path:
+            self._index_file()
+
+    @classmethod
+    def from_text_file(cls, path, encoding='utf-8'):
+        return cls(path, encoding)
+
+    def _index_file(self):
+        """Record where each group of three non-empty lines starts"""
+        count = 0
+        with open(self.path, 'rb') as f:
+            for offset, raw_line in iter_raw_lines(f):
+                stripped = raw_line.strip()
+                # Only decode lines that might be all non-ASCII whitespace
+                if stripped and (stripped.isascii() or stripped.decode(self.encoding, errors='replace').strip()):
+                    if count % LINES_PER_PARAGRAPH == 0:
+                        self._offsets.append(offset)
+                        self._loaded.append(None)
+                    count += 1
+
+    def _read_paragraph(self, f, offset):
+        lines = []
+        for _, raw_line in iter_raw_lines(f, offset, PARAGRAPH_CHUNK_SIZE):
+            line = raw_line.decode(self.encoding).strip()
+            if line:
+                lines.append(line)
+                if len(lines) == LINES_PER_PARAGRAPH:
+                    break
+        return paragraph_from_lines(lines)
+
+    def _parse(self, index):
+        with open(self.path, 'rb') as f:
+            return self._read_paragraph(f, self._offsets[index])
+
+    def _normalize_index(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("paragraph index out of range")
+        return index
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = self._normalize_index(index)
+        paragraph = self._loaded[index]
+        if paragraph is None:
+            offset = self._offsets[index]
+            paragraph = self._window.get(offset) or self._parse(index)
+            self._loaded[index] = paragraph
+        return paragraph
+
+    def __setitem__(self, index, paragraph):
+        index = self._normalize_index(index)
+        self._loaded[index] = paragraph
+
+    def __delitem__(self, index):
+        index = self._normalize_index(index)
+        del self._offsets[index]
+        del self._loaded[index]
+
+    def insert(self, index, paragraph):
+        index = max(0, min(index if index >= 0 else index + len(self), len(self)))
+        self._offsets.insert(index, -1)
+        self._loaded.insert(index, paragraph)
+
+    def is_loaded(self, index):
+        """True if paragraph index has been handed out (and may have been edited)"""
+        return self._loaded[index] is not None
+
+    def loaded_indices(self):
+        """Return the indices of loaded paragraphs"""
+        return [i for i, paragraph in enumerate(self._loaded) if paragraph is not None]
+
+    def peek(self, index):
+        """Return a paragraph for reading without keeping it loaded"""
+        index = self._normalize_index(index)
+        paragraph = self._loaded[index]
+        if paragraph is not None:
+            return paragraph
+        offset = self._offsets[index]
+        return self._window.get_or_create(offset, lambda: self._parse(index))
+
+    def iter_paragraphs(self):
+        """Yield every paragraph in order, streaming unloaded ones from the file"""
+        f = open(self.path, 'rb') if self.path else None
+        try:
+            for index in range(len(self)):
+                paragraph = self._loaded[index]
+                if paragraph is None:
+                    paragraph = self._read_paragraph(f, self._offsets[index])
+                yield paragraph
+        finally:
+            if f:
+                f.close()
+
+    def snapshot(self, copy_paragraph):
+        """Return an independent store for background readers.
+
+        Loaded paragraphs are copied with copy_paragraph() so later edits in
+        the UI do not race with the reader; file-backed ones stay offsets.
+        """
+        clone = ParagraphStore(encoding=self.encoding)
+        clone.path = self.path
+        clone._offsets = array('q', self._offsets)
+        clone._loaded = [copy_paragraph(p) if p is not None else None for p in self._loaded]
+        return clone
@@ -0,0 +1,123 @@
+import heapq
+import itertools
+import os
+import queue
+import threading
+
+# Off-thread image loading for thumbnail grids (icon search results, color
+# swatches).
+#
+# Widgets are created right away with a placeholder image and the decode is
+# queued with ThumbnailLoader.request(). Worker threads run the queued loads,
+# most recently requested batch first and in request order within a batch,
+# so whatever the user scrolled to last fills in first. Only PIL work
+# happens on the workers: the Tk thread calls poll() (e.g. from
+# widget.after) to pick up finished images and turn them into PhotoImages.
+# cancel() drops everything still queued and makes results of loads already
+# running stale, for when a new search replaces the old results.
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+class ThumbnailLoader:
+    """Pool of worker threads that load images by key, newest batch first.
+
+    request(key, function, *args) queues function(*args) unless key is
+    already queued or running; poll() returns [(key, image, error)] for the
+    loads finished since the last call, with image None and error set for
+    loads that raised.
+    """
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.results = queue.Queue()
+        self.loaded = 0
+        self.cancelled = 0
+        self._condition = threading.Condition()
+        self._heap = []       # (priority, key)
+        self._pending = {}    # key -> (priority, function, args) for queued loads
+        self._running = set()
+        self._generation = 0
+        self._batch = 0
+        self._sequence = itertools.count()
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def next_batch(self):
+        """Start a new batch: loads requested from now on run before older ones"""
+        with self._condition:
+            self._batch += 1
+
+    def request(self, key, function, *args):
+        """Queue function(*args) to produce the image for key"""
+        with self._condition:
+            if key in self._running:
+                return
+            priority = (-self._batch, next(self._sequence))
+            queued = self._pending.get(key)
+            if queued is not None and queued[0] <= priority:
+                return
+            # Re-queued keys keep their old heap entry, which is skipped when popped
+            self._pending[key] = (priority, function, args)
+            heapq.heappush(self._heap, (priority, key))
+            self._condition.notify()
+
+    def cancel(self):
+        """Drop queued loads and ignore the results of running ones"""
+        with self._condition:
+            self.cancelled += len(self._pending)
+            self._heap = []
+            self._pending.clear()
+            self._running.clear()
+            self._generation += 1
+            # Finished but not yet polled results belong to the old requests too
+            while True:
+                try:
+                    self.results.get_nowait()
+                except queue.Empty:
+                    break
+
+    def busy(self):
+        """True while loads are queued, running or waiting to be polled"""
+        with self._condition:
+            return bool(self._pending or self._running) or not self.results.empty()
+
+    def _next_job(self):
+        """Pop the highest priority queued load; call with the condition held"""
+        while self._heap:
+            priority, key = heapq.heappop(self._heap)
+            queued = self._pending.get(key)
+            if queued is not None and queued[0] == priority:
+                del self._pending[key]
+                return key, queued[1], queued[2]
+        return None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    self._condition.wait()
+                    job = self._next_job()
+                key, function, args = job
+                generation = self._generation
+                self._running.add(key)
+
+            try:
+                result = (key, function(*args), None)
+            except Exception as e:
+                result = (key, None, str(e))
+
+            with self._condition:
+                if generation != self._generation:
+                    continue
+                self._running.discard(key)
+                self.loaded += 1
+                self.results.put(result)
+
+    def poll(self):
+        """Return the (key, image, error) results that arrived since the last poll"""
+        results = []
+        while True:
+            try:
+                results.append(self.results.get_nowait())
+            except queue.Empty:
+                return results
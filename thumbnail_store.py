@@ -0,0 +1,194 @@
+import io
+import os
+import sqlite3
+import threading
+from PIL import Image
+from utils import open_for_thumbnail, thumbnail_resize
+
+# Persistent thumbnails for the icon search.
+#
+# Search results show every matching icon at 50x50 and the hover preview at
+# up to 200x200; decoding and resampling the full icon files for that made
+# broad searches over a large ICONS folder take seconds. ThumbnailStore keeps
+# small PNG thumbnails in a SQLite database, one row per (icon path, kind),
+# stamped with the icon's mtime and size so edited or replaced icons are
+# regenerated. fill() walks the icon folder on a background thread and
+# creates whatever is missing or stale; a lookup that gets there first
+# renders the thumbnail itself.
+
+DEFAULT_DB_PATH = os.path.join("CACHE", "thumbnails.sqlite3")
+ICON_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+
+# kind -> (width, height, keep aspect ratio)
+THUMBNAIL_KINDS = {
+    'result': (50, 50, False),  # search result cell (stretched, as before)
+    'hover': (200, 200, True),  # hover preview
+}
+
+# Modes that can be resampled directly; others (palette, CMYK, ...) are converted first
+RESAMPLE_MODES = ('RGB', 'RGBA', 'L', 'LA')
+
+def make_thumbnail(image, kind):
+    """Return an RGBA thumbnail of image for the given kind"""
+    width, height, keep_aspect = THUMBNAIL_KINDS[kind]
+    if image.mode not in RESAMPLE_MODES:
+        image = image.convert("RGBA")
+    return thumbnail_resize(image, (width, height), keep_aspect).convert("RGBA")
+
+class ThumbnailStore:
+    """SQLite-backed thumbnails of icon files, invalidated by file mtime and size.
+
+    Safe to use from the Tk thread and the background fill thread: the
+    connection is shared behind a lock, images are decoded outside it.
+    """
+    FILL_BATCH = 100  # icons per commit during fill()
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._fill_thread = None
+        self._fill_cancel = threading.Event()
+        self.filled = 0  # thumbnails created by the background fill, for diagnostics
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS thumbnails ("
+            " path TEXT NOT NULL, kind TEXT NOT NULL,"
+            " mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL,"
+            " data BLOB NOT NULL,"
+            " PRIMARY KEY (path, kind))")
+        self._db.commit()
+
+    @staticmethod
+    def _stamp(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _lookup(self, path, kind, stamp):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT mtime_ns, size, data FROM thumbnails WHERE path = ? AND kind = ?",
+                (path, kind)).fetchone()
+        if row is None or (row[0], row[1]) != stamp:
+            return None
+        return row[2]
+
+    @staticmethod
+    def _render(path, stamp):
+        """Decode the icon once and make every kind of thumbnail; returns ({kind: image}, rows)"""
+        largest = (max(width for width, _, _ in THUMBNAIL_KINDS.values()),
+                   max(height for _, height, _ in THUMBNAIL_KINDS.values()))
+        with open_for_thumbnail(path, largest) as image:
+            thumbnails = {}
+            # Largest kind first; smaller kinds start from the smallest thumbnail that still covers them
+            for kind in sorted(THUMBNAIL_KINDS, key=lambda kind: THUMBNAIL_KINDS[kind][:2], reverse=True):
+                width, height, _ = THUMBNAIL_KINDS[kind]
+                covering = [thumbnail for thumbnail in thumbnails.values()
+                            if thumbnail.width >= width and thumbnail.height >= height]
+                source = min(covering, key=lambda thumbnail: thumbnail.width * thumbnail.height, default=image)
+                thumbnails[kind] = make_thumbnail(source, kind)
+        rows = []
+        for kind, thumbnail in thumbnails.items():
+            buffer = io.BytesIO()
+            thumbnail.save(buffer, format="PNG", compress_level=1)
+            rows.append((path, kind, stamp[0], stamp[1], buffer.getvalue()))
+        return thumbnails, rows
+
+    def _store(self, rows):
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO thumbnails VALUES (?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+
+    def get(self, path, kind='result'):
+        """Return the thumbnail of an icon file as an RGBA image.
+
+        Stored thumbnails are used while the file's mtime and size match;
+        otherwise the icon is decoded (once for every kind) and the store
+        updated. Raises OSError if the file can't be read.
+        """
+        path = os.path.abspath(path)
+        stamp = self._stamp(path)
+        data = self._lookup(path, kind, stamp)
+        if data is not None:
+            img = Image.open(io.BytesIO(data))
+            # Decode here, on the caller's (loader) thread, not lazily in ImageTk
+            img.load()
+            return img
+        thumbnails, rows = self._render(path, stamp)
+        self._store(rows)
+        return thumbnails[kind]
+
+    def _missing(self, paths):
+        """Return the paths (with their stamps) that lack a current thumbnail of some kind"""
+        with self._lock:
+            rows = self._db.execute("SELECT path, kind, mtime_ns, size FROM thumbnails").fetchall()
+        stored = {}
+        for path, kind, mtime_ns, size in rows:
+            stored.setdefault(path, {})[kind] = (mtime_ns, size)
+        missing = []
+        for path in paths:
+            try:
+                stamp = self._stamp(path)
+            except OSError:
+                continue
+            kinds = stored.get(path, {})
+            if any(kinds.get(kind) != stamp for kind in THUMBNAIL_KINDS):
+                missing.append((path, stamp))
+        return missing
+
+    def fill(self, icon_dir):
+        """Create missing or stale thumbnails for every icon in icon_dir on a background thread.
+
+        Rows of icons that no longer exist in icon_dir are removed. Calling
+        fill() again cancels a fill that is still running.
+        """
+        self.cancel_fill()
+        self._fill_cancel = threading.Event()
+        self._fill_thread = threading.Thread(target=self._fill, args=(icon_dir, self._fill_cancel), daemon=True)
+        self._fill_thread.start()
+
+    def cancel_fill(self):
+        if self._fill_thread is not None:
+            self._fill_cancel.set()
+            self._fill_thread.join()
+            self._fill_thread = None
+
+    def _fill(self, icon_dir, cancel):
+        icon_dir = os.path.abspath(icon_dir)
+        try:
+            paths = [os.path.join(icon_dir, name) for name in os.listdir(icon_dir)
+                     if name.lower().endswith(ICON_EXTENSIONS)]
+        except OSError:
+            return
+        pending = []
+        for path, stamp in self._missing(paths):
+            if cancel.is_set():
+                break
+            try:
+                pending.extend(self._render(path, stamp)[1])
+                self.filled += 1
+            except Exception as e:
+                print(f"[THUMBNAILS] Skipping {path}: {e}")
+            # Commit in batches; a search meanwhile renders what it needs itself
+            if len(pending) >= self.FILL_BATCH * len(THUMBNAIL_KINDS):
+                self._store(pending)
+                pending = []
+        if pending:
+            self._store(pending)
+        if cancel.is_set():
+            return
+
+        existing = set(paths)
+        with self._lock:
+            stored = [row[0] for row in self._db.execute("SELECT DISTINCT path FROM thumbnails")]
+            removed = [(path,) for path in stored
+                       if os.path.dirname(path) == icon_dir and path not in existing]
+            self._db.executemany("DELETE FROM thumbnails WHERE path = ?", removed)
+            self._db.commit()
+
+    def close(self):
+        self.cancel_fill()
+        with self._lock:
+            self._db.close()
@@ -3,60 +3,45 @@ from tkinter import ttk, filedialog, Canvas, Button, Frame, Label, Checkbutton,
 from font_loader import FontLoader
 from color_manager import ColorManager
 from image_generator import ImageGenerator
-from utils import parse_color_from_filename, load_icon_image, DraggableItem, get_resized_image
+from font_cache import font_cache
+from text_effects import text_layer_cache
+from paragraph_spec import spec_from_paragraph
+from parallel_export import ExportJob, default_workers
+from render_cache import RenderCache
+from image_writer import ENCODER_PROFILES, OUTPUT_FORMATS, DEFAULT_PROFILE, DEFAULT_FORMAT, DEFAULT_WEBP_QUALITY, negotiate_format
+from text_import import ParagraphStore
+from preview_scene import PreviewScene
+from preview_renderer import PreviewRenderer, text_line_image, proxy_text_line_image, error_line_image, icon_image
+from utils import parse_color_from_filename, LRUCache
+from icon_cache import icon_cache
+from thumbnail_store import ThumbnailStore
+from icon_index import IconIndex
+from icon_results import IconResultList
+from font_gallery import FontGallery, TILE_SIZE
+from font_catalog import FontCatalog
+from font_fallback import font_fallback, find_system_font
 from PIL import ImageTk, ImageFont, Image, ImageDraw
 from tkinter import filedialog, messagebox
 import os
 import sys
-import platform
 import pyautogui
 import threading
 import time
 from pynput import mouse
 
-def find_system_font():
-    """
-    Find a system font that can be used as a fallback.
-    Returns the path to a usable system font or None.
-    """
-    # Dictionary of common system fonts by platform
-    system_fonts = {
-        'Windows': [
-            os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts', 'arial.ttf'),
-            os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts', 'verdana.ttf'),
-            os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts', 'segoeui.ttf'),
-            os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts', 'calibri.ttf'),
-            os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts', 'tahoma.ttf'),
-        ],
-        'Darwin': [  # macOS
-            '/System/Library/Fonts/SFNS.ttf',
-            '/System/Library/Fonts/SFNSText.ttf',
-            '/Library/Fonts/Arial.ttf',
-            '/System/Library/Fonts/Helvetica.ttc',
-            '/Library/Fonts/Verdana.ttf',
-        ],
-        'Linux': [
-            '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
-            '/usr/share/fonts/TTF/Arial.ttf',
-            '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
-            '/usr/share/fonts/ubuntu/Ubuntu-R.ttf',
-        ]
-    }
-    
-    # Get the current platform
-    current_os = platform.system()
-    
-    # Check if we have font paths for this platform
-    if current_os in system_fonts:
-        # Try each font path
-        for font_path in system_fonts[current_os]:
-            if os.path.exists(font_path):
-                return font_path
-    
-    # If no system font found, return None
-    return None
-
 class UIManager:
+    # Number of paragraphs listed in the paragraph selector at once
+    PARAGRAPH_SELECTOR_WINDOW = 200
+    # Rendered preview lines (PhotoImages) kept for reuse
+    PREVIEW_LINE_CACHE_SIZE = 64
+    # Quiet time before a debounced preview refresh runs (ms)
+    PREVIEW_DEBOUNCE_MS = 40
+    # How often to check for background preview renders (ms)
+    PREVIEW_POLL_MS = 15
+    # Idle time after an interaction before proxy previews are re-rendered at full quality (ms)
+    PREVIEW_REFINE_MS = 250
+    FONT_TILE_POLL_MS = 30
+
     def __init__(self, root):
         self.root = root
         self.root.title("CrHashtag Tool")
@@ -67,14 +52,69 @@ class UIManager:
         self.image_generator = ImageGenerator()
 
         # Initialize data structures
-        self.paragraphs = []
+        self.paragraphs = ParagraphStore()
         self.current_paragraph_index = 0
+
+        # First paragraph index shown in the (windowed) paragraph selector
+        self.selector_offset = 0
     
         # Store text images to prevent garbage collection
         self.text_images = {}
     
         # Store font warnings shown to user (to avoid repeated warnings)
         self.font_warnings_shown = set()
+        # Font metadata and glyph coverage, refreshed from FONT MAP in setup_ui
+        self.font_catalog = FontCatalog()
+        # Fallback runs take their glyph coverage from the catalog
+        font_fallback.catalog = self.font_catalog
+
+        # Rendered text lines keyed by (text, font file, size, color, effects)
+        self.preview_line_cache = LRUCache(max_entries=self.PREVIEW_LINE_CACHE_SIZE)
+        # Resized icons and their PhotoImages, keyed by (icon, size)
+        self.preview_icon_cache = LRUCache(max_entries=8)
+        # F12 toggles a cache statistics overlay on the preview
+        self.show_cache_debug = False
+
+        # Retained preview canvas items (created by the first render_preview)
+        self.preview_scene = None
+
+        # Pending preview refresh: (after id, debounced?) or None, see update_preview
+        self.preview_pending = None
+        self.preview_requests = 0
+        self.preview_renders = 0
+
+        # Preview text lines and icons are rasterized on a worker thread;
+        # pending_preview_frame is the frame waiting for generation's images
+        self.preview_renderer = PreviewRenderer()
+        self.preview_generation = 0
+        self.pending_preview_frame = None
+        self.preview_poll_scheduled = False
+        self.preview_frames_dropped = 0
+        self.system_font_path = None  # found on first use, "" if there is none
+
+        # Proxy (low quality) previews during interaction, refined when input stops
+        self.preview_proxy = False
+        self.preview_refine_id = None
+
+        # Background export currently running (see start_export_job)
+        self.export_job = None
+        self.render_cache = RenderCache()  # skips re-rendering unchanged paragraphs on export
+        self.export_dialog = None
+
+        # Fonts tab preview tiles, rendered in worker processes and cached on disk
+        self.font_gallery = FontGallery()
+        self.font_tile_labels = {}    # font name -> tile Label
+        self.font_tiles_pending = {}  # font name -> (cell frame, tile Label) not requested yet
+        self.font_tile_placeholder = None
+        self.font_tiles_shown = False  # tiles are requested once the Fonts tab was shown
+        self.font_tiles_polling = False
+
+        # Search result and hover thumbnails, kept on disk across sessions
+        self.thumbnail_store = ThumbnailStore()
+        # Token index of the icon filenames, updated when ICONS changes
+        self.icon_index = IconIndex('ICONS')
+        if self.icon_index.refresh():
+            self.thumbnail_store.fill('ICONS')
     
         # Set up the UI
         self.setup_ui()
@@ -227,154 +267,6 @@ class UIManager:
             shadow_preview.pack(side=tk.LEFT, padx=5)
             Label(line_frame, text=f"Shadow: {shadow_color}").pack(side=tk.LEFT, padx=5)
 
-    # Find this function around line 950 in ui_manager_module.py
-# Either remove this function entirely, or replace it with the version below that includes line_index parameter
-
-    def render_text_with_font(self, text, font_file, size, color, effects=None, line_index=0):
-        """
-        Render text with a specific font to an image
-    
-        Parameters:
-        - text: The text to render
-        - font_file: The TTF file name
-        - size: Font size
-        - color: Text color (hex)
-        - effects: Dictionary of effects to apply
-        - line_index: Index of the line (0, 1, or 2) for line-specific effects
-    
-        Returns:
-        - ImageTk.PhotoImage object
-        """
-        if not text:
-            return None
-        
-        try:
-            # Load the TTF font
-            font_path = os.path.join("FONT MAP", font_file)
-        
-            # Verify font file exists
-            if not os.path.exists(font_path):
-                print(f"Font file not found: {font_path}")
-            
-                # Show warning dialog only once per font
-                if font_file not in self.font_warnings_shown:
-                    messagebox.showwarning(
-                        "Font Not Found", 
-                        f"The font '{font_file}' could not be found in the FONT MAP directory.\n"
-                        "A fallback font will be used instead."
-                    )
-                    # Mark as shown to avoid repeated warnings
-                    self.font_warnings_shown.add(font_file)
-                
-                raise FileNotFoundError(f"Font file not found: {font_path}")
-            
-            # Get font and handle potential errors
-            try:
-                font = ImageFont.truetype(font_path, size)
-            except Exception as e:
-                print(f"Failed to load font {font_path}: {e}")
-                # Try system font as fallback if available
-                try:
-                    # Try to find a system font as fallback
-                    system_font_path = find_system_font()
-                
-                    if system_font_path:
-                        font = ImageFont.truetype(system_font_path, size)
-                        print(f"Using system font as fallback: {system_font_path}")
-                    else:
-                        # Last resort: use default font
-                        font = ImageFont.load_default()
-                        print("Using default font as final fallback")
-                except Exception:
-                    # Absolute last resort
-                    font = ImageFont.load_default()
-                    print("Using PIL default font as final fallback")
-        
-            # Get text dimensions using getbbox() (more reliable than getsize)
-            try:
-                # Try to use getbbox() for newer PIL versions
-                bbox = font.getbbox(text)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-            except AttributeError:
-                # Fall back to getsize() for older PIL versions
-                try:
-                    text_width, text_height = font.getsize(text)
-                except Exception as e:
-                    print(f"Error measuring text: {e}")
-                    # Estimate dimensions as fallback
-                    text_width = len(text) * size // 2
-                    text_height = size + 4
-        
-            # Add padding and space for effects
-            padding = 20
-            effect_padding = 10 if effects else 0
-
-            # Thêm chiều cao để tránh bị cắt phần descender (g, y, p...)
-            descender_fix = int(size * 0.3)  # Khoảng 30% font size
-
-            width = text_width + padding * 2 + effect_padding * 2
-            height = text_height + padding * 2 + effect_padding * 2 + descender_fix
-
-        
-            # Create a transparent image
-            img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-            draw = ImageDraw.Draw(img)
-        
-            # Get positions
-            x, y = padding + effect_padding, padding + effect_padding
-        
-            # Apply effects if requested
-            if effects:
-                # Calculate line-specific effect colors based on the current text color
-                effect_colors = {
-                    'shadow_color': self.lighten_color(color, 3.0),  # 3× lighter
-                    'outline_color': self.lighten_color(color, 2.0), # 2× lighter
-                    'stroke_color': self.darken_color(color, 2.0)    # 2× darker
-                }
-            
-                # Shadow effect
-                if effects.get('shadow'):
-                    shadow_color = effect_colors['shadow_color']
-                    offset = effects.get('shadow_offset', 3)
-                    draw.text((x + offset, y + offset), text, font=font, fill=shadow_color)
-            
-                # Stroke effect (darker than text)
-                if effects.get('stroke'):
-                    stroke_color = effect_colors['stroke_color']
-                    width = effects.get('stroke_width', 2)
-                    for dx in range(-width, width + 1):
-                        for dy in range(-width, width + 1):
-                            if dx != 0 or dy != 0:
-                                draw.text((x + dx, y + dy), text, font=font, fill=stroke_color)
-            
-                # Outline effect (brighter than text)
-                if effects.get('outline'):
-                    outline_color = effect_colors['outline_color']
-                    width = effects.get('outline_width', 1)
-                    for dx in range(-width, width + 1):
-                        for dy in range(-width, width + 1):
-                            if dx != 0 or dy != 0:
-                                draw.text((x + dx, y + dy), text, font=font, fill=outline_color)
-        
-            # Draw the main text
-            draw.text((x, y), text, font=font, fill=color)
-        
-            # Convert to PhotoImage for Tkinter
-            photo_img = ImageTk.PhotoImage(img)
-            return photo_img
-        
-        except Exception as e:
-            print(f"Error rendering text with font {font_file}: {e}")
-        
-            # Create fallback image with error message
-            img = Image.new('RGBA', (400, 50), (255, 255, 255, 200))
-            draw = ImageDraw.Draw(img)
-            fallback_font = ImageFont.load_default()
-            draw.text((10, 10), f"Font Error: {text}", fill="#FF0000", font=fallback_font)
-            return ImageTk.PhotoImage(img)
-    
-    
     def setup_icon_search(self, parent_frame):
         """Set up the icon search area for vertical layout with improved scrolling"""
         # Create a vertical layout for the search panel
@@ -442,278 +334,6 @@ class UIManager:
         self.no_results_label.pack(pady=10)
 
 
-    def search_icons(self):
-        """Enhanced search for icons in the ICONS directory with improved matching"""
-        # Clear previous results
-        for widget in self.icon_scrollable_frame.winfo_children():
-            widget.destroy()
-    
-        self.icon_images = []  # Clear stored image references
-    
-        # Get search terms
-        search_text = self.icon_search_var.get().strip().lower()
-        if not search_text:
-            self.no_results_label = Label(self.icon_scrollable_frame, text="Please enter search terms")
-            self.no_results_label.pack(pady=10)
-            return
-    
-        search_terms = search_text.split()
-    
-        # Check if ICONS directory exists
-        if not os.path.exists('ICONS'):
-            os.makedirs('ICONS')
-            self.no_results_label = Label(self.icon_scrollable_frame, 
-                                 text="ICONS directory created. Please add icon files.")
-            self.no_results_label.pack(pady=10)
-            return
-    
-        # Find matching icons with improved scoring
-        icon_files = []
-        for filename in os.listdir('ICONS'):
-            if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
-                # Extract filename without extension for matching
-                file_base = os.path.splitext(filename)[0].lower()
-                file_words = set(file_base.replace('_', ' ').replace('-', ' ').split())
-            
-                # Initialize match metrics
-                match_score = 0
-                matching_terms = []
-                match_positions = []
-            
-                # Score calculation factors
-                exact_phrase_bonus = 50  # Bonus for matching the exact phrase
-                word_match_score = 10    # Score for each matching word
-                consecutive_bonus = 5    # Bonus for consecutive matches
-                start_bonus = 3          # Bonus if match is at the start
-            
-                # Check for exact phrase match (highest priority)
-                if search_text in file_base:
-                    match_score += exact_phrase_bonus
-                    match_positions.append(file_base.index(search_text))
-                
-                # Check individual word matches and their positions
-                for term in search_terms:
-                    if term in file_base:
-                        match_score += word_match_score
-                        matching_terms.append(term)
-                        match_positions.append(file_base.index(term))
-                    elif term in file_words:  # Match whole word
-                        match_score += word_match_score + 2
-                        matching_terms.append(term)
-            
-                # Check for partial word matches (if no exact matches)
-                if not matching_terms:
-                    for term in search_terms:
-                        # Find similar words with character overlap > 60%
-                        for word in file_words:
-                            if len(term) >= 3 and len(word) >= 3:
-                                # Simple character overlap calculation
-                                overlap = sum(1 for c in term if c in word) / max(len(term), len(word))
-                                if overlap > 0.6:  # Over 60% character match
-                                    match_score += word_match_score * overlap
-                                    matching_terms.append(f"{term}~{word}")
-            
-                # Bonus for consecutive terms
-                if len(match_positions) > 1:
-                    match_positions.sort()
-                    for i in range(len(match_positions)-1):
-                        if match_positions[i+1] - match_positions[i] < 2 + len(search_terms[i]):
-                            match_score += consecutive_bonus
-            
-                # Bonus if match is at the start of filename
-                if match_positions and min(match_positions) < 3:
-                    match_score += start_bonus
-                
-                # Only add if there's at least one match or similarity
-                if match_score > 0:
-                    icon_files.append((filename, match_score, matching_terms))
-    
-        # Sort by score (highest first)
-        icon_files.sort(key=lambda x: x[1], reverse=True)
-    
-        if not icon_files:
-            self.no_results_label = Label(self.icon_scrollable_frame, text="No matching icons found")
-            self.no_results_label.pack(pady=10)
-            return
-    
-        # Display ALL results with improved UI
-        self.display_icon_results(icon_files)
-
-    def display_icon_results(self, icon_files):
-        """Display icon search results with improved visual cues for match quality"""
-        # Clear existing results
-        for widget in self.icon_scrollable_frame.winfo_children():
-            widget.destroy()
-    
-        # Create a frame for the results
-        results_frame = Frame(self.icon_scrollable_frame)
-        results_frame.pack(fill=tk.BOTH, expand=True)
-    
-        # Create filter options
-        filter_frame = Frame(results_frame, pady=5)
-        filter_frame.pack(fill=tk.X, pady=5)
-    
-        Label(filter_frame, text=f"Found {len(icon_files)} icons", font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
-    
-        # Add sort options
-        sort_options = ["Relevance (default)", "Filename A-Z", "Filename Z-A"]
-        sort_var = StringVar(value=sort_options[0])
-        sort_dropdown = ttk.Combobox(filter_frame, textvariable=sort_var, values=sort_options, width=18, state="readonly")
-        sort_dropdown.pack(side=tk.RIGHT, padx=5)
-        Label(filter_frame, text="Sort by:").pack(side=tk.RIGHT, padx=2)
-    
-        # Add event handling for sort dropdown
-        def on_sort_change(event):
-            sort_option = sort_var.get()
-        
-            sorted_icons = icon_files.copy()
-            if sort_option == "Filename A-Z":
-                sorted_icons.sort(key=lambda x: x[0].lower())
-            elif sort_option == "Filename Z-A":
-                sorted_icons.sort(key=lambda x: x[0].lower(), reverse=True)
-            # Default is already sorted by relevance
-        
-            # Re-display the results with the new sort order
-            for widget in results_container.winfo_children():
-                widget.destroy()
-            
-            display_items(sorted_icons)
-        
-        sort_dropdown.bind("<<ComboboxSelected>>", on_sort_change)
-    
-        # Create a scrollable container for the results
-        results_container = Frame(results_frame)
-        results_container.pack(fill=tk.BOTH, expand=True, pady=5)
-    
-        def display_items(items):
-            # Display each icon with improved visuals
-            for i, (filename, score, matching_terms) in enumerate(items):
-                # Determine the background color based on relevance score
-                bg_color = "#f0f8ff"  # Default light blue
-                if score > 30:  # High relevance
-                    bg_color = "#e6f2ff"
-                elif score < 15:  # Low relevance
-                    bg_color = "#f7f7f7"
-                
-                # Create cell frame with score-based background
-                cell_frame = Frame(results_container, borderwidth=1, relief="solid", padx=5, pady=5, bg=bg_color)
-                cell_frame.pack(fill=tk.X, padx=5, pady=5)
-        
-                try:
-                    # Create a horizontal layout within each cell for the icon and buttons
-                    icon_layout = Frame(cell_frame, bg=bg_color)
-                    icon_layout.pack(fill=tk.X)
-            
-                    # Left side - icon and filename
-                    icon_info = Frame(icon_layout, bg=bg_color)
-                    icon_info.pack(side=tk.LEFT)
-            
-                    # Load and resize the icon
-                    img_path = os.path.join('ICONS', filename)
-                    img = Image.open(img_path)
-                    img = img.resize((50, 50), Image.LANCZOS)
-                    photo_img = ImageTk.PhotoImage(img)
-            
-                    # Store reference to prevent garbage collection
-                    self.icon_images.append(photo_img)
-                
-                    # Display the image
-                    img_label = Label(icon_info, image=photo_img, bg=bg_color)
-                    img_label.pack(side=tk.LEFT, padx=5)
-            
-                    # Display the filename and match information
-                    name_frame = Frame(icon_info, bg=bg_color)
-                    name_frame.pack(side=tk.LEFT, padx=5)
-            
-                    # Truncate filename if needed
-                    display_name = filename
-                    if len(display_name) > 25:
-                        display_name = display_name[:22] + "..."
-            
-                    # Show score for debugging (can be removed in production)
-                    score_display = f" (Score: {score})" if score > 0 else ""
-                    name_label = Label(name_frame, text=display_name + score_display, 
-                                       anchor="w", bg=bg_color, font=("Arial", 9, "bold"))
-                    name_label.pack(anchor=tk.W)
-            
-                    # Display matching terms with better formatting
-                    if matching_terms:
-                        # Format matching terms with ~ for fuzzy matches
-                        formatted_terms = []
-                        for term in matching_terms:
-                            if "~" in term:  # Fuzzy match
-                                search, match = term.split("~")
-                                formatted_terms.append(f"{search}≈{match}")
-                            else:
-                                formatted_terms.append(term)
-                            
-                        match_text = "Matched: " + ", ".join(formatted_terms)
-                        # Use a different text color based on score
-                        fg_color = "#006600" if score > 30 else "#666666"
-                        match_label = Label(name_frame, text=match_text, font=("Arial", 8), 
-                                          fg=fg_color, bg=bg_color)
-                        match_label.pack(anchor=tk.W)
-            
-                    # Right side - selection buttons
-                    button_frame = Frame(icon_layout, bg=bg_color)
-                    button_frame.pack(side=tk.RIGHT)
-            
-                    # Use ttk buttons for better look
-                    Button(button_frame, text="Big Icon", 
-                          command=lambda f=img_path: self.select_icon(f, 'big_icon')).pack(side=tk.LEFT, padx=2)
-                    Button(button_frame, text="Small Icon", 
-                          command=lambda f=img_path: self.select_icon(f, 'small_icon')).pack(side=tk.LEFT, padx=2)
-            
-                    # Add a quick preview button that shows larger preview on hover
-                    preview_btn = Button(button_frame, text="👁️", width=2)
-                    preview_btn.pack(side=tk.LEFT, padx=2)
-                
-                    # Create tooltip/preview functionality
-                    preview_window = None
-                
-                    def show_preview(event):
-                        nonlocal preview_window
-                        # Create a toplevel window for preview
-                        x, y = event.x_root, event.y_root
-                        preview_window = tk.Toplevel(self.root)
-                        preview_window.wm_overrideredirect(True)
-                        preview_window.wm_geometry(f"+{x+10}+{y+10}")
-                    
-                        # Load larger preview
-                        preview_img = Image.open(img_path)
-                        max_size = (200, 200)
-                        preview_img.thumbnail(max_size, Image.LANCZOS)
-                        photo = ImageTk.PhotoImage(preview_img)
-                    
-                        # Store reference to prevent garbage collection
-                        self.icon_images.append(photo)
-                    
-                        # Display preview
-                        label = Label(preview_window, image=photo, borderwidth=2, relief="solid")
-                        label.image = photo
-                        label.pack()
-                
-                    def hide_preview(event):
-                        nonlocal preview_window
-                        if preview_window:
-                            preview_window.destroy()
-                            preview_window = None
-                
-                    preview_btn.bind("<Enter>", show_preview)
-                    preview_btn.bind("<Leave>", hide_preview)
-            
-                except Exception as e:
-                    print(f"Error loading icon {filename}: {e}")
-                    Label(cell_frame, text=f"Error: {filename}", bg=bg_color).pack(pady=5)
-    
-        # Initial display
-        display_items(icon_files)
-    
-        # Explicitly update the canvas scroll region after all items are added
-        self.icon_canvas.update_idletasks()
-        self.icon_canvas.configure(scrollregion=self.icon_canvas.bbox("all"))
-        self.icon_canvas.yview_moveto(0)  # Scroll to top after loading results
-        
     def _on_mousewheel(self, event):
         """Handle mousewheel scrolling for the icon canvas"""
         self.icon_canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
@@ -724,9 +344,10 @@ class UIManager:
         self.save_paragraph_data()
     
         # Load the icon
-        icon = load_icon_image(file_path)
+        icon = icon_cache.load(file_path)
         if icon:
             self.paragraphs[self.current_paragraph_index]['icons'][icon_type] = icon
+            self.paragraphs[self.current_paragraph_index]['icons'][f'{icon_type}_path'] = file_path
         
             # Update preview
             self.update_preview()
@@ -736,79 +357,256 @@ class UIManager:
         """Xuất ảnh PNG cho tất cả các paragraph đang active"""
         self.save_all_paragraphs_data()
 
-        active_paragraphs = [
-            p for p in self.paragraphs 
-            if p.get('active') and any(line.strip() for line in p.get('text_lines', []))
-        ]
+        def is_exportable(p):
+            return p.get('active') and any(line.strip() for line in p.get('text_lines', []))
 
-        if not active_paragraphs:
+        # Stream paragraphs to the workers from a snapshot, so huge imports are
+        # never fully loaded and edits made during the export don't race with it
+        snapshot = self.paragraphs.snapshot(spec_from_paragraph)
+        if not any(is_exportable(p) for p in snapshot.iter_paragraphs()):
             messagebox.showinfo("Không có nội dung", "Không có paragraph nào đang bật (active).")
             return
 
-        if not os.path.exists("OUTPUT"):
-            os.makedirs("OUTPUT")
+        def count_exportable():
+            # Reads the whole file, so the export job runs it off the Tk thread
+            return sum(1 for p in snapshot.iter_paragraphs() if is_exportable(p))
 
-        for idx, paragraph in enumerate(active_paragraphs):
-            filename = os.path.join("OUTPUT", f"CrHashtag_P{idx+1}.png")
-            self.image_generator.generate_image([paragraph], filename)
+        # Render in worker processes; files are still named by paragraph order
+        specs = (spec_from_paragraph(p) for p in snapshot.iter_paragraphs() if is_exportable(p))
 
-        messagebox.showinfo("Export hoàn tất", f"Đã xuất {len(active_paragraphs)} ảnh vào thư mục OUTPUT.")
+        def on_finished(job):
+            failed = [(idx, error) for idx, _, error, _ in job.results if error]
+            for idx, error in failed:
+                print(f"[EXPORT] Paragraph {idx+1} failed: {error}")
 
-    
-    def update_preview(self):
-        """Update the preview canvas with current paragraph data and line-specific effects"""
-        # Clear canvas and references to images
-        self.preview_canvas.delete("all")
-    
-        # Draw alignment grid
-        grid_spacing = 50  # or 100 as you prefer
-        canvas_width = self.preview_canvas.winfo_width()
-        canvas_height = self.preview_canvas.winfo_height()
+            exported = len(job.results) - len(failed)
+            hits, misses = job.cache_stats()
+            print(f"[EXPORT] Render cache: {hits} hits, {misses} misses")
+            if job.cancelled:
+                total = job.total if job.total is not None else "?"
+                messagebox.showinfo("Export đã hủy", f"Đã hủy. {exported}/{total} ảnh đã được xuất vào thư mục OUTPUT.")
+            else:
+                messagebox.showinfo("Export hoàn tất", f"Đã xuất {exported} ảnh vào thư mục OUTPUT.\n"
+                                    f"Render cache: {hits} hits, {misses} misses.")
 
-        # Vertical lines
-        for x in range(0, canvas_width, grid_spacing):
-            self.preview_canvas.create_line(x, 0, x, canvas_height, fill="#dddddd")
+        self.start_export_job(specs, "OUTPUT", "Export All PNGs", on_finished, count_exportable)
 
-        # Horizontal lines
-        for y in range(0, canvas_height, grid_spacing):
-            self.preview_canvas.create_line(0, y, canvas_width, y, fill="#dddddd")
+    def get_export_workers(self):
+        """Return the worker count from the Workers spinbox"""
+        try:
+            return max(1, self.export_workers.get())
+        except tk.TclError:  # Spinbox holds something that isn't a number
+            return 1
+
+    def get_webp_quality(self):
+        """Return the lossy WebP quality from the Quality spinbox"""
+        try:
+            return max(1, min(100, self.webp_quality.get()))
+        except tk.TclError:
+            return DEFAULT_WEBP_QUALITY
+
+    def start_export_job(self, specs, out_dir, title, on_finished, total=None, output_format=None):
+        """Run an export in background workers with a progress window and Cancel button.
+
+        total is the number of specs, or a function counting them that the
+        export job calls on its thread (see ExportJob).
+        """
+        if total is None:
+            total = len(specs)
+        if output_format is None:
+            output_format = self.output_format.get()
+
+        if self.export_job and self.export_job.is_alive():
+            messagebox.showinfo("Export in progress", "Please wait for the current export to finish or cancel it.")
+            return
+
+        self.export_job = ExportJob(specs, out_dir, workers=self.get_export_workers(), total=total,
+                                    encoder_profile=self.encoder_profile.get(), output_format=output_format,
+                                    webp_quality=self.get_webp_quality(), render_cache=self.render_cache)
+
+        # Progress window
+        dialog = tk.Toplevel(self.root)
+        dialog.title(title)
+        dialog.transient(self.root)
+        dialog.resizable(False, False)
+        dialog.protocol("WM_DELETE_WINDOW", self.cancel_export_job)
+
+        known_total = self.export_job.total
+        progress_bar = ttk.Progressbar(dialog, length=360, mode="determinate", maximum=max(1, known_total or 0))
+        progress_bar.pack(padx=20, pady=(20, 5))
+        status_label = Label(dialog, text=f"0/{known_total if known_total is not None else '?'} images")
+        status_label.pack(padx=20, pady=5)
+        cancel_button = Button(dialog, text="Cancel", command=self.cancel_export_job)
+        cancel_button.pack(pady=(5, 15))
+
+        self.export_dialog = {
+            'window': dialog,
+            'progress': progress_bar,
+            'status': status_label,
+            'cancel': cancel_button,
+            'on_finished': on_finished,
+        }
+
+        self.export_job.start()
+        self.root.after(100, self._poll_export_job)
+
+    def cancel_export_job(self):
+        """Ask the running export to stop after the images in progress"""
+        if self.export_job and self.export_job.is_alive():
+            self.export_job.cancel()
+            self.export_dialog['cancel'].config(state=tk.DISABLED, text="Cancelling...")
+
+    def _poll_export_job(self):
+        """Pick up export results on the main thread (scheduled with root.after)"""
+        job = self.export_job
+        _, finished, error = job.poll()
+        if error:
+            print(f"[EXPORT] Error: {error}")
+
+        done, total, rate, eta = job.progress()
+        if total is not None:
+            self.export_dialog['progress'].config(maximum=max(1, total))
+        self.export_dialog['progress']['value'] = done
+        status = f"{done}/{total if total is not None else '?'} images · {rate:.1f} images/s"
+        if eta is not None and not finished:
+            status += f" · ETA {int(eta // 60)}:{int(eta % 60):02d}"
+        self.export_dialog['status'].config(text=status)
+
+        if not finished:
+            self.root.after(100, self._poll_export_job)
+            return
+
+        self.export_dialog['window'].destroy()
+        if error:
+            messagebox.showerror("Export Error", f"Export failed: {error}")
+        self.export_dialog['on_finished'](job)
 
-        self.text_images = {}
     
-        # Add border
-        self.preview_canvas.create_rectangle(2, 2, 798, 798, outline="#cccccc", width=2)
+    def update_preview(self, delay=0, proxy=False):
+        """Request a preview refresh.
+
+        The refresh runs once the event loop is idle (or after delay ms without
+        further requests), so the several update_preview() calls one user
+        action makes collapse into a single render_preview().
+
+        proxy marks the request as part of an ongoing interaction: uncached
+        items are drawn as quick proxies and a full-quality refresh follows
+        once there have been no proxy requests for PREVIEW_REFINE_MS.
+        """
+        self.preview_requests += 1
+        if self.preview_refine_id:
+            self.root.after_cancel(self.preview_refine_id)
+            self.preview_refine_id = None
+        self.preview_proxy = proxy
+        if proxy:
+            self.preview_refine_id = self.root.after(self.PREVIEW_REFINE_MS, self._refine_preview)
+        if self.preview_pending:
+            after_id, debounced = self.preview_pending
+            if not debounced:
+                return  # already queued for the next idle moment, which comes soonest
+            self.root.after_cancel(after_id)  # restart the debounce
+
+        if delay:
+            after_id = self.root.after(delay, self._run_pending_preview)
+        else:
+            after_id = self.root.after_idle(self._run_pending_preview)
+        self.preview_pending = (after_id, bool(delay))
+
+    def _run_pending_preview(self):
+        self.preview_pending = None
+        self.preview_renders += 1
+        self.render_preview()
+
+    def _refine_preview(self):
+        """Re-render a proxy preview at full quality once the interaction is over"""
+        self.preview_refine_id = None
+        self.update_preview()
+
+    def render_preview(self):
+        """Update the preview canvas with current paragraph data and line-specific effects.
+
+        Text lines and icons that aren't cached are rasterized by the preview
+        renderer's worker thread. The canvas keeps showing the previous frame
+        until they arrive (see _poll_preview_renderer), and results for frames
+        that were superseded in the meantime are dropped.
+        """
+        # Canvas items are created once; refreshes only update what changed
+        if self.preview_scene is None:
+            self.preview_scene = PreviewScene(
+                self.preview_canvas,
+                lambda t, x, y: self.update_element_position(t, x, y),
+                overlays=('font_reminder',)
+            )
+        self.preview_scene.update_grid()
+
+        # Anything still being rendered for an earlier frame is now stale
+        self.preview_generation += 1
+        self.pending_preview_frame = None
     
         if not self.paragraphs:
+            self.preview_scene.hide_all()
+            self.preview_canvas.delete("cache_debug")
             return
         
         # Save current paragraph data first
         self.save_paragraph_data()
     
         paragraph = self.paragraphs[self.current_paragraph_index]
+        frame, jobs = self.build_preview_frame(paragraph, proxy=self.preview_proxy)
+
+        if not jobs:
+            self.apply_preview_frame(paragraph, frame, {})
+            return
+
+        self.pending_preview_frame = (self.preview_generation, paragraph, frame, jobs)
+        self.preview_renderer.submit(self.preview_generation, jobs)
+        if not self.preview_poll_scheduled:
+            self.preview_poll_scheduled = True
+            self.root.after(self.PREVIEW_POLL_MS, self._poll_preview_renderer)
+
+    def build_preview_frame(self, paragraph, proxy=False):
+        """Work out what each preview item should show.
+
+        Returns (frame, jobs). frame maps each scene element/overlay to None
+        (hidden) or (x, y, source), where source is ('photo', PhotoImage,
+        resized icon or None) for images that are ready and ('job', key) for
+        images the preview renderer still has to draw; jobs maps those keys to
+        (function, args). With proxy set, uncached items get proxy jobs,
+        whose results are not cached.
+        """
+        frame = {}
+        jobs = {}
     
         # Get selected fonts
         selected_fonts = paragraph['fonts']
     
         # Check if we need fonts but none are selected - show a reminder on the canvas
         non_empty_lines = [i for i, text in enumerate(paragraph['text_lines']) if text.strip()]
+        frame['font_reminder'] = None
         if non_empty_lines and not selected_fonts:
-            reminder_img = Image.new('RGBA', (400, 60), (255, 255, 230, 220))
-            draw = ImageDraw.Draw(reminder_img)
-            fallback_font = ImageFont.load_default()
-            draw.text((20, 10), "Please select fonts in the Fonts tab", fill="#CC0000", font=fallback_font)
-            draw.text((20, 30), "to display your text lines properly.", fill="#CC0000", font=fallback_font)
-        
-            reminder_photo = ImageTk.PhotoImage(reminder_img)
-            self.text_images['font_reminder'] = reminder_photo
-            self.preview_canvas.create_image(100, 50, image=reminder_photo, anchor='nw')
-    
-        # Track draggable items
-        draggable_items = {}
-    
-        # Draw text lines using PIL to render with actual fonts
-        for i, text in enumerate(paragraph['text_lines']):
+            if 'font_reminder' not in self.text_images:
+                reminder_img = Image.new('RGBA', (400, 60), (255, 255, 230, 220))
+                draw = ImageDraw.Draw(reminder_img)
+                fallback_font = ImageFont.load_default()
+                draw.text((20, 10), "Please select fonts in the Fonts tab", fill="#CC0000", font=fallback_font)
+                draw.text((20, 30), "to display your text lines properly.", fill="#CC0000", font=fallback_font)
+                self.text_images['font_reminder'] = ImageTk.PhotoImage(reminder_img)
+            frame['font_reminder'] = (100, 50, ('photo', self.text_images['font_reminder'], None))
+    
+        # Text lines are rendered with PIL using the actual fonts
+        effects = paragraph['effects'] if any([
+            paragraph['effects'].get('shadow', False),
+            paragraph['effects'].get('outline', False),
+            paragraph['effects'].get('stroke', False)
+        ]) else None
+        for i in range(3):
+            element = f'text{i}'
+            text = paragraph['text_lines'][i] if i < len(paragraph['text_lines']) else ''
+            frame[element] = None
             if not text:
                 continue
+
+            x, y = paragraph['positions'][element]
             
             # Get specific font for this line
             font_file = None
@@ -818,169 +616,186 @@ class UIManager:
                 font_file = selected_fonts[0]
             else:
                 # Display a warning if no font is selected but there's text to display
-                warning_img = Image.new('RGBA', (300, 30), (255, 240, 240, 220))
-                draw = ImageDraw.Draw(warning_img)
-                fallback_font = ImageFont.load_default()
-                draw.text((10, 10), f"No font selected for Line {i+1}", fill="#FF0000", font=fallback_font)
-                warning_photo = ImageTk.PhotoImage(warning_img)
-                self.text_images[f'warning{i}'] = warning_photo
+                warning_key = f'warning{i}'
+                if warning_key not in self.text_images:
+                    warning_img = Image.new('RGBA', (300, 30), (255, 240, 240, 220))
+                    draw = ImageDraw.Draw(warning_img)
+                    fallback_font = ImageFont.load_default()
+                    draw.text((10, 10), f"No font selected for Line {i+1}", fill="#FF0000", font=fallback_font)
+                    self.text_images[warning_key] = ImageTk.PhotoImage(warning_img)
             
                 # Display warning at line position
-                x, y = paragraph['positions'][f'text{i}']
-                self.preview_canvas.create_image(x, y, image=warning_photo, anchor='nw', tags=f"text{i}")
+                frame[element] = (x, y, ('photo', self.text_images[warning_key], None))
                 continue
             
-            # Get font size and position
-            font_size = paragraph['font_sizes'][f'text{i}']
-            x, y = paragraph['positions'][f'text{i}']
-        
-            # Get color
+            font_size = paragraph['font_sizes'][element]
             color = paragraph['colors'][i] if i < len(paragraph['colors']) else "#000000"
+            frame[element] = (x, y, self.text_line_source(text, font_file, font_size, color, effects, jobs, proxy))
         
-            # Render text with font as image - pass the line index for line-specific effects
-            text_img = self.render_text_with_font(
-                text, 
-                font_file, 
-                font_size, 
-                color,
-                paragraph['effects'] if any([
-                    paragraph['effects'].get('shadow', False),
-                    paragraph['effects'].get('outline', False),
-                    paragraph['effects'].get('stroke', False)
-                ]) else None,
-                i  # Pass the line index
-            )
-        
-            if text_img:
-                # Store reference to prevent garbage collection
-                self.text_images[f'text{i}'] = text_img
-            
-                # Display image on canvas
-                item_id = self.preview_canvas.create_image(
-                    x, y, image=text_img, anchor='nw', tags=f"text{i}"
-                )
-            
-                # Make draggable
-                draggable_items[f"text{i}"] = DraggableItem(
-                    self.preview_canvas, 
-                    item_id, 
-                    f"text{i}", 
-                    lambda t, x, y: self.update_element_position(t, x, y)
-                )
-            
-                # Add drag bindings
-                self.preview_canvas.tag_bind(
-                    f"text{i}", "<ButtonPress-1>", 
-                    lambda event, item=draggable_items[f"text{i}"]: item.on_drag_start(event)
-                )
-                self.preview_canvas.tag_bind(
-                    f"text{i}", "<B1-Motion>",
-                    lambda event, item=draggable_items[f"text{i}"]: item.on_drag_motion(event)
-                )
-                self.preview_canvas.tag_bind(
-                    f"text{i}", "<ButtonRelease-1>",
-                    lambda event, item=draggable_items[f"text{i}"]: item.on_drag_end(event)
-                )
-        
-        # Draw small icon
-        small_icon = paragraph['icons'].get('small_icon')
-        if small_icon:
-            # Get position and size
-            x, y = paragraph['positions']['small_icon']
-            size = paragraph['icon_sizes']['small_icon']
-        
-            # Resize for preview
-            small_icon_resized = get_resized_image(small_icon, size[0], size[1])
-            self.paragraphs[self.current_paragraph_index]['icons']['small_icon_resized'] = small_icon_resized
-            print("[PREVIEW] Small icon resized to:", small_icon_resized.size, "at", x, y)
+        # Icons
+        for icon_type in ('small_icon', 'big_icon'):
+            icon = paragraph['icons'].get(icon_type)
+            frame[icon_type] = None
+            if not icon:
+                continue
 
-        
-            if small_icon_resized:
-                # Convert to PhotoImage
-                small_icon_photo = ImageTk.PhotoImage(small_icon_resized)
-            
-                # Store reference to prevent garbage collection
-                self.text_images['small_icon_photo'] = small_icon_photo
-            
-                # Create image on canvas
-                item_id = self.preview_canvas.create_image(
-                    x, y, image=small_icon_photo, anchor='nw', tags="small_icon"
-                )
-            
-                # Make draggable
-                draggable_items["small_icon"] = DraggableItem(
-                    self.preview_canvas, 
-                    item_id, 
-                    "small_icon", 
-                    lambda t, x, y: self.update_element_position(t, x, y)
-                )
-            
-                # Add drag bindings
-                self.preview_canvas.tag_bind(
-                    "small_icon", "<ButtonPress-1>", 
-                    lambda event, item=draggable_items["small_icon"]: item.on_drag_start(event)
-                )
-                self.preview_canvas.tag_bind(
-                    "small_icon", "<B1-Motion>",
-                    lambda event, item=draggable_items["small_icon"]: item.on_drag_motion(event)
-                )
-                self.preview_canvas.tag_bind(
-                    "small_icon", "<ButtonRelease-1>",
-                    lambda event, item=draggable_items["small_icon"]: item.on_drag_end(event)
+            x, y = paragraph['positions'][icon_type]
+            size = tuple(paragraph['icon_sizes'][icon_type])
+
+            # Resized icons are reused while the icon and size are unchanged
+            cached = self.preview_icon_cache.get((id(icon), size))
+            # id() can be reused once an icon is freed, so check it is the same object
+            if cached is not None and cached[0] is icon:
+                frame[icon_type] = (x, y, ('photo', cached[2], cached[1]))
+            elif proxy:
+                job_key = ('icon_proxy', id(icon), size)
+                jobs[job_key] = (icon_image, (icon, size[0], size[1], Image.BILINEAR))
+                frame[icon_type] = (x, y, ('job', job_key))
+            else:
+                job_key = ('icon', id(icon), size)
+                jobs[job_key] = (icon_image, (icon, size[0], size[1]))
+                frame[icon_type] = (x, y, ('job', job_key))
+
+        return frame, jobs
+
+    def text_line_source(self, text, font_file, size, color, effects, jobs, proxy=False):
+        """Return the frame source for one text line, adding a render job to jobs if it isn't cached"""
+        # Unchanged lines reuse the PhotoImage rendered last time
+        cache_key = (text, font_file, size, color, tuple(sorted(effects.items())) if effects else None)
+        cached_img = self.preview_line_cache.get(cache_key)
+        if cached_img is not None:
+            return ('photo', cached_img, None)
+
+        # Load the TTF font from FONT MAP
+        font_path = os.path.join("FONT MAP", font_file)
+        if not os.path.exists(font_path):
+            print(f"Font file not found: {font_path}")
+        
+            # Show warning dialog only once per font
+            if font_file not in self.font_warnings_shown:
+                messagebox.showwarning(
+                    "Font Not Found", 
+                    f"The font '{font_file}' could not be found in the FONT MAP directory.\n"
+                    "A fallback font will be used instead."
                 )
-    
-        # Draw big icon
-        big_icon = paragraph['icons'].get('big_icon')
-        if big_icon:
-            # Get position and size
-            x, y = paragraph['positions']['big_icon']
-            size = paragraph['icon_sizes']['big_icon']
-        
-            # Resize for preview
-            big_icon_resized = get_resized_image(big_icon, size[0], size[1])
-            self.paragraphs[self.current_paragraph_index]['icons']['big_icon_resized'] = big_icon_resized
-            print("[PREVIEW] Big icon resized to:", big_icon_resized.size, "at", x, y)
+                # Mark as shown to avoid repeated warnings
+                self.font_warnings_shown.add(font_file)
+            return ('photo', ImageTk.PhotoImage(error_line_image(text)), None)
+
+        # Characters the font has no glyph for are drawn by a fallback font (see
+        # font_fallback); say which, once per font and set of characters
+        missing = self.font_catalog.missing_characters(font_path, text)
+        if missing and (font_file, missing) not in self.font_warnings_shown:
+            print(f"Font {font_file} has no glyphs for {missing}; drawing them with a fallback font")
+            self.font_warnings_shown.add((font_file, missing))
+
+        if self.system_font_path is None:
+            self.system_font_path = find_system_font() or ""
+        job_key = ('line_proxy' if proxy else 'line',) + cache_key
+        jobs[job_key] = (proxy_text_line_image if proxy else text_line_image,
+                         (text, font_path, size, color, effects, self.system_font_path or None))
+        return ('job', job_key)
+
+    def _poll_preview_renderer(self):
+        """Pick up rasterized preview images on the main thread (scheduled with root.after)"""
+        for generation, rendered in self.preview_renderer.poll():
+            pending = self.pending_preview_frame
+            if pending is None or pending[0] != generation:
+                self.preview_frames_dropped += 1
+                continue
+            _, paragraph, frame, jobs = pending
+            self.pending_preview_frame = None
+            self.apply_preview_frame(paragraph, frame, rendered, jobs)
 
-        
-            if big_icon_resized:
-                # Convert to PhotoImage
-                big_icon_photo = ImageTk.PhotoImage(big_icon_resized)
-            
-                # Store reference to prevent garbage collection
-                self.text_images['big_icon_photo'] = big_icon_photo
-            
-                # Create image on canvas
-                item_id = self.preview_canvas.create_image(
-                    x, y, image=big_icon_photo, anchor='nw', tags="big_icon"
-                )
-            
-                # Make draggable
-                draggable_items["big_icon"] = DraggableItem(
-                    self.preview_canvas, 
-                    item_id, 
-                    "big_icon", 
-                    lambda t, x, y: self.update_element_position(t, x, y)
-                )
-            
-                # Add drag bindings
-                self.preview_canvas.tag_bind(
-                    "big_icon", "<ButtonPress-1>", 
-                    lambda event, item=draggable_items["big_icon"]: item.on_drag_start(event)
-                )
-                self.preview_canvas.tag_bind(
-                    "big_icon", "<B1-Motion>",
-                    lambda event, item=draggable_items["big_icon"]: item.on_drag_motion(event)
-                )
-                self.preview_canvas.tag_bind(
-                    "big_icon", "<ButtonRelease-1>",
-                    lambda event, item=draggable_items["big_icon"]: item.on_drag_end(event)
-                )
+        if self.pending_preview_frame is not None:
+            self.root.after(self.PREVIEW_POLL_MS, self._poll_preview_renderer)
+        else:
+            self.preview_poll_scheduled = False
+
+    def apply_preview_frame(self, paragraph, frame, rendered, jobs=None):
+        """Show a frame on the canvas, turning freshly rendered images into PhotoImages"""
+        ready = {}  # job key -> (PhotoImage, resized icon or None)
+        for job_key, (image, error) in rendered.items():
+            kind = job_key[0]
+            if kind in ('line', 'line_proxy'):
+                cache_key = job_key[1:]
+                if image is None:
+                    print(f"Error rendering text with font {cache_key[1]}: {error}")
+                    ready[job_key] = (ImageTk.PhotoImage(error_line_image(cache_key[0])), None)
+                    continue
+                photo = ImageTk.PhotoImage(image)
+                if kind == 'line':
+                    self.preview_line_cache.put(cache_key, photo)
+                ready[job_key] = (photo, None)
+            elif kind == 'icon':
+                icon = jobs[job_key][1][0]
+                photo = ImageTk.PhotoImage(image) if image else None
+                self.preview_icon_cache.put(job_key[1:], (icon, image, photo))
+                ready[job_key] = (photo, image)
+            else:
+                # Proxy icons are only shown, never stored as the resized icon
+                ready[job_key] = (ImageTk.PhotoImage(image) if image else None, None)
+
+        scene = self.preview_scene
+        for name, entry in frame.items():
+            if entry is None:
+                scene.hide(name)
+                continue
+            x, y, source = entry
+            if source[0] == 'photo':
+                photo, resized = source[1], source[2]
+            else:
+                photo, resized = ready[source[1]]
+            if name.endswith('_icon') and resized is not None:
+                paragraph['icons'][f'{name}_resized'] = resized
+            if photo:
+                scene.show(name, photo, x, y)
+            else:
+                scene.hide(name)
+
+        self.preview_canvas.delete("cache_debug")
+        if self.show_cache_debug:
+            self.draw_cache_debug_overlay()
+
+    def toggle_cache_debug(self, event=None):
+        """Show or hide the cache statistics overlay on the preview (F12)"""
+        self.show_cache_debug = not self.show_cache_debug
+        self.update_preview()
+
+    def draw_cache_debug_overlay(self):
+        """Draw hit/miss counters of the preview caches in the corner of the preview"""
+        lines = []
+        for name, stats in (
+            ("Preview lines", self.preview_line_cache.stats()),
+            ("Text layers", text_layer_cache.stats()),
+            ("Font faces", font_cache.stats()),
+            ("Icons resized", icon_cache.stats()),
+            ("Font runs", font_fallback.stats()),
+        ):
+            lines.append(f"{name}: {stats['hits']} hits / {stats['misses']} misses "
+                         f"({stats['hit_rate']:.0%}), {stats['entries']} cached, {stats['evictions']} evicted")
+        lines.append(f"Preview renders: {self.preview_renders} for {self.preview_requests} requests "
+                     f"({self.preview_requests - self.preview_renders} coalesced)")
+        lines.append(f"Background renders: {self.preview_renderer.submitted} submitted, "
+                     f"{self.preview_renderer.abandoned} abandoned, {self.preview_frames_dropped} stale dropped")
+
+        text_id = self.preview_canvas.create_text(
+            12, 12, text="\n".join(lines), anchor='nw', font=("Courier", 9), fill="#004400", tags="cache_debug"
+        )
+        x1, y1, x2, y2 = self.preview_canvas.bbox(text_id)
+        background_id = self.preview_canvas.create_rectangle(
+            x1 - 4, y1 - 4, x2 + 4, y2 + 4, fill="#f0fff0", outline="#88aa88", tags="cache_debug"
+        )
+        self.preview_canvas.tag_lower(background_id, text_id)
     
     def setup_ui(self):
         """Set up the main user interface"""
         # Create main frame
         main_frame = Frame(self.root)
         main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Debug overlay with preview cache statistics
+        self.root.bind("<F12>", self.toggle_cache_debug)
         
         # Create control frame at the top
         control_frame = Frame(main_frame)
@@ -998,6 +813,16 @@ class UIManager:
         self.paragraph_selector = ttk.Combobox(control_frame, width=30, state="readonly")
         self.paragraph_selector.pack(side=tk.LEFT, padx=5)
         self.paragraph_selector.bind("<<ComboboxSelected>>", self.on_paragraph_selected)
+
+        self.paragraph_count_label = Label(control_frame, text="of 0")
+        self.paragraph_count_label.pack(side=tk.LEFT)
+
+        # Jump to any paragraph; the selector only lists the ones nearby
+        Label(control_frame, text="Go to:").pack(side=tk.LEFT, padx=(10, 2))
+        self.paragraph_goto_var = StringVar()
+        goto_entry = ttk.Entry(control_frame, textvariable=self.paragraph_goto_var, width=7)
+        goto_entry.pack(side=tk.LEFT)
+        goto_entry.bind("<Return>", self.on_paragraph_goto)
         
         # Delete button
         self.delete_btn = Button(control_frame, text="Delete Paragraph", command=self.delete_current_paragraph)
@@ -1027,6 +852,7 @@ class UIManager:
         
         # Load fonts and colors
         self.font_loader.load_fonts()
+        self.font_catalog.refresh('FONT MAP')
         self.setup_fonts_tab()  # Custom method to create 2-column layout
         
         self.color_manager.load_colors()
@@ -1137,9 +963,30 @@ class UIManager:
         # Add title
         Label(fonts_frame, text="Available Fonts", font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=10)
 
-        # Create a frame to hold grid layout
-        grid_frame = Frame(fonts_frame)
-        grid_frame.pack(fill=tk.BOTH, expand=True)
+        # Add instructions
+        instruction = Label(fonts_frame, text="Select up to 3 fonts", font=("Arial", 10))
+        instruction.pack(side=tk.BOTTOM, pady=10)
+
+        # Scrollable grid; font tiles are only rendered once they are on screen
+        canvas_frame = Frame(fonts_frame)
+        canvas_frame.pack(fill=tk.BOTH, expand=True)
+        self.font_canvas = tk.Canvas(canvas_frame, highlightthickness=0)
+        scrollbar = ttk.Scrollbar(canvas_frame, orient="vertical", command=self.font_canvas.yview)
+        grid_frame = Frame(self.font_canvas)
+
+        def on_grid_configure(event):
+            self.font_canvas.configure(scrollregion=self.font_canvas.bbox("all"))
+            self.request_visible_font_tiles()
+
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            self.request_visible_font_tiles()
+
+        grid_frame.bind("<Configure>", on_grid_configure)
+        self.font_canvas.create_window((0, 0), window=grid_frame, anchor="nw")
+        self.font_canvas.configure(yscrollcommand=on_scroll)
+        self.font_canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
 
         all_fonts = self.font_loader.fonts
         num_columns = 3
@@ -1153,9 +1000,41 @@ class UIManager:
 
             self.create_font_item(cell_frame, font_name, i)
 
-        # Add instructions
-        instruction = Label(fonts_frame, text="Select up to 3 fonts", font=("Arial", 10))
-        instruction.pack(side=tk.BOTTOM, pady=10)
+        # Build tiles when the tab is first shown
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed, add="+")
+
+    def on_tab_changed(self, event=None):
+        if not self.font_tiles_shown and self.notebook.select() == str(self.font_tab):
+            self.font_tiles_shown = True
+            # Wait for the tab's geometry so the visible rows are known
+            self.root.after_idle(self.request_visible_font_tiles)
+
+    def request_visible_font_tiles(self):
+        """Ask the font gallery for the tiles of fonts scrolled into view"""
+        if not self.font_tiles_shown or not self.font_tiles_pending:
+            return
+        view_top = self.font_canvas.canvasy(0)
+        view_bottom = view_top + self.font_canvas.winfo_height()
+        for font_name, (cell, label) in list(self.font_tiles_pending.items()):
+            cell_top = cell.winfo_y()
+            if cell_top + cell.winfo_height() >= view_top and cell_top <= view_bottom:
+                del self.font_tiles_pending[font_name]
+                self.font_gallery.request(font_name, os.path.join('FONT MAP', font_name))
+        if self.font_gallery.busy() and not self.font_tiles_polling:
+            self.font_tiles_polling = True
+            self.root.after(self.FONT_TILE_POLL_MS, self.poll_font_tiles)
+
+    def poll_font_tiles(self):
+        """Show the font tiles that finished since the last poll"""
+        for font_name, tile in self.font_gallery.poll():
+            photo = ImageTk.PhotoImage(tile)
+            label = self.font_tile_labels[font_name]
+            label.configure(image=photo)
+            label.image = photo  # Keep reference
+        if self.font_gallery.busy():
+            self.root.after(self.FONT_TILE_POLL_MS, self.poll_font_tiles)
+        else:
+            self.font_tiles_polling = False
 
     def setup_color_picker_section(self):
         """Add color picker widgets for manual color selection"""
@@ -1236,15 +1115,13 @@ class UIManager:
             font_frame = Frame(parent)
             font_frame.pack(fill=tk.X, pady=2)
             
-            # Create and save preview image
-            font_path = os.path.join('FONT MAP', font_name)
-            preview_img = self.font_loader.create_font_preview(font_path)
-            
-            # Preview image
-            if preview_img:
-                preview_label = Label(font_frame, image=preview_img)
-                preview_label.image = preview_img  # Keep reference
-                preview_label.pack(side=tk.LEFT, padx=5)
+            # Preview image: a blank tile until the font gallery has rendered it
+            if self.font_tile_placeholder is None:
+                self.font_tile_placeholder = ImageTk.PhotoImage(Image.new('RGBA', TILE_SIZE, (255, 255, 255, 255)))
+            preview_label = Label(font_frame, image=self.font_tile_placeholder)
+            preview_label.pack(side=tk.LEFT, padx=5)
+            self.font_tile_labels[font_name] = preview_label
+            self.font_tiles_pending[font_name] = (parent, preview_label)
             
             # Truncate long font names
             display_name = font_name
@@ -1309,6 +1186,26 @@ class UIManager:
         Button(action_frame, text="Reset Positions", command=self.reset_positions).pack(side=tk.LEFT, padx=5)
         Button(action_frame, text="Generate Image", command=self.generate_image).pack(side=tk.LEFT, padx=5)
         Button(action_frame, text="Export All PNGs", command=self.export_all_images).pack(side=tk.LEFT, padx=5)
+
+        # Number of processes used by Export All PNGs
+        Label(action_frame, text="Workers:").pack(side=tk.LEFT, padx=(5, 0))
+        self.export_workers = IntVar(value=default_workers())
+        ttk.Spinbox(action_frame, from_=1, to=max(1, os.cpu_count() or 1), width=3,
+                    textvariable=self.export_workers).pack(side=tk.LEFT, padx=(2, 5))
+
+        # Output format and encoder profile (speed vs. file size) for Generate Image and Export All
+        Label(action_frame, text="Format:").pack(side=tk.LEFT, padx=(5, 0))
+        self.output_format = StringVar(value=DEFAULT_FORMAT)
+        ttk.Combobox(action_frame, textvariable=self.output_format, values=list(OUTPUT_FORMATS),
+                     width=10, state="readonly").pack(side=tk.LEFT, padx=(2, 5))
+        Label(action_frame, text="Quality:").pack(side=tk.LEFT, padx=(5, 0))
+        self.webp_quality = IntVar(value=DEFAULT_WEBP_QUALITY)
+        ttk.Spinbox(action_frame, from_=1, to=100, width=4,
+                    textvariable=self.webp_quality).pack(side=tk.LEFT, padx=(2, 5))
+        Label(action_frame, text="Profile:").pack(side=tk.LEFT, padx=(5, 0))
+        self.encoder_profile = StringVar(value=DEFAULT_PROFILE)
+        ttk.Combobox(action_frame, textvariable=self.encoder_profile, values=list(ENCODER_PROFILES),
+                     width=9, state="readonly").pack(side=tk.LEFT, padx=(2, 5))
         Button(action_frame, text="Ghi nhớ vị trí", command=self.save_paragraph_data_message).pack(side=tk.LEFT, padx=5)
 
         # Add second row for scaling controls
@@ -1394,15 +1291,14 @@ class UIManager:
         self.icon_canvas = tk.Canvas(canvas_frame, height=500)
         self.icon_canvas.pack_propagate(False)  # Prevent canvas from resizing based on content
         scrollbar = ttk.Scrollbar(canvas_frame, orient="vertical", command=self.icon_canvas.yview)
+        # Messages and the result count; result rows are laid out below it
         self.icon_scrollable_frame = Frame(self.icon_canvas)
-    
-        self.icon_scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.icon_canvas.configure(scrollregion=self.icon_canvas.bbox("all"))
-        )
-    
         self.icon_canvas.create_window((0, 0), window=self.icon_scrollable_frame, anchor="nw")
-        self.icon_canvas.configure(yscrollcommand=scrollbar.set)
+
+        # Only the visible result rows get widgets (see IconResultList)
+        self.icon_results = IconResultList(self.icon_canvas, scrollbar, self.icon_scrollable_frame,
+                                           self.thumbnail_store, self.select_icon)
+        self.icon_scrollable_frame.bind("<Configure>", lambda e: self.icon_results.refresh())
     
         self.icon_canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
@@ -1419,6 +1315,7 @@ class UIManager:
         # Clear previous results
         for widget in self.icon_scrollable_frame.winfo_children():
             widget.destroy()
+        self.icon_results.clear()
     
         self.icon_images = []  # Clear stored image references
     
@@ -1429,8 +1326,6 @@ class UIManager:
             self.no_results_label.pack(pady=10)
             return
     
-        search_terms = search_text.split()
-    
         # Check if ICONS directory exists
         if not os.path.exists('ICONS'):
             os.makedirs('ICONS')
@@ -1439,33 +1334,11 @@ class UIManager:
             self.no_results_label.pack(pady=10)
             return
     
-        # Find matching icons
-        icon_files = []
-        for filename in os.listdir('ICONS'):
-            if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
-                name_parts = filename.lower().split('_')
-            
-                # Extract filename without extension for matching
-                file_base = os.path.splitext(filename)[0].lower()
-            
-                # Exact match (all terms in correct order)
-                exact_match = all(term in file_base for term in search_terms)
-            
-                # Partial match (individual terms)
-                partial_matches = []
-                for term in search_terms:
-                    if term in file_base:
-                        partial_matches.append(term)
-            
-                # Only add if there's at least one match
-                if partial_matches:
-                    # Store tuple of (filename, match_score, matching_terms)
-                    # Exact matches get priority, then number of matching terms
-                    score = 1000 if exact_match else len(partial_matches)
-                    icon_files.append((filename, score, partial_matches))
-        
-        # Sort by score (highest first)
-        icon_files.sort(key=lambda x: x[1], reverse=True)
+        # Pick up added or removed icons, then look the terms up in the index
+        if self.icon_index.refresh():
+            self.thumbnail_store.fill('ICONS')
+        # Exact matches (all terms) first, then by number of matching terms
+        icon_files = self.icon_index.search(search_text)
     
         if not icon_files:
             self.no_results_label = Label(self.icon_scrollable_frame, text="No matching icons found")
@@ -1476,76 +1349,37 @@ class UIManager:
         self.display_icon_results(icon_files)
 
     def display_icon_results(self, icon_files):
-        """Display icon search results in a vertical layout"""
+        """Display icon search results in a vertical layout (widgets only for visible rows)"""
         # Clear existing results
         for widget in self.icon_scrollable_frame.winfo_children():
             widget.destroy()
     
-        # Create a frame for the results
-        results_frame = Frame(self.icon_scrollable_frame)
-        results_frame.pack(fill=tk.BOTH, expand=True)
-    
         # Add header
-        Label(results_frame, text=f"Found {len(icon_files)} icons", font=("Arial", 10, "bold")).pack(anchor=tk.W, pady=(0, 5))
-    
-        # Display each icon vertically
-        for i, (filename, score, matching_terms) in enumerate(icon_files):
-            # Create cell frame
-            cell_frame = Frame(results_frame, borderwidth=1, relief="solid", padx=5, pady=5)
-            cell_frame.pack(fill=tk.X, padx=5, pady=5)
-        
-            try:
-                # Create a horizontal layout within each cell for the icon and buttons
-                icon_layout = Frame(cell_frame)
-                icon_layout.pack(fill=tk.X)
-            
-                # Left side - icon and filename
-                icon_info = Frame(icon_layout)
-                icon_info.pack(side=tk.LEFT)
-            
-                # Load and resize the icon
-                img_path = os.path.join('ICONS', filename)
-                img = Image.open(img_path)
-                img = img.resize((50, 50), Image.LANCZOS)
-                photo_img = ImageTk.PhotoImage(img)
-            
-                # Store reference to prevent garbage collection
-                self.icon_images.append(photo_img)
-                
-                # Display the image
-                img_label = Label(icon_info, image=photo_img)
-                img_label.pack(side=tk.LEFT, padx=5)
-            
-                # Display the filename
-                name_frame = Frame(icon_info)
-                name_frame.pack(side=tk.LEFT, padx=5)
-            
-                # Truncate filename if needed
-                display_name = filename
-                if len(display_name) > 25:
-                    display_name = display_name[:22] + "..."
-            
-                name_label = Label(name_frame, text=display_name, anchor="w")
-                name_label.pack(anchor=tk.W)
-            
-                # Display matching terms if not an exact match
-                if len(matching_terms) < len(filename.split('_')):
-                    match_label = Label(name_frame, text=f"Matched: {', '.join(matching_terms)}", 
-                                       font=("Arial", 8), fg="#666666")
-                    match_label.pack(anchor=tk.W)
-            
-                # Right side - selection buttons
-                button_frame = Frame(icon_layout)
-                button_frame.pack(side=tk.RIGHT)
-            
-                Button(button_frame, text="Big Icon", 
-                      command=lambda f=img_path: self.select_icon(f, 'big_icon')).pack(side=tk.LEFT, padx=2)
-                Button(button_frame, text="Small Icon", 
-                      command=lambda f=img_path: self.select_icon(f, 'small_icon')).pack(side=tk.LEFT, padx=2)
-            
-            except Exception as e:
-                print(f"Error loading icon {filename}: {e}")
-                Label(cell_frame, text=f"Error: {filename}").pack(pady=5)
+        header_frame = Frame(self.icon_scrollable_frame, pady=5)
+        header_frame.pack(fill=tk.X)
+        Label(header_frame, text=f"Found {len(icon_files)} icons", font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
+
+        # Re-sorting only rebinds the visible rows
+        sort_options = ["Relevance (default)", "Filename A-Z", "Filename Z-A"]
+        sort_var = StringVar(value=sort_options[0])
+        sort_dropdown = ttk.Combobox(header_frame, textvariable=sort_var, values=sort_options, width=18, state="readonly")
+        sort_dropdown.pack(side=tk.RIGHT, padx=5)
+        Label(header_frame, text="Sort by:").pack(side=tk.RIGHT, padx=2)
+
+        def on_sort_change(event):
+            sort_option = sort_var.get()
+            sorted_icons = icon_files.copy()
+            if sort_option == "Filename A-Z":
+                sorted_icons.sort(key=lambda x: x[0].lower())
+            elif sort_option == "Filename Z-A":
+                sorted_icons.sort(key=lambda x: x[0].lower(), reverse=True)
+            # Default is already sorted by relevance
+            self.icon_results.set_items(sorted_icons)
+
+        sort_dropdown.bind("<<ComboboxSelected>>", on_sort_change)
+
+        self.icon_scrollable_frame.update_idletasks()
+        self.icon_results.set_items(icon_files)
 
     def select_icon(self, file_path, icon_type):
         """Select an icon from search results"""
@@ -1553,9 +1387,10 @@ class UIManager:
         self.save_paragraph_data()
     
         # Load the icon
-        icon = load_icon_image(file_path)
+        icon = icon_cache.load(file_path)
         if icon:
             self.paragraphs[self.current_paragraph_index]['icons'][icon_type] = icon
+            self.paragraphs[self.current_paragraph_index]['icons'][f'{icon_type}_path'] = file_path
         
             # Update preview
             self.update_preview()
@@ -1572,8 +1407,8 @@ class UIManager:
         key = f'text{line_index}'
         paragraph['font_sizes'][key] = max(10, int(paragraph['font_sizes'][key] * factor))
         
-        # Update preview
-        self.update_preview()
+        # Quick proxy preview while clicking, full quality once the clicks stop
+        self.update_preview(self.PREVIEW_DEBOUNCE_MS, proxy=True)
     
     def scale_icon(self, icon_type, factor):
         """Scale a specific icon"""
@@ -1589,8 +1424,8 @@ class UIManager:
             max(10, int(size[1] * factor))
         )
         
-        # Update preview
-        self.update_preview()
+        # Quick proxy preview while clicking, full quality once the clicks stop
+        self.update_preview(self.PREVIEW_DEBOUNCE_MS, proxy=True)
     
     def update_element_position(self, element_type, x, y):
         """Update the position of an element after dragging"""
@@ -1671,9 +1506,15 @@ class UIManager:
     
     def update_paragraph_selector(self):
         """Update the paragraph selector dropdown"""
-        # Create paragraph labels
+        # Only label a window of paragraphs around the current one, so huge
+        # imports don't build (or parse) a label for every paragraph
+        window = self.PARAGRAPH_SELECTOR_WINDOW
+        total = len(self.paragraphs)
+        self.selector_offset = max(0, min(self.current_paragraph_index - window // 2, total - window))
+
         paragraph_labels = []
-        for i, paragraph in enumerate(self.paragraphs):
+        for i in range(self.selector_offset, min(total, self.selector_offset + window)):
+            paragraph = self.paragraphs.peek(i)
             # Use first text line as label, or default
             label = f"Paragraph {i+1}"
             if paragraph['text_lines'][0]:
@@ -1684,15 +1525,31 @@ class UIManager:
         
         # Update the combobox
         self.paragraph_selector['values'] = paragraph_labels
-        self.paragraph_selector.current(self.current_paragraph_index)
+        self.paragraph_selector.current(self.current_paragraph_index - self.selector_offset)
+        self.paragraph_count_label.config(text=f"of {total}")
     
     def on_paragraph_selected(self, event):
         """Handle paragraph selection change"""
+        self.go_to_paragraph(self.selector_offset + self.paragraph_selector.current())
+
+    def on_paragraph_goto(self, event=None):
+        """Jump to the paragraph number typed into the Go to box"""
+        try:
+            number = int(self.paragraph_goto_var.get())
+        except ValueError:
+            return
+        self.go_to_paragraph(max(0, min(number - 1, len(self.paragraphs) - 1)))
+
+    def go_to_paragraph(self, index):
+        """Make paragraph index the current one"""
         # Save current paragraph data
         self.save_paragraph_data()
         
         # Update current index
-        self.current_paragraph_index = self.paragraph_selector.current()
+        self.current_paragraph_index = index
+
+        # Re-center the selector window if needed
+        self.update_paragraph_selector()
         
         # Load selected paragraph data
         self.load_paragraph_data()
@@ -1808,7 +1665,7 @@ class UIManager:
         """Reset the entire project"""
         if messagebox.askyesno("Confirm Reset", "Are you sure you want to reset all paragraphs?"):
             # Clear paragraphs
-            self.paragraphs = []
+            self.paragraphs = ParagraphStore()
             
             # Add default paragraph
             self.add_paragraph()
@@ -1821,9 +1678,10 @@ class UIManager:
             self.save_paragraph_data()
             
             # Load the icon
-            icon = load_icon_image(path)
+            icon = icon_cache.load(path)
             if icon:
                 self.paragraphs[self.current_paragraph_index]['icons']['big_icon'] = icon
+                self.paragraphs[self.current_paragraph_index]['icons']['big_icon_path'] = path
                 
                 # Update preview
                 self.update_preview()
@@ -1836,9 +1694,10 @@ class UIManager:
             self.save_paragraph_data()
             
             # Load the icon
-            icon = load_icon_image(path)
+            icon = icon_cache.load(path)
             if icon:
                 self.paragraphs[self.current_paragraph_index]['icons']['small_icon'] = icon
+                self.paragraphs[self.current_paragraph_index]['icons']['small_icon_path'] = path
                 
                 # Update preview
                 self.update_preview()
@@ -1872,12 +1731,24 @@ class UIManager:
         if not self.validate_font_selection():
             return
 
-        active_paragraphs = [self.paragraphs[self.current_paragraph_index]]
+        output_path = self.image_generator.ask_save_path(self.output_format.get())
+        if not output_path:
+            return
+        # The extension picked in the dialog decides between PNG and WebP
+        output_format = negotiate_format(output_path, self.output_format.get())
 
-        if active_paragraphs:
-            self.image_generator.save_image_dialog(active_paragraphs)
-        else:
-            messagebox.showinfo("No Content", "No active paragraphs to generate.")
+        # Render in the background like Export All, writing to the chosen path
+        spec = spec_from_paragraph(self.paragraphs[self.current_paragraph_index])
+        spec['output'] = os.path.basename(output_path)
+
+        def on_finished(job):
+            if job.results and not job.results[0][2]:
+                messagebox.showinfo("Image Saved", f"Image saved successfully to:\n{job.results[0][1]}")
+            elif job.results:
+                messagebox.showerror("Error", f"Error saving image: {job.results[0][2]}")
+
+        self.start_export_job([spec], os.path.dirname(output_path) or ".", "Generate Image", on_finished,
+                              output_format=output_format)
 
     
     def create_tooltip(self, widget, text):
@@ -1913,61 +1784,18 @@ class UIManager:
                 self.update_preview()
 
     def load_paragraphs_from_text(self, file_path):
-        paragraphs = []
+        """Index a text file as a ParagraphStore; paragraphs are parsed on demand"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = [line.strip() for line in f.readlines() if line.strip()]
-
-            while len(lines) % 3 != 0:
-                lines.append("")
-
-            for i in range(0, len(lines), 3):
-                paragraph = {
-                    'active': True,
-                    'text_lines': lines[i:i+3],
-                    'fonts': [],
-                    'colors': ['#000000', '#000000', '#000000'],
-                    'positions': {
-                        'text0': (150, 150),
-                        'text1': (150, 250),
-                        'text2': (150, 350),
-                        'small_icon': (600, 600),
-                        'big_icon': (100, 600)
-                    },
-                    'font_sizes': {
-                        'text0': 150,
-                        'text1': 160,
-                        'text2': 140
-                    },
-                    'icon_sizes': {
-                        'small_icon': (150, 150),
-                        'big_icon': (300, 300)
-                    },
-                    'icons': {
-                        'small_icon': None,
-                        'big_icon': None
-                    },
-                    'effects': {
-                        'shadow': False,
-                        'outline': False,
-                        'stroke': False,
-                        'shadow_color': '#888888',
-                        'shadow_offset': 3,
-                        'outline_color': '#FFFFFF',
-                        'outline_width': 1,
-                        'stroke_color': '#222222',
-                        'stroke_width': 2
-                    }
-                }
-                paragraphs.append(paragraph)
+            return ParagraphStore.from_text_file(file_path)
         except Exception as e:
             messagebox.showerror("Import Error", f"Failed to load text file: {e}")
-        return paragraphs
+            return None
     
     def save_all_paragraphs_data(self):
         """Lưu toàn bộ dữ liệu của tất cả các paragraph"""
         current_index_backup = self.current_paragraph_index
-        for i in range(len(self.paragraphs)):
+        # Paragraphs never opened in the UI can't have been edited
+        for i in self.paragraphs.loaded_indices():
             self.current_paragraph_index = i
             self.load_paragraph_data()  # ✅ Tải dữ liệu từ UI (canvas) đúng đoạn
             self.save_paragraph_data()  # ✅ Sau đó lưu lại chính xác
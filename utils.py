@@ -1,13 +1,44 @@
 import re
-import os
-from PIL import Image, ImageTk, ImageFont, ImageDraw
-import tkinter as tk
+import threading
+from collections import OrderedDict
+from PIL import Image
 
 def parse_color_from_filename(filename):
     """Extract RGB color codes from filenames like icon_rgb00a69c_rgbfc1a84.png"""
     matches = re.findall(r"rgb([0-9a-fA-F]{6})", filename)
     return ["#" + m for m in matches]
 
+def hex_to_rgb(hex_color):
+    """Convert hex color to RGB tuple"""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+def rgb_to_hex(rgb):
+    """Convert RGB tuple to hex color"""
+    return '#{:02x}{:02x}{:02x}'.format(rgb[0], rgb[1], rgb[2])
+
+def darken_color(hex_color, factor=2.0):
+    """Make a color darker by the given factor"""
+    r, g, b = hex_to_rgb(hex_color)
+    
+    # Darken by dividing by factor
+    r = max(0, int(r / factor))
+    g = max(0, int(g / factor))
+    b = max(0, int(b / factor))
+    
+    return rgb_to_hex((r, g, b))
+
+def lighten_color(hex_color, factor=2.0):
+    """Make a color lighter by the given factor"""
+    r, g, b = hex_to_rgb(hex_color)
+    
+    # Lighten by interpolating toward white (255, 255, 255)
+    r = min(255, int(r + (255 - r) * (1 - 1/factor)))
+    g = min(255, int(g + (255 - g) * (1 - 1/factor)))
+    b = min(255, int(b + (255 - b) * (1 - 1/factor)))
+    
+    return rgb_to_hex((r, g, b))
+
 def load_icon_image(path):
     """Load an icon image from path and convert to RGBA"""
     try:
@@ -16,7 +47,32 @@ def load_icon_image(path):
         print(f"Error loading icon: {e}")
         return None
 
-def get_resized_image(image, width, height):
+# Downscaling first reduces by an integer factor (box filter, fast) until the
+# image is within this factor of the target, then finishes with the filter
+THUMBNAIL_REDUCING_GAP = 2.0
+
+def open_for_thumbnail(path, size):
+    """Open and decode an image that will be shrunk to about size.
+
+    JPEGs are decoded at the smallest DCT scale (1/2, 1/4, 1/8) that still
+    covers size, which skips most of the decode work for large photos.
+    """
+    img = Image.open(path)
+    if img.format == "JPEG":
+        img.draft(img.mode, size)
+    img.load()
+    return img
+
+def thumbnail_resize(image, size, keep_aspect=True, resample=Image.LANCZOS):
+    """Downscale image to size (fit inside it if keep_aspect, never enlarging), reducing first"""
+    if keep_aspect:
+        scale = min(size[0] / image.width, size[1] / image.height, 1)
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        if size == image.size:
+            return image.copy()
+    return image.resize(size, resample, reducing_gap=THUMBNAIL_REDUCING_GAP)
+
+def get_resized_image(image, width, height, resample=Image.LANCZOS):
     """Resize an image while maintaining aspect ratio."""
     aspect = image.width / image.height
     if width / height > aspect:
@@ -25,7 +81,7 @@ def get_resized_image(image, width, height):
     else:
         new_width = width
         new_height = int(width / aspect)
-    return image.resize((new_width, new_height), Image.LANCZOS)
+    return image.resize((new_width, new_height), resample)
 
     if not image:
         return None
@@ -80,6 +136,92 @@ def sanitize_filename(text):
     """Remove invalid characters from filename"""
     return re.sub(r'[\\/*?:"<>|]', "", text)
 
+class LRUCache:
+    """A small thread-safe LRU mapping with hit/miss counters.
+
+    Entries are evicted least-recently-used first once either ``max_entries``
+    is exceeded or, when a ``weigher`` is given, the summed weight of all
+    entries goes over ``max_weight``.
+    """
+    def __init__(self, max_entries=128, max_weight=None, weigher=None):
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self._data = OrderedDict()
+        self._weights = {}
+        self._total_weight = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key and mark it as recently used"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Store a value, evicting old entries if over budget"""
+        with self._lock:
+            if key in self._data:
+                self._total_weight -= self._weights.pop(key, 0)
+                del self._data[key]
+            weight = self.weigher(value) if self.weigher else 0
+            self._data[key] = value
+            self._weights[key] = weight
+            self._total_weight += weight
+            self._evict()
+        return value
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for key, building it with factory() on a miss"""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = self.put(key, factory())
+        return value
+
+    def _evict(self):
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_weight is not None and self._total_weight > self.max_weight)
+        ):
+            key, _ = self._data.popitem(last=False)
+            self._total_weight -= self._weights.pop(key, 0)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._data.clear()
+            self._weights.clear()
+            self._total_weight = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Return a dict of hit/miss/eviction counters and current size"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._data),
+                'weight': self._total_weight,
+                'hit_rate': (self.hits / total) if total else 0.0,
+            }
+
 class DraggableItem:
     """A class to handle draggable items on a canvas"""
     def __init__(self, canvas, item_id, item_type, update_callback=None):